@@ -26,6 +26,7 @@ def main():
     packages = [
         ("pandas", "pandas"),
         ("numpy", "numpy"),
+        ("pyarrow", "pyarrow"),
         ("scikit-learn", "sklearn"),
         ("sentence-transformers", "sentence_transformers"),
         ("spacy", "spacy"),
@@ -3,56 +3,76 @@
 Main entry point for PulseGen AI Agent
 """
 
-import pandas as pd
+import argparse
 from datetime import datetime
-from src.main_orchestrator import TrendAnalysisOrchestrator
-from src.utils.config import Config
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="PulseGen AI Agent - Play Store review trend analysis")
+    parser.add_argument('--app', default="https://play.google.com/store/apps/details?id=in.swiggy.android",
+                        help="Play Store URL or app ID")
+    parser.add_argument('--date', default="2024-06-30", help="target date (YYYY-MM-DD)")
+    parser.add_argument('--output', default=None,
+                        help="report file (.csv, .parquet or .jsonl); default outputs/trend_report_<date>.csv")
+    parser.add_argument('--config', default=None,
+                        help="YAML or TOML settings file (default $PULSEGEN_CONFIG); PULSEGEN_* variables override it")
+    parser.add_argument('--profile', choices=('cprofile', 'pyinstrument'), default=None,
+                        help="profile the run and save the profile next to the report")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="recompute the report from stored reviews, reusing cached artifacts, instead of scraping")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """
     Main function to run the trend analysis
     """
+    args = parse_args(argv)
     try:
+        # Imported here so --help returns without loading pandas or the pipeline
+        from src.main_orchestrator import TrendAnalysisOrchestrator
+        from src.utils.config import get_config
+        
         print("🚀 PulseGen AI Agent - Play Store Review Analysis")
         print("=" * 60)
         
         # Initialize
-        config = Config()
-        orchestrator = TrendAnalysisOrchestrator(config)
-        
-        # Set parameters
-        app_store_link = "https://play.google.com/store/apps/details?id=in.swiggy.android"
-        target_date = datetime(2024, 6, 30)
-        
-        print(f"📱 App: Swiggy")
-        print(f"📅 Target Date: {target_date.strftime('%Y-%m-%d')}")
-        print("⏳ Starting analysis...")
-        
-        # Generate report
-        report_df = orchestrator.generate_trend_report(app_store_link, target_date)
-        
-        if report_df.empty:
-            print("❌ No data available to generate report.")
-            return
-        
-        # Display summary
-        print("\n📊 REPORT SUMMARY")
-        print("=" * 50)
-        print(f"Total Topics: {len(report_df)}")
-        print(f"Total Days: {len(report_df.columns)}")
-        
-        # Show top topics
-        top_topics = report_df.sum(axis=1).nlargest(5)
-        print("\n🏆 TOP 5 TOPICS:")
-        for topic, count in top_topics.items():
-            print(f"  • {topic}: {int(count)} occurrences")
-        
-        # Save report
-        import os
-        os.makedirs('outputs', exist_ok=True)
-        output_file = f"outputs/trend_report_{target_date.strftime('%Y%m%d')}.csv"
-        report_df.to_csv(output_file)
-        print(f"\n💾 Report saved to: {output_file}")
+        config = get_config(args.config)
+        if args.profile:
+            config = config.replace(profiler=args.profile)
+        with TrendAnalysisOrchestrator(config) as orchestrator:
+            
+            # Set parameters
+            app_store_link = args.app
+            target_date = datetime.strptime(args.date, '%Y-%m-%d')
+            
+            print(f"📱 App: {app_store_link}")
+            print(f"📅 Target Date: {target_date.strftime('%Y-%m-%d')}")
+            print("⏳ Starting analysis...")
+            
+            # Generate report
+            report_df = orchestrator.generate_trend_report(app_store_link, target_date, rebuild=args.rebuild)
+            
+            if report_df.empty:
+                print("❌ No data available to generate report.")
+                return
+            
+            # Display summary
+            print("\n📊 REPORT SUMMARY")
+            print("=" * 50)
+            print(f"Total Topics: {len(report_df)}")
+            print(f"Total Days: {len(report_df.columns)}")
+            
+            # Show top topics
+            top_topics = report_df.sum(axis=1).nlargest(5)
+            print("\n🏆 TOP 5 TOPICS:")
+            for topic, count in top_topics.items():
+                print(f"  • {topic}: {int(count)} occurrences")
+            
+            # Save report
+            output_file = args.output or f"outputs/trend_report_{target_date.strftime('%Y%m%d')}.csv"
+            orchestrator.report_generator.save_report(report_df, output_file)
+            print(f"\n💾 Report saved to: {output_file}")
+            metrics_file = orchestrator.last_metrics.write_next_to(output_file)
+            print(f"⏱️  Run metrics saved to: {metrics_file}")
         
         print("\n🎉 Analysis completed successfully!")
         
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark review ingestion throughput against the local Play Store stand-in
+"""
+
+import argparse
+import sys
+import os
+import time
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime, timedelta
+from src.data_processing.mock_play_store import MockPlayStoreServer
+from src.data_processing.review_scraper import ReviewScraper, HttpReviewSource
+from src.data_processing.async_fetcher import AsyncReviewFetcher
+
+def run_benchmark(days: int, reviews_per_day: int, page_size: int, workers: int, latency: float,
+                  backend: str = 'asyncio'):
+    """
+    Stream a full window from the mock server and report throughput and peak memory
+    """
+    end = datetime(2024, 7, 1)
+    start = end - timedelta(days=days)
+
+    with MockPlayStoreServer(reviews_per_day=reviews_per_day, latency=latency) as server:
+        if backend == 'asyncio':
+            scraper = AsyncReviewFetcher(server.base_url, page_size=page_size, max_connections=workers)
+        else:
+            scraper = ReviewScraper(HttpReviewSource(server.base_url), page_size=page_size, max_workers=workers)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        total = sum(1 for _ in scraper.iter_reviews("in.swiggy.android", start, end))
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if backend == 'asyncio':
+            latencies = scraper.latency.as_dict()
+            scraper.close()
+
+    if backend == 'asyncio':
+        print(f"⏱️  Request latency p50 ≤ {latencies['p50_seconds']}s, p99 ≤ {latencies['p99_seconds']}s "
+              f"over {latencies['count']} requests")
+    print(f"📥 Reviews: {total:,} in {elapsed:.2f}s ({total / elapsed:,.0f} reviews/s)")
+    print(f"🧠 Peak traced memory: {peak / 1024 / 1024:.1f} MiB")
+    return total, elapsed, peak
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--reviews-per-day', type=int, default=2000)
+    parser.add_argument('--page-size', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.02, help="simulated round trip per request (s)")
+    parser.add_argument('--backend', choices=('asyncio', 'threads'), default='asyncio')
+    args = parser.parse_args()
+
+    run_benchmark(args.days, args.reviews_per_day, args.page_size, args.workers, args.latency, args.backend)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Benchmark every pipeline stage on synthetic review corpora and emit JSON
+
+For each corpus size the reviews are generated and pushed through the
+pipeline in batches; wall time, CPU time, peak traced memory and items in/out
+are accumulated per stage. Results go to a JSON file that can be compared
+against an earlier run with --compare.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+class StageTimer:
+    """Accumulates wall/CPU time, peak memory and item counts per stage"""
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str, items_in: int):
+        record = self.stages.setdefault(name, {
+            'wall_s': 0.0, 'cpu_s': 0.0, 'peak_mb': 0.0, 'items_in': 0, 'items_out': 0, 'calls': 0})
+        out = {'items_out': items_in}
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        yield out
+        record['wall_s'] += time.perf_counter() - wall
+        record['cpu_s'] += time.process_time() - cpu
+        if self.trace_memory:
+            peak = (tracemalloc.get_traced_memory()[1] - base) / 2 ** 20
+            record['peak_mb'] = max(record['peak_mb'], peak)
+        record['items_in'] += items_in
+        record['items_out'] += out['items_out']
+        record['calls'] += 1
+
+    def results(self):
+        results = {}
+        for name, record in self.stages.items():
+            results[name] = {k: round(v, 4) if isinstance(v, float) else v for k, v in record.items()}
+            items = max(record['items_in'], record['items_out'])
+            results[name]['items_per_s'] = round(items / record['wall_s'], 1) if record['wall_s'] else None
+        return results
+
+
+def run_size(n: int, args) -> dict:
+    """Run the whole pipeline over an n-review corpus"""
+    from src.agentic_ai.semantic_deduplicator import SemanticDeduplicator
+    from src.agentic_ai.topic_analyzer import EmbeddingService, HashingEncoder
+    from src.agentic_ai.topic_discoverer import OnlineTopicDiscoverer, TopicRegistry
+    from src.data_processing.data_cleaner import DataCleaner
+    from src.data_processing.synthetic_corpus import SyntheticCorpus
+    from src.trend_analysis.report_generator import ReportGenerator
+    from src.trend_analysis.topic_matrix import TopicDayMatrix
+    from src.trend_analysis.trend_calculator import TrendCalculator
+
+    corpus = SyntheticCorpus(duplicate_rate=args.duplicate_rate, paraphrase_rate=args.paraphrase_rate,
+                             days=args.days, seed=args.seed)
+    encoder = HashingEncoder(args.dim) if args.encoder == 'hashing' else None
+    workdir = tempfile.mkdtemp(prefix='pulsegen-bench-')
+    timer = StageTimer(trace_memory=not args.no_tracemalloc)
+    started = time.perf_counter()
+    try:
+        cleaner = DataCleaner()
+        embedder = EmbeddingService(batch_size=args.embedding_batch_size, cache_dir=os.path.join(workdir, 'emb'),
+                                    encoder=encoder)
+        dedup = SemanticDeduplicator(embedder.dim, args.dedup_threshold)
+        discoverer = OnlineTopicDiscoverer(TopicRegistry(embedder.dim))
+        matrix = TopicDayMatrix(corpus.start, n_days=args.days)
+
+        batches = corpus.batches(n, args.batch_size)
+        while True:
+            with timer.stage('generate', 0) as out:
+                batch = next(batches, None)
+                out['items_out'] = len(batch or [])
+            if batch is None:
+                break
+            with timer.stage('clean', len(batch)) as out:
+                batch = cleaner.clean_records(batch)
+                out['items_out'] = len(batch)
+            texts = [r['clean_text'] for r in batch]
+            with timer.stage('embed', len(texts)):
+                embeddings = embedder.encode(texts)
+            with timer.stage('dedup', len(embeddings)) as out:
+                before = dedup.representatives.size
+                dedup.add(embeddings)
+                out['items_out'] = dedup.representatives.size - before
+            days = [r['at'].strftime('%Y-%m-%d') for r in batch]
+            with timer.stage('topics', len(embeddings)) as out:
+                topic_ids = discoverer.assign(embeddings, days)
+                out['items_out'] = int((topic_ids >= 0).sum())
+            with timer.stage('count', len(topic_ids)):
+                daily = {}
+                for day, topic_id in zip(days, topic_ids.tolist()):
+                    if topic_id >= 0:
+                        counts = daily.setdefault(day, {})
+                        counts[topic_id] = counts.get(topic_id, 0) + 1
+                for day, counts in daily.items():
+                    matrix.add_counts(day, counts)
+
+        with timer.stage('trends', matrix.shape[0]):
+            TrendCalculator().compute(matrix.counts)
+        with timer.stage('report', matrix.shape[0]):
+            ReportGenerator().save_report(matrix.to_frame(), os.path.join(workdir, 'report.csv'))
+
+        return {
+            'reviews': n,
+            'total_wall_s': round(time.perf_counter() - started, 4),
+            'topics': int(matrix.shape[0]),
+            'embedding_stats': dict(embedder.stats),
+            'max_rss_mb': round(max_rss_mb(), 1),
+            'stages': timer.results(),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def max_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict):
+    """Print wall-time ratios (current / baseline) per size and stage"""
+    old = {r['reviews']: r for r in baseline['runs']}
+    print(f"\n📊 Compared with {baseline.get('commit')} (ratio > 1 means slower now)")
+    for run in current['runs']:
+        base = old.get(run['reviews'])
+        if not base:
+            continue
+        for stage, stats in run['stages'].items():
+            before = base['stages'].get(stage, {}).get('wall_s')
+            if before:
+                ratio = stats['wall_s'] / before
+                flag = "⚠️ " if ratio > 1.2 else "  "
+                print(f"{flag}{run['reviews']:>9,} {stage:<10} {before:8.3f}s -> {stats['wall_s']:8.3f}s ({ratio:.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=lambda s: [int(x) for x in s.split(',')], default=list(DEFAULT_SIZES),
+                        help="comma-separated corpus sizes (default 1000,10000,100000,1000000)")
+    parser.add_argument('--duplicate-rate', type=float, default=0.1)
+    parser.add_argument('--paraphrase-rate', type=float, default=0.2)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--embedding-batch-size', type=int, default=64)
+    parser.add_argument('--encoder', choices=('hashing', 'sentence-transformer'), default='hashing',
+                        help="hashing needs no model download; sentence-transformer measures the real encoder")
+    parser.add_argument('--dim', type=int, default=256, help="hashing encoder dimension")
+    parser.add_argument('--dedup-threshold', type=float, default=0.9)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-tracemalloc', action='store_true', help="skip memory tracing (it slows Python code)")
+    parser.add_argument('--output', default=None, help="JSON file (default outputs/benchmarks/<commit>.json)")
+    parser.add_argument('--compare', default=None, help="earlier JSON result to compare against")
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    result = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+        'runs': [],
+    }
+    if not args.no_tracemalloc:
+        tracemalloc.start()
+    for n in args.sizes:
+        print(f"⏱️  {n:,} reviews...")
+        run = run_size(n, args)
+        result['runs'].append(run)
+        slowest = max(run['stages'].items(), key=lambda kv: kv[1]['wall_s'])
+        print(f"   {run['total_wall_s']:.2f}s total, slowest stage: {slowest[0]} ({slowest[1]['wall_s']:.2f}s)")
+    if not args.no_tracemalloc:
+        tracemalloc.stop()
+
+    output = args.output or os.path.join('outputs', 'benchmarks', f"{commit or 'bench'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(f"💾 Benchmark results saved to: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(result, json.load(f))
+    return result
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Check an ONNX Runtime encoder backend against the sentence-transformers reference
+
+Encodes a fixed, seeded sample of cleaned synthetic reviews with both
+backends and compares them: per-text cosine similarity between the two
+vectors, and agreement of each text's nearest neighbours within the sample.
+Also reports encode throughput of each backend. Exits non-zero when the
+candidate falls below the thresholds, so it can gate a switch of
+embedding_backend.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def fixed_sample(n: int, seed: int):
+    """Distinct cleaned texts of the first n synthetic reviews for the seed"""
+    from src.data_processing.data_cleaner import DataCleaner
+    from src.data_processing.synthetic_corpus import SyntheticCorpus
+
+    records = DataCleaner().clean_records(list(SyntheticCorpus(seed=seed).iter_reviews(n)))
+    return list(dict.fromkeys(r['clean_text'] for r in records))
+
+
+def throughput(encoder, texts, batch_size: int) -> float:
+    """Texts per second encoding the sample in batches (after one warm-up batch)"""
+    encoder.encode(texts[:batch_size])
+    started = time.perf_counter()
+    for start in range(0, len(texts), batch_size):
+        encoder.encode(texts[start:start + batch_size])
+    return len(texts) / max(time.perf_counter() - started, 1e-9)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=('onnx', 'onnx-int8'), default='onnx-int8')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--model-dir', default='data/models', help="where exported ONNX graphs are kept")
+    parser.add_argument('--threads', type=int, default=None, help="ONNX Runtime intra-op threads")
+    parser.add_argument('--sample', type=int, default=1000, help="synthetic reviews to draw the sample from")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--k', type=int, default=5, help="nearest neighbours compared per text")
+    parser.add_argument('--min-cosine', type=float, default=0.98, help="minimum mean cosine to the reference")
+    parser.add_argument('--min-overlap', type=float, default=0.8, help="minimum nearest-neighbour overlap")
+    parser.add_argument('--output', default=None, help="also write the result as JSON")
+    args = parser.parse_args(argv)
+
+    from src.agentic_ai.topic_analyzer import OnnxEncoder, SentenceTransformerEncoder, encoder_parity
+
+    texts = fixed_sample(args.sample, args.seed)
+    print(f"🧪 {len(texts)} distinct review texts (seed {args.seed})")
+    reference = SentenceTransformerEncoder(args.model)
+    candidate = OnnxEncoder(args.model, model_dir=args.model_dir, quantize=args.backend == 'onnx-int8',
+                            threads=args.threads)
+
+    result = encoder_parity(candidate, reference, texts, k=args.k, min_mean_cosine=args.min_cosine,
+                            min_neighbor_overlap=args.min_overlap)
+    result['backend'] = args.backend
+    result['model'] = args.model
+    result['texts_per_s'] = {
+        'sentence-transformers': round(throughput(reference, texts, args.batch_size), 1),
+        args.backend: round(throughput(candidate, texts, args.batch_size), 1),
+    }
+
+    print(f"📐 cosine to reference: mean {result['mean_cosine']:.4f}, min {result['min_cosine']:.4f}")
+    print(f"🔎 top-{args.k} neighbour overlap: {result['neighbor_overlap']:.3f}")
+    for backend, rate in result['texts_per_s'].items():
+        print(f"⚡ {backend:<22} {rate:10,.1f} texts/s")
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+    if result['passed']:
+        print(f"✅ {args.backend} matches the reference")
+        return 0
+    print(f"❌ {args.backend} is below the parity thresholds (cosine >= {args.min_cosine}, "
+          f"overlap >= {args.min_overlap})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,34 +3,38 @@
 Script to run analysis with different parameters
 """
 
+import argparse
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from datetime import datetime
-from src.main_orchestrator import TrendAnalysisOrchestrator
 
-def run_analysis(app_url: str, target_date_str: str):
+def run_analysis(app_url: str, target_date_str: str, output_file: str = None):
     """
     Run analysis with specific parameters
     """
-    orchestrator = TrendAnalysisOrchestrator()
-    target_date = datetime.strptime(target_date_str, '%Y-%m-%d')
+    from src.main_orchestrator import TrendAnalysisOrchestrator
     
-    report_df = orchestrator.generate_trend_report(app_url, target_date)
+    target_date = datetime.strptime(target_date_str, '%Y-%m-%d')
+    with TrendAnalysisOrchestrator() as orchestrator:
+        report_df = orchestrator.generate_trend_report(app_url, target_date)
     
     # Save with timestamp
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    output_file = f"outputs/trend_report_{timestamp}.csv"
+    output_file = output_file or f"outputs/trend_report_{timestamp}.csv"
     orchestrator.report_generator.save_report(report_df, output_file)
+    orchestrator.last_metrics.write_next_to(output_file)
     
     print(f"Report saved to: {output_file}")
     return report_df
 
 if __name__ == "__main__":
-    # Example usage
-    app_url = "https://play.google.com/store/apps/details?id=in.swiggy.android"
-    target_date = "2024-06-30"
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('app_url', nargs='?', default="https://play.google.com/store/apps/details?id=in.swiggy.android")
+    parser.add_argument('--date', default="2024-06-30", help="target date (YYYY-MM-DD)")
+    parser.add_argument('--output', default=None, help="report file (.csv, .parquet or .jsonl)")
+    args = parser.parse_args()
     
-    report = run_analysis(app_url, target_date)
+    report = run_analysis(args.app_url, args.date, args.output)
     print(report.head())
\ No newline at end of file
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Backfill months of history for an app in parallel day partitions
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime
+
+def run_backfill(app_url: str, start_str: str, end_str: str, workers: int = None, output_file: str = None,
+                 config_file: str = None, merge: bool = False):
+    """
+    Backfill the date range (inclusive) and save the combined report; rerun
+    the same command to resume an interrupted backfill. An app with existing
+    topics or checkpoint needs merge to be backfilled into them.
+    """
+    from src.main_orchestrator import TrendAnalysisOrchestrator
+    from src.utils.config import get_config
+    
+    config = get_config(config_file).replace(use_sample_data=False)
+    start = datetime.strptime(start_str, '%Y-%m-%d')
+    end = datetime.strptime(end_str, '%Y-%m-%d')
+    with TrendAnalysisOrchestrator(config) as orchestrator:
+        report_df = orchestrator.backfill(app_url, start, end, workers=workers, merge=merge)
+    
+    app_id = orchestrator._extract_app_id(app_url)
+    output_file = output_file or f"outputs/backfill_{app_id}_{start:%Y%m%d}_{end:%Y%m%d}.csv"
+    orchestrator.report_generator.save_report(report_df, output_file)
+    orchestrator.last_metrics.write_next_to(output_file)
+    
+    print(f"Report saved to: {output_file}")
+    return report_df
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('app_url', help="Play Store URL or app ID")
+    parser.add_argument('--start', required=True, help="first day (YYYY-MM-DD)")
+    parser.add_argument('--end', required=True, help="last day, inclusive (YYYY-MM-DD)")
+    parser.add_argument('--workers', type=int, default=None, help="partitions prepared in parallel")
+    parser.add_argument('--output', default=None, help="report file (.csv, .parquet or .jsonl)")
+    parser.add_argument('--config', default=None, help="YAML or TOML settings file")
+    parser.add_argument('--merge', action='store_true',
+                        help="backfill into the app's existing topics and checkpoint")
+    args = parser.parse_args()
+    
+    report = run_backfill(args.app_url, args.start, args.end, args.workers, args.output, args.config, args.merge)
+    print(report.head())
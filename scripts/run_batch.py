@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Run trend analysis for many apps in one process, sharing the loaded models
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime
+
+CHART_FORMATS = ('png', 'svg', 'html')
+
+def run_batch(apps, target_date_str: str, max_concurrency: int, output_dir: str = "outputs",
+              combined_file: str = None, chart_format: str = None):
+    """
+    Analyze every app and save one CSV per successful app, plus an optional
+    combined report (CSV, Parquet or JSON Lines) with an app_id column
+    """
+    from src.main_orchestrator import TrendAnalysisOrchestrator
+    from src.trend_analysis.chart_renderer import ChartRenderer
+    
+    target_date = datetime.strptime(target_date_str, '%Y-%m-%d')
+    with TrendAnalysisOrchestrator() as orchestrator:
+        orchestrator.config.use_sample_data = False
+        results = orchestrator.generate_trend_reports(apps, target_date, max_concurrency)
+    
+    os.makedirs(output_dir, exist_ok=True)
+    for app_id, result in results.items():
+        if result.ok:
+            output_file = os.path.join(output_dir, f"trend_report_{app_id}_{target_date:%Y%m%d}.csv")
+            orchestrator.report_generator.save_report(result.report, output_file)
+            result.metrics.write_next_to(output_file)
+            print(f"✅ {app_id}: {len(result.report)} topics in {result.elapsed:.1f}s -> {output_file}")
+        else:
+            print(f"❌ {app_id}: {result.error}")
+    
+    if combined_file:
+        orchestrator.report_generator.save_reports(
+            ((app_id, r.report) for app_id, r in results.items() if r.ok), combined_file)
+        print(f"💾 Combined report saved to: {combined_file}")
+    
+    if chart_format:
+        renderer = ChartRenderer(format=chart_format)
+        charts = renderer.render_many({app_id: r.report for app_id, r in results.items() if r.ok}, output_dir)
+        print(f"📈 Rendered {len(charts)} {chart_format} charts to {output_dir}")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('apps', nargs='+', help="Play Store URLs or app IDs")
+    parser.add_argument('--date', default=datetime.now().strftime('%Y-%m-%d'), help="target date (YYYY-MM-DD)")
+    parser.add_argument('--max-concurrency', type=int, default=None)
+    parser.add_argument('--combined', default=None, help="also write all apps to one .csv/.parquet/.jsonl file")
+    parser.add_argument('--charts', choices=CHART_FORMATS, default=None, help="render one chart per app")
+    args = parser.parse_args()
+    
+    results = run_batch(args.apps, args.date, args.max_concurrency,
+                        combined_file=args.combined, chart_format=args.charts)
+    sys.exit(0 if all(r.ok for r in results.values()) else 1)
@@ -0,0 +1,39 @@
+"""
+Embedding, deduplication and topic discovery
+
+Public classes are imported from their submodule on first access; model
+libraries (sentence-transformers, torch) load only when a model is first
+used, never at import time.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'EmbeddingCache': 'topic_analyzer',
+    'EmbeddingService': 'topic_analyzer',
+    'HashingEncoder': 'topic_analyzer',
+    'OnnxEncoder': 'topic_analyzer',
+    'SentenceTransformerEncoder': 'topic_analyzer',
+    'TaxonomyClassifier': 'topic_analyzer',
+    'encoder_parity': 'topic_analyzer',
+    'ExactIndex': 'semantic_deduplicator',
+    'IVFIndex': 'semantic_deduplicator',
+    'SemanticDeduplicator': 'semantic_deduplicator',
+    'OnlineTopicDiscoverer': 'topic_discoverer',
+    'TopicRegistry': 'topic_discoverer',
+    'TopicLabeler': 'topic_labeler',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
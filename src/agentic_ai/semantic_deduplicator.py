@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Semantic Deduplicator - thresholded cosine matching over a vector index
+
+All vectors are expected to be L2-normalized, so cosine similarity is a
+plain dot product. Two index types are provided:
+
+* ``ExactIndex``  - blocked NumPy matrix multiply; exact, O(n) per query.
+* ``IVFIndex``    - inverted-file index over spherical k-means cells; each
+  query only scans the ``nprobe`` closest cells.
+
+Recall target: with the defaults (``nlist = 2·sqrt(train_size)``,
+``nprobe = 24``) ``IVFIndex`` returns at least 95% of the neighbours
+``ExactIndex`` returns above ``similarity_threshold = 0.7``, and
+``SemanticDeduplicator`` assigns at least 95% of rows to the same
+representative as exact search. Use ``radius_recall`` to check a particular
+corpus and raise ``nprobe`` if it falls short.
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class _GrowableMatrix:
+    """Row-appendable float32 matrix with amortized O(1) inserts"""
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self._data = np.empty((capacity, dim), dtype=np.float32)
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self.size = 0
+
+    def append(self, vectors: np.ndarray, ids: np.ndarray):
+        needed = self.size + len(vectors)
+        if needed > len(self._data):
+            capacity = max(needed, 2 * len(self._data))
+            data = np.empty((capacity, self._data.shape[1]), dtype=np.float32)
+            data[:self.size] = self._data[:self.size]
+            new_ids = np.empty(capacity, dtype=np.int64)
+            new_ids[:self.size] = self._ids[:self.size]
+            self._data, self._ids = data, new_ids
+        self._data[self.size:needed] = vectors
+        self._ids[self.size:needed] = ids
+        self.size = needed
+
+    def remove(self, ids: np.ndarray):
+        """Drop the rows with the given ids, keeping the others in order"""
+        keep = ~np.isin(self.ids, ids)
+        size = int(keep.sum())
+        self._data[:size] = self.vectors[keep]
+        self._ids[:size] = self.ids[keep]
+        self.size = size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._data[:self.size]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[:self.size]
+
+
+class ExactIndex:
+    """
+    Brute-force cosine index evaluated in blocks to bound memory
+    """
+
+    def __init__(self, dim: int, block_size: int = 4096):
+        self.dim = dim
+        self.block_size = block_size
+        self._store = _GrowableMatrix(dim)
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return self._store.size
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """Insert vectors and return their ids"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        ids = np.arange(self._next_id, self._next_id + len(vectors))
+        self._next_id += len(vectors)
+        self._store.append(vectors, ids)
+        return ids
+
+    def remove(self, ids: np.ndarray):
+        """Delete vectors by id; ids are never reused"""
+        self._store.remove(ids)
+
+    def search_radius(self, queries: np.ndarray, threshold: float) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """For each query return (ids, similarities) with similarity >= threshold"""
+        queries = np.asarray(queries, dtype=np.float32)
+        hits = [([], []) for _ in range(len(queries))]
+        vectors, ids = self._store.vectors, self._store.ids
+        for start in range(0, len(vectors), self.block_size):
+            sims = queries @ vectors[start:start + self.block_size].T
+            rows, cols = np.nonzero(sims >= threshold)
+            for r, c in zip(rows, cols):
+                hits[r][0].append(ids[start + c])
+                hits[r][1].append(sims[r, c])
+        return [(np.asarray(i, dtype=np.int64), np.asarray(s, dtype=np.float32)) for i, s in hits]
+
+    def best_match(self, queries: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest neighbour id per query (-1 if none reaches threshold) and its similarity"""
+        queries = np.asarray(queries, dtype=np.float32)
+        best_ids = np.full(len(queries), -1, dtype=np.int64)
+        best_sims = np.full(len(queries), -np.inf, dtype=np.float32)
+        vectors, ids = self._store.vectors, self._store.ids
+        for start in range(0, len(vectors), self.block_size):
+            sims = queries @ vectors[start:start + self.block_size].T
+            cols = sims.argmax(axis=1)
+            block_best = sims[np.arange(len(queries)), cols]
+            better = block_best > best_sims
+            best_sims[better] = block_best[better]
+            best_ids[better] = ids[start + cols[better]]
+        best_ids[best_sims < threshold] = -1
+        return best_ids, best_sims
+
+
+class IVFIndex:
+    """
+    Inverted-file index with a spherical k-means coarse quantizer.
+
+    Vectors are buffered and searched exactly until ``train_size`` of them
+    have arrived; the quantizer is then trained on that buffer. Later
+    inserts are assigned to their nearest cell, so the index grows
+    incrementally without retraining.
+    """
+
+    def __init__(self, dim: int, nlist: Optional[int] = None, nprobe: int = 24,
+                 train_size: int = 10000, kmeans_iters: int = 10, seed: int = 0):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size
+        self.kmeans_iters = kmeans_iters
+        self.seed = seed
+        self.centroids = None
+        self._lists: List[_GrowableMatrix] = []
+        self._buffer = ExactIndex(dim)
+        self._size = 0
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """Insert vectors and return their ids"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        ids = np.arange(self._next_id, self._next_id + len(vectors))
+        self._next_id += len(vectors)
+        self._size += len(vectors)
+
+        if not self.is_trained:
+            self._buffer.add(vectors)
+            if len(self._buffer) >= self.train_size:
+                self._train()
+            return ids
+
+        self._assign(vectors, ids)
+        return ids
+
+    def remove(self, ids: np.ndarray):
+        """Delete vectors by id; ids are never reused"""
+        if not self.is_trained:
+            self._buffer.remove(ids)
+            self._size = len(self._buffer)
+            return
+        for cell_list in self._lists:
+            cell_list.remove(ids)
+        self._size = sum(cell_list.size for cell_list in self._lists)
+
+    def _train(self):
+        data = self._buffer._store.vectors
+        nlist = self.nlist or max(1, int(2 * np.sqrt(len(data))))
+        self.centroids = spherical_kmeans(data, nlist, self.kmeans_iters, self.seed)
+        self._lists = [_GrowableMatrix(self.dim, capacity=64) for _ in range(len(self.centroids))]
+        self._assign(data, self._buffer._store.ids)
+        self._buffer = None
+
+    def _assign(self, vectors: np.ndarray, ids: np.ndarray):
+        cells = (vectors @ self.centroids.T).argmax(axis=1)
+        for cell in np.unique(cells):
+            mask = cells == cell
+            self._lists[cell].append(vectors[mask], ids[mask])
+
+    def _probe(self, queries: np.ndarray) -> np.ndarray:
+        nprobe = min(self.nprobe, len(self.centroids))
+        sims = queries @ self.centroids.T
+        return np.argpartition(-sims, nprobe - 1, axis=1)[:, :nprobe]
+
+    def _scan(self, queries: np.ndarray):
+        """Yield (query rows, cell ids, similarity block) for every probed cell"""
+        probes = self._probe(queries)
+        for cell in np.unique(probes):
+            rows = np.nonzero((probes == cell).any(axis=1))[0]
+            cell_list = self._lists[cell]
+            if cell_list.size == 0:
+                continue
+            yield rows, cell_list.ids, queries[rows] @ cell_list.vectors.T
+
+    def search_radius(self, queries: np.ndarray, threshold: float) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """For each query return (ids, similarities) with similarity >= threshold"""
+        queries = np.asarray(queries, dtype=np.float32)
+        if not self.is_trained:
+            return self._buffer.search_radius(queries, threshold)
+
+        hits = [([], []) for _ in range(len(queries))]
+        for rows, ids, sims in self._scan(queries):
+            r_idx, c_idx = np.nonzero(sims >= threshold)
+            for r, c in zip(r_idx, c_idx):
+                hits[rows[r]][0].append(ids[c])
+                hits[rows[r]][1].append(sims[r, c])
+        return [(np.asarray(i, dtype=np.int64), np.asarray(s, dtype=np.float32)) for i, s in hits]
+
+    def best_match(self, queries: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest neighbour id per query (-1 if none reaches threshold) and its similarity"""
+        queries = np.asarray(queries, dtype=np.float32)
+        if not self.is_trained:
+            return self._buffer.best_match(queries, threshold)
+
+        best_ids = np.full(len(queries), -1, dtype=np.int64)
+        best_sims = np.full(len(queries), -np.inf, dtype=np.float32)
+        for rows, ids, sims in self._scan(queries):
+            cols = sims.argmax(axis=1)
+            block_best = sims[np.arange(len(rows)), cols]
+            better = block_best > best_sims[rows]
+            best_sims[rows[better]] = block_best[better]
+            best_ids[rows[better]] = ids[cols[better]]
+        best_ids[best_sims < threshold] = -1
+        return best_ids, best_sims
+
+
+def spherical_kmeans(data: np.ndarray, k: int, iters: int = 10, seed: int = 0,
+                     block_size: int = 8192) -> np.ndarray:
+    """Cosine k-means returning L2-normalized centroids"""
+    rng = np.random.default_rng(seed)
+    k = min(k, len(data))
+    centroids = data[rng.choice(len(data), size=k, replace=False)].copy()
+    for _ in range(iters):
+        labels = np.empty(len(data), dtype=np.int64)
+        for start in range(0, len(data), block_size):
+            labels[start:start + block_size] = (data[start:start + block_size] @ centroids.T).argmax(axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, data)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        if empty.any():
+            sums[empty] = data[rng.choice(len(data), size=int(empty.sum()), replace=False)]
+            norms[empty] = 1.0
+        centroids = sums / norms
+    return centroids.astype(np.float32)
+
+
+def radius_recall(index, exact: ExactIndex, queries: np.ndarray, threshold: float) -> float:
+    """Fraction of exact neighbours above threshold that ``index`` also returns"""
+    found = total = 0
+    for (approx_ids, _), (exact_ids, _) in zip(index.search_radius(queries, threshold),
+                                              exact.search_radius(queries, threshold)):
+        total += len(exact_ids)
+        found += len(np.intersect1d(approx_ids, exact_ids))
+    return found / total if total else 1.0
+
+
+class SemanticDeduplicator:
+    """
+    Collapses semantically equivalent texts onto representatives.
+
+    Each embedding is matched against the representatives seen so far; if
+    the best cosine similarity reaches ``similarity_threshold`` it joins
+    that representative, otherwise it becomes a new one. Incoming rows are
+    processed in blocks: one index query per block, then a small in-block
+    matrix multiply resolves duplicates among the block's new rows.
+    """
+
+    def __init__(self, dim: int, similarity_threshold: float = 0.7, index: str = 'ivf',
+                 block_size: int = 1024, **index_params):
+        self.similarity_threshold = similarity_threshold
+        self.block_size = block_size
+        if index == 'ivf':
+            self.index = IVFIndex(dim, **index_params)
+        elif index == 'exact':
+            self.index = ExactIndex(dim, **index_params)
+        else:
+            raise ValueError(f"Unknown index type: {index}")
+        # Maps index id -> caller's representative position
+        self.representatives = _GrowableIds()
+        # Sampled reviews carry fractional weights, so the sums are float
+        self.weights = _GrowableIds(np.float64)
+        self._seen = 0
+
+    def add(self, embeddings: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Deduplicate a batch and return, for each row, the global position of
+        its representative (positions count every row ever added)
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if weights is None:
+            weights = np.ones(len(embeddings), dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+        assignment = np.empty(len(embeddings), dtype=np.int64)
+
+        for start in range(0, len(embeddings), self.block_size):
+            block = embeddings[start:start + self.block_size]
+            block_weights = weights[start:start + self.block_size]
+            assignment[start:start + len(block)] = self._add_block(block, block_weights)
+        return assignment
+
+    def _add_block(self, block: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        matched, _ = self.index.best_match(block, self.similarity_threshold)
+        result = np.empty(len(block), dtype=np.int64)
+        has_match = matched >= 0
+        result[has_match] = self.representatives.values[matched[has_match]]
+        np.add.at(self.weights.values, matched[has_match], weights[has_match])
+
+        # Greedy leader assignment among the unmatched rows of this block
+        pending = np.nonzero(~has_match)[0]
+        if len(pending):
+            sims = block[pending] @ block[pending].T
+            leader_of = np.full(len(pending), -1, dtype=np.int64)
+            leaders = []
+            for i in range(len(pending)):
+                if leader_of[i] >= 0:
+                    continue
+                leader_of[i] = i
+                leaders.append(i)
+                followers = np.nonzero((sims[i, i + 1:] >= self.similarity_threshold) & (leader_of[i + 1:] < 0))[0] + i + 1
+                leader_of[followers] = i
+
+            leaders = np.asarray(leaders)
+            self.index.add(block[pending[leaders]])
+            self.representatives.extend(self._seen + pending[leaders])
+            leader_weights = np.zeros(len(pending), dtype=np.float64)
+            np.add.at(leader_weights, leader_of, weights[pending])
+            self.weights.extend(leader_weights[leaders])
+            result[pending] = self._seen + pending[leader_of]
+
+        self._seen += len(block)
+        return result
+
+    def discard(self, representatives: np.ndarray):
+        """Stop matching new rows against the given representatives (global positions)"""
+        # Representatives are recorded in increasing position order
+        positions = self.representatives.values
+        representatives = np.asarray(representatives, dtype=np.int64)
+        ids = np.searchsorted(positions, representatives)
+        found = ids < len(positions)
+        found[found] = positions[ids[found]] == representatives[found]
+        self.index.remove(ids[found])
+
+
+class _GrowableIds:
+    """Appendable vector (int64 unless another dtype is given)"""
+
+    def __init__(self, dtype=np.int64):
+        self._data = np.empty(1024, dtype=dtype)
+        self.size = 0
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        needed = self.size + len(values)
+        if needed > len(self._data):
+            data = np.empty(max(needed, 2 * len(self._data)), dtype=self._data.dtype)
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+        self._data[self.size:needed] = values
+        self.size = needed
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[:self.size]
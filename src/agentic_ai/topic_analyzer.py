@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Topic Analyzer - batched, cached sentence embeddings for review text and
+zero-shot classification against a fixed topic taxonomy
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_MODEL = 'all-MiniLM-L6-v2'
+
+# Loaded models are shared by every service in the process
+_MODELS: Dict[tuple, object] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def text_key(text: str) -> bytes:
+    """Content hash used as the cache key for a text"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class SentenceTransformerEncoder:
+    """
+    Reference encoder backed by sentence-transformers on CPU.
+
+    The model is loaded on first use and kept in a process-wide registry, so
+    several services (or apps) pay the cold start once.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, device: str = 'cpu'):
+        self.model_name = model_name
+        self.device = device
+
+    @property
+    def model(self):
+        key = (self.model_name, self.device)
+        with _MODELS_LOCK:
+            if key not in _MODELS:
+                from sentence_transformers import SentenceTransformer
+                _MODELS[key] = SentenceTransformer(self.model_name, device=self.device)
+            return _MODELS[key]
+
+    @property
+    def dim(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode one batch into L2-normalized float32 vectors"""
+        return self.model.encode(
+            list(texts),
+            batch_size=len(texts),
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ).astype(np.float32, copy=False)
+
+
+class OnnxEncoder:
+    """
+    CPU encoder running the sentence-transformer as an ONNX Runtime graph.
+
+    On first use the Hugging Face model is exported to ONNX under
+    ``model_dir`` (and, with ``quantize``, its weights dynamically
+    quantized to int8); later runs load the stored graph and tokenizer
+    without torch. Token embeddings are mean-pooled over the attention mask
+    and L2-normalized, as in the ``all-*`` sentence-transformers models, so
+    vectors stay comparable with ``SentenceTransformerEncoder``; check
+    with ``encoder_parity`` before switching a deployment over.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, model_dir: str = 'data/models', quantize: bool = True,
+                 threads: Optional[int] = None, max_length: int = 256):
+        self.model_name = model_name
+        self.model_dir = model_dir
+        self.quantize = quantize
+        self.threads = threads
+        self.max_length = max_length
+        # Keeps cached vectors of different backends apart
+        self.variant = 'onnx-int8' if quantize else 'onnx'
+
+    @property
+    def repo_id(self) -> str:
+        return self.model_name if '/' in self.model_name else f'sentence-transformers/{self.model_name}'
+
+    @property
+    def directory(self) -> str:
+        return os.path.join(self.model_dir, re.sub(r'[^A-Za-z0-9_.-]+', '_', self.model_name))
+
+    @property
+    def model(self):
+        """(session, tokenizer), exported and loaded once per process"""
+        key = ('onnx', self.directory, self.quantize, self.threads)
+        with _MODELS_LOCK:
+            if key not in _MODELS:
+                import onnxruntime as ort
+                from transformers import AutoTokenizer
+                path = self._ensure_graph()
+                options = ort.SessionOptions()
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+                if self.threads:
+                    options.intra_op_num_threads = self.threads
+                session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+                _MODELS[key] = (session, AutoTokenizer.from_pretrained(self.directory))
+            return _MODELS[key]
+
+    @property
+    def dim(self) -> int:
+        session, _ = self.model
+        size = session.get_outputs()[0].shape[-1]
+        return size if isinstance(size, int) else self.encode(['dim']).shape[1]
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode one batch into L2-normalized float32 vectors"""
+        session, tokenizer = self.model
+        tokens = tokenizer(list(texts), padding=True, truncation=True, max_length=self.max_length,
+                           return_tensors='np')
+        feeds = {i.name: np.asarray(tokens[i.name], dtype=np.int64) for i in session.get_inputs()}
+        hidden = session.run([session.get_outputs()[0].name], feeds)[0]
+        mask = np.asarray(tokens['attention_mask'], dtype=np.float32)[..., None]
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return (pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)).astype(np.float32)
+
+    def _ensure_graph(self) -> str:
+        """Path of the graph to run, exporting and quantizing it if missing"""
+        fp32_path = os.path.join(self.directory, 'model.onnx')
+        int8_path = os.path.join(self.directory, 'model_int8.onnx')
+        if not os.path.exists(fp32_path):
+            self._export(fp32_path)
+        if not self.quantize:
+            return fp32_path
+        if not os.path.exists(int8_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            tmp_path = _temp_path(int8_path)
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+        return int8_path
+
+    def _export(self, path: str):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        os.makedirs(self.directory, exist_ok=True)
+        tokenizer = AutoTokenizer.from_pretrained(self.repo_id)
+        model = AutoModel.from_pretrained(self.repo_id).eval()
+        model.config.return_dict = False
+        sample = tokenizer(['export sample'], return_tensors='pt')
+        names = [n for n in ('input_ids', 'attention_mask', 'token_type_ids') if n in sample]
+        axes = {n: {0: 'batch', 1: 'sequence'} for n in names}
+        axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+        tmp_path = _temp_path(path)
+        with torch.no_grad():
+            torch.onnx.export(model, tuple(sample[n] for n in names), tmp_path, input_names=names,
+                              output_names=['last_hidden_state', 'pooler_output'], dynamic_axes=axes,
+                              opset_version=14)
+        tokenizer.save_pretrained(self.directory)
+        os.replace(tmp_path, path)
+
+
+def encoder_parity(candidate, reference, texts: Sequence[str], k: int = 5,
+                   min_mean_cosine: float = 0.98, min_neighbor_overlap: float = 0.8) -> Dict[str, Any]:
+    """
+    Accuracy parity of ``candidate`` against ``reference`` on a fixed sample:
+    the cosine between both vectors of each text, and the share of each
+    text's ``k`` nearest neighbours (within the sample) under the candidate
+    that are also among its ``k`` nearest under the reference. Neighbours
+    tied with the reference's k-th are counted as agreeing. ``passed`` is
+    set when both clear their minimums.
+    """
+    texts = list(texts)
+    ours = _normalized(candidate.encode(texts))
+    theirs = _normalized(reference.encode(texts))
+    cosines = (ours * theirs).sum(axis=1)
+    k = min(k, len(texts) - 1)
+    overlap = 1.0
+    if k > 0:
+        ours_sims, theirs_sims = ours @ ours.T, theirs @ theirs.T
+        np.fill_diagonal(ours_sims, -np.inf)
+        np.fill_diagonal(theirs_sims, -np.inf)
+        picked = np.argpartition(-ours_sims, k - 1, axis=1)[:, :k]
+        kth = -np.partition(-theirs_sims, k - 1, axis=1)[:, k - 1:k]
+        overlap = float(np.mean(np.take_along_axis(theirs_sims, picked, axis=1) >= kth - 1e-6))
+    report = {
+        'texts': len(texts),
+        'mean_cosine': round(float(cosines.mean()), 4),
+        'min_cosine': round(float(cosines.min()), 4),
+        'neighbor_overlap': round(overlap, 4),
+    }
+    report['passed'] = report['mean_cosine'] >= min_mean_cosine and overlap >= min_neighbor_overlap
+    return report
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _temp_path(path: str) -> str:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-', suffix=os.path.splitext(path)[1])
+    os.close(fd)
+    return tmp_path
+
+
+class HashingEncoder:
+    """
+    Dependency-free hashed bag-of-words encoder.
+
+    Much weaker than a sentence-transformer (no synonyms), but deterministic
+    and fast; used by benchmarks and offline runs that must not download a
+    model.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        rows, cols = [], []
+        for i, text in enumerate(texts):
+            for word in re.findall(r'\w+', text.lower()):
+                rows.append(i)
+                cols.append(zlib.crc32(word.encode('utf-8')) % self.dim)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(out, (rows, cols), 1.0)
+        return out / np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-9)
+
+
+class EmbeddingCache:
+    """
+    Append-only on-disk embedding cache keyed by content hash.
+
+    Vectors live in a flat binary file read through ``np.memmap``; the keys
+    file holds the 16-byte hash of each row in the same order. Rows are
+    written before their keys, so a crash can only leave unreferenced rows.
+    With ``max_bytes`` set the cache stops growing at that size; vectors
+    that do not fit are simply not cached.
+    """
+
+    def __init__(self, directory: str, dim: int, dtype: str = 'float16', max_bytes: Optional[int] = None):
+        self.directory = directory
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._vectors_path = os.path.join(directory, 'vectors.bin')
+        self._keys_path = os.path.join(directory, 'keys.bin')
+        self._index: Dict[bytes, int] = {}
+        self._mmap = None
+        self._mmap_rows = 0
+        self._load()
+
+    def _load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        meta_path = os.path.join(self.directory, 'meta.json')
+        meta = {'dim': self.dim, 'dtype': self.dtype.name}
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored != meta:
+                raise ValueError(f"Embedding cache at {self.directory} holds {stored}, expected {meta}")
+        else:
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+
+        # Raw bytes, not 'S16': numpy strips trailing zero bytes from S strings
+        raw = np.zeros(0, dtype=np.uint8)
+        if os.path.exists(self._keys_path):
+            raw = np.fromfile(self._keys_path, dtype=np.uint8)
+        keys = raw[:len(raw) // 16 * 16].reshape(-1, 16)
+        row_bytes = self.dim * self.dtype.itemsize
+        rows = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        keys = keys[:rows]
+        self._index = {k.tobytes(): i for i, k in enumerate(keys)}
+        self._rows = len(keys)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._index
+
+    def get(self, keys: Sequence[bytes]) -> np.ndarray:
+        """Return float32 vectors for keys that are all present"""
+        with self._lock:
+            if self._mmap is None or self._mmap_rows != self._rows:
+                self._mmap = np.memmap(self._vectors_path, dtype=self.dtype, mode='r',
+                                       shape=(self._rows, self.dim))
+                self._mmap_rows = self._rows
+            rows = np.fromiter((self._index[k] for k in keys), dtype=np.int64, count=len(keys))
+            return np.asarray(self._mmap[rows], dtype=np.float32)
+
+    def put(self, keys: Sequence[bytes], vectors: np.ndarray):
+        """Append new vectors; keys already present are skipped"""
+        with self._lock:
+            fresh = [i for i, k in enumerate(keys) if k not in self._index]
+            row_bytes = self.dim * self.dtype.itemsize
+            if self.max_bytes is not None:
+                fresh = fresh[:max(0, self.max_bytes // row_bytes - self._rows)]
+            if not fresh:
+                return
+            # Rows already on disk past the indexed range are orphans; overwrite them
+            with open(self._vectors_path, 'ab') as f:
+                f.truncate(self._rows * row_bytes)
+                f.write(np.ascontiguousarray(vectors[fresh], dtype=self.dtype).tobytes())
+            new_keys = [keys[i] for i in fresh]
+            with open(self._keys_path, 'ab') as f:
+                f.truncate(self._rows * 16)
+                f.write(b''.join(new_keys))
+            for offset, key in enumerate(new_keys):
+                self._index[key] = self._rows + offset
+            self._rows += len(new_keys)
+
+
+class EmbeddingService:
+    """
+    Encodes review texts with de-duplication, length bucketing and caching.
+
+    Only texts whose content hash is not already cached reach the encoder.
+    Those are sorted by length and cut into batches, so each batch pads to
+    similar lengths instead of to the longest review in a random mix.
+    """
+
+    VERSION = 1
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, batch_size: int = 64,
+                 cache_dir: Optional[str] = 'data/embeddings', cache_dtype: str = 'float16',
+                 encoder=None, cache_max_mb: Optional[float] = None):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache_dir = cache_dir
+        self.cache_dtype = cache_dtype
+        self.cache_max_mb = cache_max_mb
+        self.encoder = encoder or SentenceTransformerEncoder(model_name)
+        self._cache = None
+        self._cache_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {'requested': 0, 'cache_hits': 0, 'encoded': 0, 'batches': 0}
+
+    @staticmethod
+    def new_stats() -> Dict[str, int]:
+        """Empty counters to pass to ``encode`` for one caller's share of ``stats``"""
+        return {'requested': 0, 'cache_hits': 0, 'encoded': 0, 'batches': 0}
+
+    def _count(self, stats: Optional[Dict[str, int]], **counts: int):
+        with self._stats_lock:
+            for name, n in counts.items():
+                self.stats[name] += n
+                if stats is not None:
+                    stats[name] = stats.get(name, 0) + n
+
+    @property
+    def dim(self) -> int:
+        return self.encoder.dim
+
+    @property
+    def cache(self) -> Optional[EmbeddingCache]:
+        if self._cache is None and self.cache_dir:
+            # Concurrent first calls must not open two caches over the same files
+            with self._cache_lock:
+                if self._cache is None:
+                    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', self.model_name)
+                    variant = getattr(self.encoder, 'variant', None)
+                    if variant:
+                        slug = f"{slug}-{variant}"
+                    max_bytes = int(self.cache_max_mb * 2 ** 20) if self.cache_max_mb else None
+                    self._cache = EmbeddingCache(os.path.join(self.cache_dir, slug), self.dim, self.cache_dtype,
+                                                 max_bytes)
+        return self._cache
+
+    def encode(self, texts: Sequence[str], stats: Optional[Dict[str, int]] = None) -> np.ndarray:
+        """
+        Return an (n, dim) float32 matrix of L2-normalized embeddings.
+        Counters go to ``stats`` as well (see ``new_stats``), so concurrent
+        callers sharing the service can each tell their own cache activity.
+        """
+        texts = list(texts)
+        self._count(stats, requested=len(texts))
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        keys = [text_key(t) for t in texts]
+        unique: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            unique.setdefault(key, text)
+
+        cache = self.cache
+        missing = [k for k in unique if cache is None or k not in cache]
+        self._count(stats, cache_hits=len(unique) - len(missing))
+
+        fresh = self._encode_bucketed([unique[k] for k in missing], stats)
+        if cache is not None:
+            cache.put(missing, fresh)
+            if all(k in cache for k in missing):
+                return cache.get(keys)
+
+        # No cache, or a full one: combine fresh vectors with any cache hits
+        rows = {k: i for i, k in enumerate(missing)}
+        hits = [k for k in unique if k not in rows]
+        if hits:
+            fresh = np.vstack([fresh, cache.get(hits)])
+            rows.update({k: len(missing) + i for i, k in enumerate(hits)})
+        return fresh[[rows[k] for k in keys]]
+
+    def _encode_bucketed(self, texts: List[str], stats: Optional[Dict[str, int]] = None) -> np.ndarray:
+        """Encode texts in length-sorted batches, returning rows in input order"""
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        order = np.argsort([len(t) for t in texts], kind='stable')
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            out[batch] = self.encoder.encode([texts[i] for i in batch])
+            self._count(stats, batches=1)
+        self._count(stats, encoded=len(texts))
+        return out
+
+
+# Known complaint and request categories: label -> description
+DEFAULT_TAXONOMY = {
+    'Delivery issue': "delivery was late, delayed or never arrived",
+    'Food stale': "food was stale, old, spoiled or not fresh",
+    'Delivery partner rude': "the delivery guy or delivery partner was rude or behaved badly",
+    'Maps not working properly': "maps, location pin or address shown wrong on the map",
+    'Instamart should be open all night': "keep instamart open all night, 24 hours",
+    'Bring back 10 minute bolt delivery': "bring back bolt, the 10 minute fast delivery",
+    'App crashing': "the app keeps crashing, freezes or closes",
+    'Payment problem': "payment failed, UPI not working, money deducted",
+    'Refund issue': "refund not received, still waiting for money back",
+    'Order cancellation issue': "order was cancelled without reason",
+    'Missing items': "items missing from the order",
+    'Packaging damaged': "packaging was damaged, torn or leaking",
+    'Customer service poor': "customer support did not help or respond",
+}
+
+
+class TaxonomyClassifier:
+    """
+    Zero-shot assignment of review embeddings to a fixed taxonomy.
+
+    Each label's prototype is the normalized mean of the embeddings of its
+    name and description, computed once per classifier (and cached on disk
+    by the embedding service). A batch of reviews is then scored with one
+    matrix multiply; reviews whose best cosine similarity is below
+    ``threshold`` stay unassigned and can go on to full topic discovery.
+    """
+
+    VERSION = 1
+
+    def __init__(self, embedding_service: EmbeddingService, taxonomy: Optional[Dict[str, str]] = None,
+                 threshold: float = 0.45):
+        taxonomy = taxonomy if taxonomy is not None else DEFAULT_TAXONOMY
+        if not isinstance(taxonomy, dict):
+            taxonomy = {label: label for label in taxonomy}
+        self.embedding_service = embedding_service
+        self.taxonomy = dict(taxonomy)
+        self.threshold = threshold
+        self._prototypes: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @property
+    def labels(self) -> List[str]:
+        return list(self.taxonomy)
+
+    @property
+    def prototypes(self) -> np.ndarray:
+        """(n_labels, dim) float32 matrix of label prototypes"""
+        if self._prototypes is None:
+            with self._lock:
+                if self._prototypes is None:
+                    names = self.embedding_service.encode(self.labels)
+                    descriptions = self.embedding_service.encode([d or l for l, d in self.taxonomy.items()])
+                    merged = names + descriptions
+                    merged /= np.maximum(np.linalg.norm(merged, axis=1, keepdims=True), 1e-9)
+                    self._prototypes = np.ascontiguousarray(merged, dtype=np.float32)
+        return self._prototypes
+
+    def scores(self, embeddings: np.ndarray) -> np.ndarray:
+        """(n, n_labels) cosine similarities of normalized review embeddings"""
+        return np.asarray(embeddings, dtype=np.float32) @ self.prototypes.T
+
+    def classify(self, embeddings: np.ndarray) -> np.ndarray:
+        """Best label index per review, or -1 below the threshold"""
+        if len(embeddings) == 0:
+            return np.zeros(0, dtype=np.int64)
+        scores = self.scores(embeddings)
+        best = scores.argmax(axis=1)
+        best[scores[np.arange(len(best)), best] < self.threshold] = -1
+        return best
+
+    def classify_texts(self, texts: Sequence[str]) -> List[Optional[str]]:
+        """Label per text, or None when no label is close enough"""
+        labels = self.labels
+        return [labels[i] if i >= 0 else None for i in self.classify(self.embedding_service.encode(texts))]
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Topic Discoverer - online, incremental topic clustering with a persisted registry
+"""
+
+import json
+import os
+import tempfile
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .semantic_deduplicator import SemanticDeduplicator
+except ImportError:
+    from semantic_deduplicator import SemanticDeduplicator
+
+
+class TopicRegistry:
+    """
+    Persistent set of topics for one app.
+
+    Each topic keeps the running sum of its member embeddings (the centroid
+    is the normalized sum), a weighted member count and an optional label.
+    Topic IDs are never reused; a merged topic records the ID it was merged
+    into so older references keep resolving. ``label_vectors`` holds the
+    centroid each generated label was computed from; labels without one
+    were set by hand and are never regenerated.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros((0, dim), dtype=np.float32)
+        self.counts = np.zeros(0, dtype=np.float64)
+        self.labels: Dict[int, str] = {}
+        self.label_vectors: Dict[int, np.ndarray] = {}
+        self.merged_into: Dict[int, int] = {}
+        self.next_id = 0
+        # Unassigned embeddings waiting to form a topic
+        self.pending_vectors = np.zeros((0, dim), dtype=np.float32)
+        self.pending_weights = np.zeros(0, dtype=np.float64)
+        self.pending_days: List[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def centroids(self) -> np.ndarray:
+        norms = np.linalg.norm(self.sums, axis=1, keepdims=True)
+        return self.sums / np.maximum(norms, 1e-12)
+
+    def add_topics(self, sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """Register new topics and return their IDs"""
+        ids = np.arange(self.next_id, self.next_id + len(sums), dtype=np.int64)
+        self.next_id += len(sums)
+        self.ids = np.concatenate([self.ids, ids])
+        self.sums = np.vstack([self.sums, sums.astype(np.float32)])
+        self.counts = np.concatenate([self.counts, counts])
+        return ids
+
+    def resolve(self, topic_id: int) -> int:
+        """Follow merge records to the surviving topic"""
+        while topic_id in self.merged_into:
+            topic_id = self.merged_into[topic_id]
+        return topic_id
+
+    def label(self, topic_id: int) -> str:
+        topic_id = self.resolve(topic_id)
+        return self.labels.get(topic_id, f"Topic {topic_id}")
+
+    def drop_pending(self, first_day: str, last_day: str):
+        """Forget pending embeddings from first_day..last_day ('YYYY-MM-DD', inclusive)"""
+        keep = np.array([day is None or not first_day <= day <= last_day for day in self.pending_days], dtype=bool)
+        if keep.all():
+            return
+        self.pending_vectors = self.pending_vectors[keep]
+        self.pending_weights = self.pending_weights[keep]
+        self.pending_days = [day for day, k in zip(self.pending_days, keep) if k]
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """True if a registry has been saved in directory"""
+        return os.path.exists(os.path.join(directory, 'topics.json'))
+
+    def save(self, directory: str):
+        """Persist arrays and metadata with atomic renames"""
+        os.makedirs(directory, exist_ok=True)
+        label_ids = np.array(sorted(self.label_vectors), dtype=np.int64)
+        label_vectors = (np.stack([self.label_vectors[int(t)] for t in label_ids]).astype(np.float32)
+                         if len(label_ids) else np.zeros((0, self.dim), dtype=np.float32))
+        _atomic_npz(os.path.join(directory, 'topics.npz'),
+                    ids=self.ids, sums=self.sums, counts=self.counts,
+                    pending_vectors=self.pending_vectors, pending_weights=self.pending_weights,
+                    label_ids=label_ids, label_vectors=label_vectors)
+        meta = {
+            'dim': self.dim,
+            'next_id': self.next_id,
+            'labels': {str(k): v for k, v in self.labels.items()},
+            'merged_into': {str(k): v for k, v in self.merged_into.items()},
+            'pending_days': self.pending_days,
+        }
+        _atomic_json(os.path.join(directory, 'topics.json'), meta)
+
+    @classmethod
+    def load(cls, directory: str, dim: int) -> 'TopicRegistry':
+        """Load a registry, or return an empty one if none is stored"""
+        registry = cls(dim)
+        meta_path = os.path.join(directory, 'topics.json')
+        if not os.path.exists(meta_path):
+            return registry
+
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['dim'] != dim:
+            raise ValueError(f"Topic registry at {directory} has dim {meta['dim']}, expected {dim}")
+        with np.load(os.path.join(directory, 'topics.npz')) as arrays:
+            registry.ids = arrays['ids']
+            registry.sums = arrays['sums']
+            registry.counts = arrays['counts']
+            registry.pending_vectors = arrays['pending_vectors']
+            registry.pending_weights = arrays['pending_weights']
+            if 'label_ids' in arrays.files:
+                registry.label_vectors = dict(zip(arrays['label_ids'].tolist(), arrays['label_vectors']))
+        registry.next_id = meta['next_id']
+        registry.labels = {int(k): v for k, v in meta['labels'].items()}
+        registry.merged_into = {int(k): v for k, v in meta['merged_into'].items()}
+        registry.pending_days = meta['pending_days']
+        return registry
+
+
+class OnlineTopicDiscoverer:
+    """
+    Assigns new embeddings to existing topics and grows the registry.
+
+    Each call makes one vectorized pass: embeddings whose best centroid
+    similarity reaches ``assign_threshold`` join that topic. The rest are
+    added to a pending pool which is leader-clustered; groups whose total
+    weight reaches ``min_cluster_size`` become new topics. The pool's
+    leaders live in one index kept across calls: only new rows are
+    inserted and queried, and groups leave it once promoted or evicted. Topics touched in
+    the call whose centroids come within ``merge_threshold`` of another
+    topic are merged into the larger one.
+    """
+
+    VERSION = 1
+
+    def __init__(self, registry: TopicRegistry, assign_threshold: float = 0.7,
+                 min_cluster_size: int = 3, merge_threshold: float = 0.85,
+                 max_pending: int = 20000, index: str = 'exact', index_params: Optional[dict] = None):
+        self.registry = registry
+        self.assign_threshold = assign_threshold
+        self.min_cluster_size = min_cluster_size
+        self.merge_threshold = merge_threshold
+        self.max_pending = max_pending
+        # Index the pending pool is clustered with (see SemanticDeduplicator)
+        self.index = index
+        self.index_params = index_params or {}
+        # Leader clustering of registry.pending_vectors, rebuilt only when the
+        # registry's pool was replaced from outside (e.g. after loading)
+        self._pool: Optional[SemanticDeduplicator] = None
+        self._pool_vectors: Optional[np.ndarray] = None
+        self._pending_groups = np.zeros(0, dtype=np.int64)
+        self._group_weight: Dict[int, float] = defaultdict(float)
+        self._group_size: Dict[int, int] = defaultdict(int)
+        # (topic_id, day) -> weight credited to earlier days when pending reviews form a topic
+        self.backfill: Dict[Tuple[int, Optional[str]], float] = defaultdict(float)
+
+    def assign(self, embeddings: np.ndarray, days: Optional[Sequence[Optional[str]]] = None,
+               weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Return a topic ID per embedding, or -1 when it is left pending
+        """
+        registry = self.registry
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        n = len(embeddings)
+        weights = np.ones(n) if weights is None else np.asarray(weights, dtype=np.float64)
+        days = list(days) if days is not None else [None] * n
+        topic_ids = np.full(n, -1, dtype=np.int64)
+        if n == 0:
+            return topic_ids
+
+        touched = np.zeros(len(registry), dtype=bool)
+        if len(registry):
+            sims = embeddings @ registry.centroids.T
+            best = sims.argmax(axis=1)
+            matched = sims[np.arange(n), best] >= self.assign_threshold
+            rows = best[matched]
+            np.add.at(registry.sums, rows, embeddings[matched] * weights[matched, None].astype(np.float32))
+            np.add.at(registry.counts, rows, weights[matched])
+            topic_ids[matched] = registry.ids[rows]
+            touched[rows] = True
+        else:
+            matched = np.zeros(n, dtype=bool)
+
+        new_rows = self._discover(embeddings[~matched], weights[~matched], [d for d, m in zip(days, matched) if not m])
+        topic_ids[np.nonzero(~matched)[0]] = new_rows
+        touched = np.concatenate([touched, np.ones(len(registry) - len(touched), dtype=bool)])
+
+        merged = self._merge(touched)
+        if merged:
+            topic_ids = np.array([registry.resolve(t) if t >= 0 else -1 for t in topic_ids], dtype=np.int64)
+        return topic_ids
+
+    def _discover(self, vectors: np.ndarray, weights: np.ndarray, days: List[Optional[str]]) -> np.ndarray:
+        """Cluster unmatched vectors into the pending pool; returns topic IDs for them"""
+        registry = self.registry
+        rebuilt = self._pending_groups if self._sync_pool() else np.zeros(0, dtype=np.int64)
+        n_old = len(registry.pending_vectors)
+        result = np.full(len(vectors), -1, dtype=np.int64)
+        if n_old + len(vectors) == 0:
+            return result
+
+        groups = self._pool.add(vectors)
+        self._count_members(groups, weights, 1)
+        pool = np.vstack([registry.pending_vectors, vectors])
+        pool_weights = np.concatenate([registry.pending_weights, weights])
+        pool_days = registry.pending_days + days
+        pool_groups = np.concatenate([self._pending_groups, groups])
+
+        # Only groups that grew (or all of them, right after a rebuild) can reach the size
+        candidates = np.unique(np.concatenate([groups, rebuilt]))
+        promoted = [int(g) for g in candidates if self._group_weight[int(g)] >= self.min_cluster_size]
+        keep = np.ones(len(pool), dtype=bool)
+        if promoted:
+            masks = [pool_groups == g for g in promoted]
+            sums = np.stack([(pool[mask] * pool_weights[mask, None]).sum(axis=0) for mask in masks])
+            new_ids = registry.add_topics(sums, np.array([self._group_weight[g] for g in promoted]))
+            for mask, topic_id in zip(masks, new_ids):
+                members = np.nonzero(mask)[0]
+                keep[members] = False
+                for m in members:
+                    if m < n_old:
+                        self.backfill[(int(topic_id), pool_days[m])] += pool_weights[m]
+                    else:
+                        result[m - n_old] = topic_id
+            self._drop_groups(promoted)
+
+        # Oldest pending entries are dropped first once the pool is full
+        remaining = np.nonzero(keep)[0]
+        evicted, kept = remaining[:-self.max_pending], remaining[-self.max_pending:]
+        if len(evicted):
+            self._count_members(pool_groups[evicted], pool_weights[evicted], -1)
+            self._drop_groups([int(g) for g in np.unique(pool_groups[evicted]) if not self._group_size[int(g)]])
+        registry.pending_vectors = pool[kept]
+        registry.pending_weights = pool_weights[kept]
+        registry.pending_days = [pool_days[i] for i in kept]
+        self._pending_groups = pool_groups[kept]
+        self._pool_vectors = registry.pending_vectors
+        return result
+
+    def _sync_pool(self) -> bool:
+        """Build the pending-pool index unless it still matches the registry; True if rebuilt"""
+        registry = self.registry
+        if self._pool is not None and registry.pending_vectors is self._pool_vectors:
+            return False
+        self._pool = SemanticDeduplicator(registry.dim, self.assign_threshold, index=self.index, **self.index_params)
+        self._group_weight.clear()
+        self._group_size.clear()
+        self._pending_groups = self._pool.add(registry.pending_vectors)
+        self._count_members(self._pending_groups, registry.pending_weights, 1)
+        self._pool_vectors = registry.pending_vectors
+        return True
+
+    def _count_members(self, groups: np.ndarray, weights: np.ndarray, sign: int):
+        for g, w in zip(groups.tolist(), weights.tolist()):
+            self._group_weight[g] += sign * w
+            self._group_size[g] += sign
+
+    def _drop_groups(self, groups: List[int]):
+        """Forget groups that no longer have pending members"""
+        if not groups:
+            return
+        self._pool.discard(np.array(groups, dtype=np.int64))
+        for g in groups:
+            del self._group_weight[g], self._group_size[g]
+
+    def _merge(self, touched: np.ndarray) -> bool:
+        """Merge touched topics into near-identical ones; returns True if any merged"""
+        registry = self.registry
+        if len(registry) < 2 or not touched.any():
+            return False
+
+        centroids = registry.centroids
+        rows = np.nonzero(touched)[0]
+        sims = centroids[rows] @ centroids.T
+        sims[np.arange(len(rows)), rows] = -1.0
+
+        alive = np.ones(len(registry), dtype=bool)
+        for i, row in enumerate(rows):
+            if not alive[row]:
+                continue
+            candidates = np.nonzero((sims[i] >= self.merge_threshold) & alive)[0]
+            for other in candidates:
+                keep, drop = (row, other) if registry.counts[row] >= registry.counts[other] else (other, row)
+                registry.sums[keep] += registry.sums[drop]
+                registry.counts[keep] += registry.counts[drop]
+                registry.merged_into[int(registry.ids[drop])] = int(registry.ids[keep])
+                alive[drop] = False
+                if drop == row:
+                    break
+
+        if alive.all():
+            return False
+        registry.ids = registry.ids[alive]
+        registry.sums = registry.sums[alive]
+        registry.counts = registry.counts[alive]
+        return True
+
+    def drain_backfill(self) -> Dict[Tuple[int, Optional[str]], float]:
+        """Return and clear counts credited to earlier days by newly formed topics"""
+        backfill = {(self.registry.resolve(t), d): w for (t, d), w in self.backfill.items()}
+        self.backfill.clear()
+        return backfill
+
+
+def _atomic_npz(path: str, **arrays):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.npz')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _atomic_json(path: str, data):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.json')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
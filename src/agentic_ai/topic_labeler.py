@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Topic Labeler - keyword labels for discovered topics, computed once per cluster
+
+While reviews are assigned, a small seeded reservoir of texts and their
+embeddings is kept per topic. Labelling then works per cluster rather than
+per review: the sampled texts closest to the centroid are concatenated into
+one representative document, and its candidate phrases are ranked against
+the centroid already built from the members' embeddings (KeyBERT-style), or
+by YAKE. Labels live in the topic registry and are only regenerated once a
+topic's centroid has drifted.
+"""
+
+import random
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+BACKENDS = ('auto', 'embedding', 'keybert', 'yake')
+
+STOP_WORDS = frozenset("""
+a about after again all also am an and any app are as at be been before being but by can could did do does
+doing done don dont even ever every for from get got had has have having he her here him his how i if in into
+is it its just me more most my no not now of on once only or other our out over please really same she should
+so some still such than that the their them then there these they this those through to too under until up us
+very was we were what when where which while who why will with would you your
+""".split())
+
+
+class TopicLabeler:
+    """
+    Names topics from a sample of their reviews.
+
+    ``observe`` is cheap bookkeeping done during assignment; all phrase
+    extraction and candidate encoding happens in ``label_topics``, once per
+    topic that is unlabeled or whose centroid similarity to the centroid it
+    was last labeled at has fallen below ``stable_similarity``.
+
+    ``backend`` is ``'embedding'`` (candidate phrases scored by cosine
+    similarity to the centroid through the shared embedding service),
+    ``'keybert'`` (the same with KeyBERT, using the centroid as the document
+    embedding), ``'yake'`` (statistical, no embeddings) or ``'auto'``
+    (KeyBERT when installed, otherwise ``'embedding'``). Labels in
+    ``reserved`` (e.g. taxonomy labels) are never generated.
+    """
+
+    VERSION = 1
+
+    def __init__(self, embedding_service=None, backend: str = 'auto', sample_size: int = 32,
+                 max_docs: int = 10, ngram_range: Tuple[int, int] = (1, 3), max_candidates: int = 64,
+                 stable_similarity: float = 0.95, seed: int = 0, reserved: Iterable[str] = ()):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown labeler backend: {backend}")
+        if backend == 'auto':
+            try:
+                import keybert  # noqa: F401
+                backend = 'keybert'
+            except ImportError:
+                backend = 'embedding'
+        if backend in ('embedding', 'keybert') and embedding_service is None:
+            raise ValueError(f"The {backend} labeler needs an embedding service")
+        self.embedding_service = embedding_service
+        self.backend = backend
+        self.sample_size = sample_size
+        self.max_docs = max_docs
+        self.ngram_range = ngram_range
+        self.max_candidates = max_candidates
+        self.stable_similarity = stable_similarity
+        self.reserved = {label.lower() for label in reserved}
+        self._rng = random.Random(seed)
+        self._samples: Dict[int, List[Tuple[str, np.ndarray]]] = {}
+        self._seen: Dict[int, int] = {}
+        self._extractor = None
+        self._lock = threading.Lock()
+
+    def observe(self, topic_ids: Iterable, texts: Sequence[str], embeddings: np.ndarray):
+        """Offer assigned reviews to their topics' reservoirs (unassigned IDs are skipped)"""
+        with self._lock:
+            for topic_id, text, vector in zip(topic_ids, texts, embeddings):
+                if topic_id is None or topic_id < 0:
+                    continue
+                topic_id = int(topic_id)
+                seen = self._seen.get(topic_id, 0) + 1
+                self._seen[topic_id] = seen
+                sample = self._samples.setdefault(topic_id, [])
+                if len(sample) < self.sample_size:
+                    sample.append((text, vector))
+                else:
+                    slot = self._rng.randrange(seen)
+                    if slot < self.sample_size:
+                        sample[slot] = (text, vector)
+
+    def stale_topics(self, registry) -> List[int]:
+        """Live topic IDs that have samples and need a (new) label"""
+        centroids = dict(zip(registry.ids.tolist(), registry.centroids))
+        sampled = {registry.resolve(t) for t in self._samples}
+        stale = []
+        for topic_id in sorted(sampled):
+            if topic_id not in centroids:
+                continue
+            if topic_id in registry.label_vectors:
+                if float(centroids[topic_id] @ registry.label_vectors[topic_id]) >= self.stable_similarity:
+                    continue
+            elif topic_id in registry.labels:
+                continue  # set by hand
+            stale.append(topic_id)
+        return stale
+
+    def label_topics(self, registry) -> Dict[int, str]:
+        """Label every stale topic in the registry; returns the new labels"""
+        with self._lock:
+            samples: Dict[int, List[Tuple[str, np.ndarray]]] = {}
+            for topic_id, sample in self._samples.items():
+                samples.setdefault(registry.resolve(topic_id), []).extend(sample)
+
+        centroids = dict(zip(registry.ids.tolist(), registry.centroids))
+        labels = {}
+        for topic_id in self.stale_topics(registry):
+            centroid = centroids[topic_id].astype(np.float32)
+            document = self.representative_text(samples[topic_id], centroid)
+            taken = self.reserved | {label.lower() for t, label in registry.labels.items() if t != topic_id}
+            for phrase in self.keywords(document, centroid):
+                if phrase.lower() not in taken:
+                    labels[topic_id] = registry.labels[topic_id] = phrase[:1].upper() + phrase[1:]
+                    registry.label_vectors[topic_id] = centroid
+                    break
+        return labels
+
+    def representative_text(self, sample: List[Tuple[str, np.ndarray]], centroid: np.ndarray) -> str:
+        """The ``max_docs`` sampled texts closest to the centroid, joined"""
+        vectors = np.stack([vector for _, vector in sample]).astype(np.float32)
+        order = np.argsort(-(vectors @ centroid), kind='stable')[:self.max_docs]
+        return '. '.join(sample[i][0] for i in order)
+
+    def keywords(self, document: str, centroid: np.ndarray, top_n: int = 5) -> List[str]:
+        """Candidate labels for one representative document, best first"""
+        if self.backend == 'yake':
+            if self._extractor is None:
+                import yake
+                self._extractor = yake.KeywordExtractor(lan='en', n=self.ngram_range[1], top=top_n)
+            return [kw for kw, _ in self._extractor.extract_keywords(document)]
+        if self.backend == 'keybert':
+            if self._extractor is None:
+                from keybert import KeyBERT
+                self._extractor = KeyBERT(model=_service_backend(self.embedding_service))
+            return [kw for kw, _ in self._extractor.extract_keywords(
+                document, keyphrase_ngram_range=self.ngram_range, stop_words='english', top_n=top_n,
+                doc_embeddings=centroid[None, :])]
+
+        candidates = candidate_phrases(document, self.ngram_range, self.max_candidates)
+        if not candidates:
+            return []
+        scores = self.embedding_service.encode(candidates) @ centroid
+        return [candidates[i] for i in np.argsort(-scores, kind='stable')[:top_n]]
+
+
+def candidate_phrases(document: str, ngram_range: Tuple[int, int] = (1, 3), limit: int = 64) -> List[str]:
+    """
+    Word n-grams that neither start nor end with a stop word, most frequent
+    (then longest) first, never crossing a sentence boundary
+    """
+    counts: Counter = Counter()
+    for sentence in re.split(r'[.!?\n]+', document.lower()):
+        words = re.findall(r"[a-z0-9][a-z0-9']*", sentence)
+        for n in range(ngram_range[0], ngram_range[1] + 1):
+            for i in range(len(words) - n + 1):
+                gram = words[i:i + n]
+                if gram[0] not in STOP_WORDS and gram[-1] not in STOP_WORDS:
+                    counts[' '.join(gram)] += 1
+    ranked = sorted(counts, key=lambda p: (-counts[p], -len(p.split()), p))
+    return ranked[:limit]
+
+
+def _service_backend(embedding_service):
+    """Adapt an EmbeddingService to KeyBERT's backend interface, so candidates hit its cache"""
+    from keybert.backend import BaseEmbedder
+
+    class ServiceEmbedder(BaseEmbedder):
+        def embed(self, documents, verbose=False):
+            return embedding_service.encode(list(documents))
+
+    return ServiceEmbedder()
@@ -0,0 +1,40 @@
+"""
+Review ingestion: scraping, cleaning, checkpoints and storage
+
+Public classes are imported from their submodule on first access, so
+importing the package (or a light submodule such as the scraper) does not
+pull in pandas or pyarrow.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'FetchError': 'review_scraper',
+    'HttpReviewSource': 'review_scraper',
+    'PlayStoreReviewSource': 'review_scraper',
+    'ReviewScraper': 'review_scraper',
+    'AsyncReviewFetcher': 'async_fetcher',
+    'AppCheckpoint': 'checkpoint_store',
+    'CheckpointStore': 'checkpoint_store',
+    'IncrementalIngestor': 'checkpoint_store',
+    'DailyReservoir': 'review_sampler',
+    'ReviewStore': 'review_store',
+    'DataCleaner': 'data_cleaner',
+    'NearDuplicateFilter': 'near_duplicates',
+    'MockPlayStoreServer': 'mock_play_store',
+    'SyntheticCorpus': 'synthetic_corpus',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Async Fetcher - asyncio review client with a keep-alive pool and rate limits
+
+All apps fetched through one ``AsyncReviewFetcher`` share a single event
+loop and a bounded pool of persistent HTTP/1.1 connections, so page
+requests pipeline over a few sockets instead of paying a TCP handshake (and
+a blocked thread) each. Requests pass a token bucket per app and a global
+one; every request's latency lands in a histogram. Pagination progress is
+kept in a JSON-friendly cursor so an interrupted window resumes from its
+last delivered page.
+
+    fetcher = AsyncReviewFetcher('http://127.0.0.1:8765', rate=50, per_app_rate=10)
+    for review in fetcher.iter_reviews('in.swiggy.android', start, end):
+        ...
+    fetcher.close()
+
+``iter_reviews`` matches ``ReviewScraper.iter_reviews``, so the fetcher can
+stand in for the scraper anywhere; ``stream`` is the native async generator.
+"""
+
+import asyncio
+import bisect
+import json
+import random
+import threading
+import time
+import weakref
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+try:
+    from .review_scraper import FetchError, RETRYABLE_STATUS, ReviewScraper, day_windows
+except ImportError:
+    from review_scraper import FetchError, RETRYABLE_STATUS, ReviewScraper, day_windows
+
+# Upper bounds (seconds) of the latency histogram buckets; the last is open
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class HttpStatusError(Exception):
+    """Non-2xx response from the review endpoint"""
+
+    def __init__(self, status: int, url: str):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at ``rate`` tokens/s up to ``capacity``.
+
+    Callers reserve tokens up front and wait out any deficit, so concurrent
+    callers queue in arrival order without a loop-bound lock; the bucket
+    can be shared across event loops and threads.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens now and return how many seconds to wait before using them"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self, tokens: float = 1.0):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of request latencies in seconds"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (``max`` for the open bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets + (self.max,), self.counts):
+            seen += n
+            if seen >= rank and n:
+                return round(min(bound, self.max), 6)
+        return round(self.max, 6)
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{bound:g}" for bound in self.buckets] + ['inf']
+        return {
+            'count': self.count,
+            'mean_seconds': round(self.total / self.count, 6) if self.count else None,
+            'p50_seconds': self.quantile(0.5),
+            'p95_seconds': self.quantile(0.95),
+            'p99_seconds': self.quantile(0.99),
+            'max_seconds': round(self.max, 6),
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class ConnectionPool:
+    """
+    Bounded pool of keep-alive HTTP/1.1 connections to one host.
+
+    Only plain ``Content-Length`` responses are supported, which is what the
+    review endpoint sends. A pooled connection the server has since closed
+    is detected on reuse and replaced once. Connections and the
+    ``max_connections`` limit are kept per event loop, since asyncio
+    streams and semaphores cannot cross loops.
+    """
+
+    def __init__(self, host: str, port: int, max_connections: int = 8, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.stats = {'opened': 0, 'reused': 0}
+        # Semaphores and streams belong to one event loop: event loop -> (slots, idle connections)
+        self._loops: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]' = weakref.WeakKeyDictionary()
+
+    def _loop_state(self) -> Tuple[asyncio.Semaphore, List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]]:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = (asyncio.Semaphore(self.max_connections), [])
+        return state
+
+    async def get(self, path: str) -> Tuple[int, bytes]:
+        """GET ``path`` and return (status, body)"""
+        slots, idle = self._loop_state()
+        async with slots:
+            while idle:
+                connection = idle.pop()
+                try:
+                    return await self._round_trip(connection, path, idle, reused=True)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    continue  # went stale while idle
+            connection = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+            self.stats['opened'] += 1
+            return await self._round_trip(connection, path, idle, reused=False)
+
+    async def _round_trip(self, connection, path: str, idle: list, reused: bool) -> Tuple[int, bytes]:
+        reader, writer = connection
+        try:
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                         f"Connection: keep-alive\r\n\r\n".encode('ascii'))
+            status, keep_alive, body = await asyncio.wait_for(self._read_response(reader), self.timeout)
+        except BaseException:
+            writer.close()
+            raise
+        if reused:
+            self.stats['reused'] += 1
+        if keep_alive:
+            idle.append(connection)
+        else:
+            writer.close()
+        return status, body
+
+    @staticmethod
+    async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, bool, bytes]:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before the response")
+        version, status = status_line.decode('latin-1').split()[:2]
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        if 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+            keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return int(status), keep_alive, body
+
+    async def close(self):
+        """Close the running loop's idle connections"""
+        _, idle = self._loop_state()
+        idle, idle[:] = list(idle), []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+class AsyncReviewFetcher:
+    """
+    Asyncio client for the continuation-token review endpoint served by
+    ``mock_play_store.MockPlayStoreServer``.
+
+    A window is split into day slices paged by up to ``max_connections``
+    concurrent requests (shared by every app in flight). ``rate`` and
+    ``per_app_rate`` (requests/s, None for unlimited) feed a global and a
+    per-app token bucket; transient failures are retried with jittered
+    exponential backoff as in ``ReviewScraper``.
+    """
+
+    def __init__(self, base_url: str, page_size: int = 200, max_connections: int = 8,
+                 rate: Optional[float] = None, per_app_rate: Optional[float] = None,
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 timeout: float = 10.0):
+        url = urlsplit(base_url.rstrip('/'))
+        if url.scheme != 'http':
+            raise ValueError(f"AsyncReviewFetcher only speaks plain http, got {base_url!r}")
+        self.base_path = url.path
+        self.page_size = page_size
+        self.max_connections = max(1, max_connections)
+        self.per_app_rate = per_app_rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool = ConnectionPool(url.hostname, url.port or 80, self.max_connections, timeout)
+        self.rate_limit = TokenBucket(rate) if rate else None
+        self.app_rate_limits: Dict[str, TokenBucket] = {}
+        self.latency = LatencyHistogram()
+        self.app_latency: Dict[str, LatencyHistogram] = {}
+        self.stats = {'requests': 0, 'retries': 0, 'pages': 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+
+    async def fetch_page(self, app_id: str, start: datetime, end: datetime,
+                         token: Optional[str], count: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Fetch one page of raw reviews with rate limiting and retries; returns (reviews, next_token)"""
+        params = {'app_id': app_id, 'start': start.isoformat(), 'end': end.isoformat(), 'count': count}
+        if token:
+            params['token'] = token
+        path = f"{self.base_path}/reviews?{urlencode(params)}"
+        app_limit = self._app_rate_limit(app_id)
+        histogram = self.app_latency.setdefault(app_id, LatencyHistogram())
+
+        for attempt in range(self.max_retries + 1):
+            if app_limit is not None:
+                await app_limit.acquire()
+            if self.rate_limit is not None:
+                await self.rate_limit.acquire()
+            self.stats['requests'] += 1
+            started = time.perf_counter()
+            try:
+                status, body = await self.pool.get(path)
+                if status != 200:
+                    raise HttpStatusError(status, path)
+                payload = json.loads(body)
+                return payload.get('reviews', []), payload.get('nextToken')
+            except Exception as e:
+                retryable = (isinstance(e, HttpStatusError) and e.status in RETRYABLE_STATUS) or \
+                    isinstance(e, (ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError))
+                if not retryable or attempt == self.max_retries:
+                    raise FetchError(
+                        f"Failed to fetch reviews for {app_id} "
+                        f"({start:%Y-%m-%d}) after {attempt + 1} attempts: {e}"
+                    ) from e
+            finally:
+                elapsed = time.perf_counter() - started
+                self.latency.record(elapsed)
+                histogram.record(elapsed)
+            self.stats['retries'] += 1
+            delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    async def pages(self, app_id: str, start: datetime, end: datetime,
+                    cursor: Optional[Dict[str, Optional[str]]] = None
+                    ) -> AsyncIterator[Tuple[Tuple[datetime, datetime], List[Dict[str, Any]], Optional[str]]]:
+        """
+        Yield (window, normalized reviews, next_token) per page as pages arrive.
+
+        ``cursor`` maps each day slice (``window_key``) to the token of its
+        next undelivered page, or None once the slice is finished. It is
+        updated only after the consumer has taken a page, so persisting it
+        and passing it back resumes without losing or repeating pages.
+        """
+        cursor = {} if cursor is None else cursor
+        windows = iter([w for w in day_windows(start, end) if cursor.get(window_key(w), '') is not None])
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_connections)
+
+        async def page_window():
+            for window in windows:
+                token = cursor.get(window_key(window)) or None
+                while True:
+                    page, token = await self.fetch_page(app_id, window[0], window[1], token, self.page_size)
+                    await queue.put((window, page, token))
+                    if not token:
+                        break
+
+        async def produce():
+            workers = [asyncio.ensure_future(page_window()) for _ in range(self.max_connections)]
+            try:
+                await asyncio.gather(*workers)
+            except Exception as e:
+                # The other workers would otherwise keep paging, or wait forever on a full queue
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                await queue.put(e)
+            else:
+                await queue.put(None)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                window, page, token = item
+                self.stats['pages'] += 1
+                yield window, [ReviewScraper._normalize(raw, app_id) for raw in page], token
+                cursor[window_key(window)] = token or None
+        finally:
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+
+    async def stream(self, app_id: str, start: datetime, end: datetime,
+                     on_complete: Optional[Callable[[datetime, datetime], None]] = None,
+                     cursor: Optional[Dict[str, Optional[str]]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Async counterpart of ``iter_reviews``"""
+        async for window, reviews, token in self.pages(app_id, start, end, cursor):
+            for review in reviews:
+                yield review
+            if on_complete is not None and not token:
+                on_complete(*window)
+
+    def iter_reviews(self, app_id: str, start: datetime, end: datetime,
+                     on_complete: Optional[Callable[[datetime, datetime], None]] = None,
+                     cursor: Optional[Dict[str, Optional[str]]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield normalized reviews with ``start <= at < end`` from any thread.
+
+        Pages are fetched on the fetcher's background event loop, so
+        concurrent callers (e.g. one per app) share its connection pool and
+        global rate limit. ``on_complete`` is called as in
+        ``ReviewScraper.iter_reviews``; see ``pages`` for ``cursor``.
+        """
+        loop = self._ensure_loop()
+        pages = self.pages(app_id, start, end, cursor)
+        try:
+            while True:
+                try:
+                    window, reviews, token = asyncio.run_coroutine_threadsafe(pages.__anext__(), loop).result()
+                except StopAsyncIteration:
+                    return
+                yield from reviews
+                if on_complete is not None and not token:
+                    on_complete(*window)
+        finally:
+            asyncio.run_coroutine_threadsafe(pages.aclose(), loop).result()
+
+    def close(self):
+        """Close pooled connections and stop the background loop"""
+        with self._loop_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.pool.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _app_rate_limit(self, app_id: str) -> Optional[TokenBucket]:
+        if not self.per_app_rate:
+            return None
+        with self._loop_lock:
+            if app_id not in self.app_rate_limits:
+                self.app_rate_limits[app_id] = TokenBucket(self.per_app_rate)
+            return self.app_rate_limits[app_id]
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name='review-fetcher', daemon=True)
+                self._thread.start()
+            return self._loop
+
+
+def window_key(window: Tuple[datetime, datetime]) -> str:
+    """Cursor key of a day slice"""
+    return f"{window[0].isoformat()}/{window[1].isoformat()}"
+
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Checkpoint Store - per-app high-water marks for incremental daily ingestion
+"""
+
+import json
+import os
+import tempfile
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    from .review_sampler import DailyReservoir
+except ImportError:
+    from review_sampler import DailyReservoir
+
+
+class AppCheckpoint:
+    """
+    Ingestion state for one app.
+
+    Holds the committed high-water mark (timestamp of the newest ingested
+    review plus the IDs sharing that timestamp) and the topic×day counts
+    accumulated so far. The counts live next to the mark so both are
+    persisted together and a crash can never double count a review.
+
+    Counts are weighted sums (float) when reviews are sampled; they are
+    rounded only when a report is built. ``sampled_days`` records how many
+    reviews the per-day reservoir has kept for each day, so an increment
+    that continues a day resumes its sample.
+    """
+
+    def __init__(self, app_id: str, last_review_id: Optional[str] = None,
+                 last_timestamp: Optional[datetime] = None, boundary_ids: Iterable[str] = (),
+                 daily_counts: Optional[Dict[str, Dict[str, float]]] = None,
+                 sampled_days: Optional[Dict[str, int]] = None):
+        self.app_id = app_id
+        self.last_review_id = last_review_id
+        self.last_timestamp = last_timestamp
+        self.boundary_ids = set(boundary_ids)
+        self.daily_counts = daily_counts or {}
+        self.sampled_days = sampled_days or {}
+        self._pending = None
+
+    def resume_from(self, window_start: datetime) -> datetime:
+        """Earliest timestamp that still needs fetching for this window"""
+        if self.last_timestamp is None:
+            return window_start
+        return max(window_start, self.last_timestamp)
+
+    def is_new(self, review: Dict[str, Any]) -> bool:
+        """True if the review lies beyond the committed high-water mark"""
+        if self.last_timestamp is None:
+            return True
+        at = review['at']
+        if at != self.last_timestamp:
+            return at > self.last_timestamp
+        return review['review_id'] not in self.boundary_ids
+
+    def track(self, reviews: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield only new reviews while recording a pending high-water mark.
+
+        The mark is applied by ``commit`` once the reviews have been fully
+        processed, so an interrupted run simply re-fetches them next time.
+        """
+        pending = self._pending or {'at': self.last_timestamp, 'id': self.last_review_id,
+                                    'ids': set(self.boundary_ids)}
+        self._pending = pending
+        for review in reviews:
+            if not self.is_new(review):
+                continue
+            at = review['at']
+            if pending['at'] is None or at > pending['at']:
+                pending['at'], pending['id'], pending['ids'] = at, review['review_id'], {review['review_id']}
+            elif at == pending['at']:
+                pending['id'] = review['review_id']
+                pending['ids'].add(review['review_id'])
+            yield review
+
+    def add_counts(self, day: str, counts: Dict[str, float]):
+        """Append (weighted) topic counts for a day ('YYYY-MM-DD') to the matrix"""
+        day_counts = self.daily_counts.setdefault(day, {})
+        for topic, count in counts.items():
+            day_counts[topic] = day_counts.get(topic, 0) + count
+
+    def prune(self, before: datetime):
+        """Drop day columns (and sampler state) older than ``before``"""
+        cutoff = before.strftime('%Y-%m-%d')
+        for day in [d for d in self.daily_counts if d < cutoff]:
+            del self.daily_counts[day]
+        for day in [d for d in self.sampled_days if d < cutoff]:
+            del self.sampled_days[day]
+
+    def replace_days(self, other: 'AppCheckpoint', start: datetime, end: datetime):
+        """
+        Take over other's counts and sampler state for the days in
+        [start, end), and its committed high-water mark when that is newer
+        """
+        first, cutoff = start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+        for state, replacement in ((self.daily_counts, other.daily_counts), (self.sampled_days, other.sampled_days)):
+            for day in [d for d in state if first <= d < cutoff]:
+                del state[day]
+            state.update({d: v for d, v in replacement.items() if first <= d < cutoff})
+        if other.last_timestamp is None:
+            return
+        if self.last_timestamp is None or other.last_timestamp > self.last_timestamp:
+            self.last_timestamp = other.last_timestamp
+            self.last_review_id = other.last_review_id
+            self.boundary_ids = set(other.boundary_ids)
+        elif other.last_timestamp == self.last_timestamp:
+            self.boundary_ids |= other.boundary_ids
+
+    def commit(self):
+        """Move the high-water mark to the newest tracked review"""
+        if self._pending and self._pending['at'] is not None:
+            self.last_timestamp = self._pending['at']
+            self.last_review_id = self._pending['id']
+            self.boundary_ids = set(self._pending['ids'])
+        self._pending = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'app_id': self.app_id,
+            'last_review_id': self.last_review_id,
+            'last_timestamp': self.last_timestamp.isoformat() if self.last_timestamp else None,
+            'boundary_ids': sorted(self.boundary_ids),
+            'daily_counts': self.daily_counts,
+            'sampled_days': self.sampled_days,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AppCheckpoint':
+        last_timestamp = data.get('last_timestamp')
+        return cls(
+            data['app_id'],
+            last_review_id=data.get('last_review_id'),
+            last_timestamp=datetime.fromisoformat(last_timestamp) if last_timestamp else None,
+            boundary_ids=data.get('boundary_ids', ()),
+            daily_counts=data.get('daily_counts', {}),
+            sampled_days=data.get('sampled_days', {}),
+        )
+
+
+class CheckpointStore:
+    """
+    Persists one JSON checkpoint per app, written atomically
+    """
+
+    def __init__(self, directory: str = 'data/checkpoints'):
+        self.directory = directory
+
+    def _path(self, app_id: str) -> str:
+        return os.path.join(self.directory, f"{app_id}.json")
+
+    def exists(self, app_id: str) -> bool:
+        """True if a checkpoint has been saved for the app"""
+        return os.path.exists(self._path(app_id))
+
+    def load(self, app_id: str) -> AppCheckpoint:
+        """Load an app's checkpoint, or an empty one on first run"""
+        path = self._path(app_id)
+        if not os.path.exists(path):
+            return AppCheckpoint(app_id)
+        with open(path, encoding='utf-8') as f:
+            return AppCheckpoint.from_dict(json.load(f))
+
+    def save(self, checkpoint: AppCheckpoint):
+        """Write the checkpoint via a temp file and atomic rename"""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(checkpoint.to_dict(), f)
+            os.replace(tmp_path, self._path(checkpoint.app_id))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+class IncrementalIngestor:
+    """
+    Runs one daily increment: fetch only reviews past the high-water mark,
+    classify them in batches and append their counts to the stored matrix.
+
+    ``classify`` maps a list of review records to one topic key per review
+    (or None for reviews that match no topic); keys are stored as strings.
+    ``finalize`` is called with the checkpoint just before it is committed,
+    so callers can fold extra counts in or persist their own state. When a
+    ``review_store`` is given, each classified batch is also persisted
+    there; the files are staged and only published together with the
+    checkpoint.
+
+    Instead of ``classify`` an ``executor`` (``utils.pipeline.StagedPipeline``)
+    can be passed: batches are fed through its stages concurrently and its
+    last stage must return ``(batch, topics)``.
+
+    With ``max_reviews_per_day`` set, each day of the increment is reservoir
+    sampled down to that many reviews (see ``DailyReservoir``) before
+    batching; kept reviews count with their ``weight``. The sampler resumes
+    from the checkpoint's ``sampled_days``, so a day continued by a later
+    increment is not given a second full quota. The scraper must then
+    accept ``iter_reviews(..., on_complete=...)``.
+    """
+
+    def __init__(self, scraper, store: CheckpointStore, batch_size: int = 500, review_store=None,
+                 max_reviews_per_day: Optional[int] = None):
+        self.scraper = scraper
+        self.store = store
+        self.batch_size = batch_size
+        self.review_store = review_store
+        self.max_reviews_per_day = max_reviews_per_day
+        # app_id -> sampler of the app's latest increment, for stats
+        self.samplers: Dict[str, DailyReservoir] = {}
+
+    def run(self, app_id: str, window_start: datetime, window_end: datetime,
+            classify: Optional[Callable[[List[Dict[str, Any]]], List[Optional[Any]]]] = None,
+            finalize: Optional[Callable[[AppCheckpoint], None]] = None, executor=None) -> AppCheckpoint:
+        """Ingest new reviews for [window_start, window_end) and persist the checkpoint"""
+        checkpoint = self.store.load(app_id)
+        start = checkpoint.resume_from(window_start)
+        staged = self.review_store.stage() if self.review_store is not None else None
+
+        try:
+            if start < window_end:
+                sampler = None
+                if self.max_reviews_per_day:
+                    sampler = self.samplers[app_id] = DailyReservoir(
+                        self.max_reviews_per_day, start, window_end, app_id, kept_before=checkpoint.sampled_days)
+                    reviews = self.scraper.iter_reviews(app_id, start, window_end, on_complete=sampler.complete)
+                    stream = sampler.sample(checkpoint.track(reviews))
+                else:
+                    stream = checkpoint.track(self.scraper.iter_reviews(app_id, start, window_end))
+                batches = self._batches(stream)
+                if executor is not None:
+                    classified = executor.run(batches)
+                else:
+                    classified = ((batch, classify(batch)) for batch in batches)
+                for batch, topics in classified:
+                    self._record_batch(checkpoint, batch, topics, staged)
+                if sampler is not None:
+                    checkpoint.sampled_days = dict(sampler.kept)
+
+            if finalize is not None:
+                finalize(checkpoint)
+            checkpoint.prune(window_start)
+            checkpoint.commit()
+            if staged is not None:
+                staged.commit()
+            self.store.save(checkpoint)
+        except BaseException:
+            if staged is not None:
+                staged.abort()
+            raise
+        return checkpoint
+
+    def _batches(self, stream: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        batch = []
+        for review in stream:
+            batch.append(review)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def record_partition(self, checkpoint: AppCheckpoint, batch: List[Dict[str, Any]], topics, staged=None):
+        """
+        Count an already prepared and assigned batch into the checkpoint and
+        stage its reviews, as run does for each batch it fetches
+        """
+        self._record_batch(checkpoint, batch, topics, staged)
+
+    @staticmethod
+    def _record_batch(checkpoint: AppCheckpoint, batch: List[Dict[str, Any]], topics, staged=None):
+        topics = list(topics)
+        if staged is not None:
+            # Registry IDs go to topic_id, taxonomy labels to topic
+            topic_ids = [t if isinstance(t, int) and not isinstance(t, bool) else None for t in topics]
+            labels = [str(t) if t is not None and i is None else None for t, i in zip(topics, topic_ids)]
+            staged.write(pd.DataFrame(batch).assign(topic_id=pd.array(topic_ids, dtype='Int64'), topic=labels))
+        topics = [str(t) if t is not None else None for t in topics]
+        counts = defaultdict(lambda: defaultdict(float))
+        for review, topic in zip(batch, topics):
+            if topic is not None:
+                counts[review['at'].strftime('%Y-%m-%d')][topic] += review.get('weight', 1.0)
+        for day, day_counts in counts.items():
+            checkpoint.add_counts(day, dict(day_counts))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Data Cleaner - vectorized normalization and filtering of review text
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Patterns stick to syntax shared by Python's re and RE2, since pandas may
+# evaluate them on either engine depending on the string dtype
+URL_PATTERN = r'(?:https?://|www\.)\S+'
+EMOJI_PATTERN = (
+    '[\U0001F000-\U0001FAFF'   # pictographs, emoticons, transport, symbols
+    '\u2600-\u27BF'            # misc symbols and dingbats
+    '\u2B00-\u2BFF'            # arrows, stars
+    '\uFE0F\u200D]'            # variation selector, zero-width joiner
+)
+# Letters of common non-Latin scripts in Play Store reviews
+NON_LATIN_PATTERN = (
+    '[\u0370-\u03FF\u0400-\u04FF'   # Greek, Cyrillic
+    '\u0590-\u06FF'                 # Hebrew, Arabic
+    '\u0900-\u0DFF'                 # Indic scripts
+    '\u0E00-\u0E7F'                 # Thai
+    '\u3040-\u30FF\u4E00-\u9FFF\uAC00-\uD7AF]'   # Kana, CJK, Hangul
+)
+
+# spaCy pipelines loaded in this process, keyed by (model, disabled components)
+_SPACY_MODELS: Dict[tuple, Any] = {}
+_SPACY_LOCK = threading.Lock()
+
+
+class DataCleaner:
+    """
+    Cleans a whole frame of reviews at once with pandas string operations.
+
+    Steps: unicode NFKC normalization, URL and emoji stripping, whitespace
+    collapsing and lowercasing, then a script-based language filter, a minimum length filter and
+    exact-duplicate removal by review ID. No per-review Python loop runs
+    unless the optional spaCy tokenization is enabled, and that goes
+    through ``nlp.pipe`` with the heavy components disabled.
+    """
+
+    VERSION = 1
+
+    def __init__(self, min_length: int = 3, language: Optional[str] = 'en', min_latin_ratio: float = 0.6,
+                 use_spacy: bool = False, spacy_model: str = 'en_core_web_sm',
+                 spacy_disable: Sequence[str] = ('parser', 'ner', 'textcat'),
+                 spacy_processes: int = 1, spacy_batch_size: int = 1000):
+        self.min_length = min_length
+        self.language = language
+        self.min_latin_ratio = min_latin_ratio
+        self.use_spacy = use_spacy
+        self.spacy_model = spacy_model
+        self.spacy_disable = tuple(spacy_disable)
+        self.spacy_processes = spacy_processes
+        self.spacy_batch_size = spacy_batch_size
+
+    def normalize(self, text: pd.Series) -> pd.Series:
+        """Vectorized text normalization of a string Series"""
+        text = text.fillna('').astype(str).str.normalize('NFKC')
+        text = text.str.replace(URL_PATTERN, ' ', regex=True)
+        text = text.str.replace(EMOJI_PATTERN, ' ', regex=True)
+        text = text.str.replace(r'\s+', ' ', regex=True)
+        return text.str.strip().str.lower()
+
+    def language_mask(self, text: pd.Series) -> pd.Series:
+        """
+        Cheap script-based language filter: for English keep reviews whose
+        letters are mostly Latin (romanized Hinglish passes, Devanagari does not)
+        """
+        if self.language != 'en':
+            return pd.Series(True, index=text.index)
+        latin = text.str.count(r'[a-z]')
+        letters = latin + text.str.count(NON_LATIN_PATTERN)
+        ratio = latin / letters.replace(0, np.nan)
+        return ratio.fillna(0) >= self.min_latin_ratio
+
+    def clean(self, df: pd.DataFrame, text_column: str = 'content') -> pd.DataFrame:
+        """
+        Return the surviving rows of ``df`` with a ``clean_text`` column
+        (and ``tokens`` when spaCy is enabled)
+        """
+        if df.empty:
+            return df.assign(clean_text=pd.Series(dtype=str))
+
+        if 'review_id' in df.columns:
+            df = df.drop_duplicates(subset='review_id')
+        clean_text = self.normalize(df[text_column])
+        keep = (clean_text.str.len() >= self.min_length) & self.language_mask(clean_text)
+        df = df.loc[keep].assign(clean_text=clean_text[keep])
+
+        if self.use_spacy and not df.empty:
+            df = df.assign(tokens=self.tokenize(df['clean_text'].tolist()))
+        return df
+
+    def clean_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Record-list wrapper around ``clean`` for pipeline stages"""
+        if not records:
+            return []
+        return self.clean(pd.DataFrame.from_records(records)).to_dict('records')
+
+    def tokenize(self, texts: List[str]) -> List[List[str]]:
+        """Lemmatized content tokens per text, via ``nlp.pipe``"""
+        nlp = self._load_spacy()
+        return [
+            [t.lemma_ for t in doc if t.is_alpha and not t.is_stop]
+            for doc in nlp.pipe(texts, n_process=self.spacy_processes, batch_size=self.spacy_batch_size)
+        ]
+
+    def _load_spacy(self):
+        key = (self.spacy_model, self.spacy_disable)
+        with _SPACY_LOCK:
+            if key not in _SPACY_MODELS:
+                import spacy
+                _SPACY_MODELS[key] = spacy.load(self.spacy_model, disable=list(self.spacy_disable))
+            return _SPACY_MODELS[key]
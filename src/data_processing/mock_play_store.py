@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Play Store reviews endpoint.
+
+Serves deterministic synthetic reviews over HTTP using the same
+continuation-token protocol that ``HttpReviewSource`` speaks, so ingestion
+throughput can be tested and benchmarked offline.
+
+    GET /reviews?app_id=...&start=ISO&end=ISO&count=N[&token=T]
+    -> {"reviews": [...], "nextToken": "..." | null}
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Review phrasing grouped by the topics seen in the sample reports
+TOPIC_PHRASES = {
+    'Delivery issue': ["delivery was very late", "order delivered after two hours", "delivery never arrived"],
+    'Food stale': ["food was stale", "got stale food today", "the bread was not fresh"],
+    'Delivery partner rude': ["delivery guy was rude", "delivery partner behaved badly", "rude delivery boy"],
+    'Maps not working properly': ["maps not working properly", "location pin is wrong on the map", "map shows wrong address"],
+    'Instamart should be open all night': ["instamart should be open all night", "please keep instamart open 24 hours"],
+    'Bring back 10 minute bolt delivery': ["bring back 10 minute bolt delivery", "bolt delivery was the best, bring it back"],
+    'App crashing': ["app keeps crashing", "app crashes on checkout", "app freezes after update"],
+    'Payment problem': ["payment failed but money deducted", "upi payment not working"],
+    'Refund issue': ["refund not received yet", "still waiting for my refund"],
+}
+
+OPENERS = ["", "Worst experience. ", "Very disappointed, ", "Honestly ", "Please fix this: "]
+CLOSERS = ["", " Very bad service.", " Fix it soon!", " 😡", " Not ordering again."]
+
+
+def generate_review(app_id: str, day: datetime, index: int) -> dict:
+    """Build one deterministic review payload for (app, day, index)"""
+    rng = random.Random(f"{app_id}|{day:%Y%m%d}|{index}")
+    topic = rng.choice(list(TOPIC_PHRASES))
+    content = rng.choice(OPENERS) + rng.choice(TOPIC_PHRASES[topic]) + rng.choice(CLOSERS)
+    review_id = hashlib.md5(f"{app_id}|{day:%Y%m%d}|{index}".encode()).hexdigest()
+    at = day + timedelta(seconds=rng.randrange(86400))
+    return {
+        'reviewId': review_id,
+        'content': content,
+        'score': rng.randint(1, 3),
+        'thumbsUpCount': rng.randrange(20),
+        'at': at.isoformat(),
+    }
+
+
+class MockPlayStoreServer:
+    """
+    Threaded HTTP server serving synthetic review pages.
+
+    ``failure_rate`` makes that fraction of requests return HTTP 503 so the
+    client's backoff path is exercised; ``latency`` adds a fixed delay per
+    request to emulate network round trips.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, reviews_per_day: int = 500,
+                 failure_rate: float = 0.0, latency: float = 0.0, seed: int = 42):
+        self.reviews_per_day = reviews_per_day
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests_served = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Serve in a background thread and return the base URL"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def serve_forever(self):
+        """Serve in the calling thread until interrupted"""
+        self._httpd.serve_forever()
+
+    def stop(self):
+        """Shut the server down"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def expected_count(self, start: datetime, end: datetime) -> int:
+        """Number of reviews the server holds for a day-aligned [start, end)"""
+        return sum(self.reviews_per_day for _ in self._days(start, end))
+
+    def page(self, app_id: str, start: datetime, end: datetime, offset: int, count: int):
+        """Return (reviews, next_offset) for a window, ``next_offset`` is None at the end"""
+        reviews = []
+        position = 0
+        for day in self._days(start, end):
+            if position + self.reviews_per_day <= offset:
+                position += self.reviews_per_day
+                continue
+            for index in range(max(0, offset - position), self.reviews_per_day):
+                if len(reviews) == count:
+                    return reviews, position + index
+                review = generate_review(app_id, day, index)
+                if start <= datetime.fromisoformat(review['at']) < end:
+                    reviews.append(review)
+            position += self.reviews_per_day
+        return reviews, None
+
+    @staticmethod
+    def _days(start: datetime, end: datetime):
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < end:
+            yield day
+            day += timedelta(days=1)
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            self.requests_served += 1
+            return self.failure_rate > 0 and self._rng.random() < self.failure_rate
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so pooling clients can reuse connections
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != '/reviews':
+                    self._send(404, {'error': 'not found'})
+                    return
+                if server.latency:
+                    time.sleep(server.latency)
+                if server._should_fail():
+                    self._send(503, {'error': 'try again'})
+                    return
+
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                try:
+                    app_id = params['app_id']
+                    start = datetime.fromisoformat(params['start'])
+                    end = datetime.fromisoformat(params['end'])
+                    count = int(params.get('count', 200))
+                    offset = int(params.get('token', 0))
+                except (KeyError, ValueError) as e:
+                    self._send(400, {'error': f"bad request: {e}"})
+                    return
+
+                reviews, next_offset = server.page(app_id, start, end, offset, count)
+                self._send(200, {
+                    'reviews': reviews,
+                    'nextToken': str(next_offset) if next_offset is not None else None,
+                })
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local Play Store stand-in server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--reviews-per-day', type=int, default=500)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockPlayStoreServer(args.host, args.port, args.reviews_per_day,
+                                 args.failure_rate, args.latency)
+    print(f"🛰️  Mock Play Store serving at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Near Duplicates - MinHash LSH collapsing of copy-pasted and template reviews
+
+Runs on cleaned text, before embedding. Each review gets a MinHash
+signature over its character shingles; LSH bands find earlier reviews of
+the same day that probably look alike, and a review whose estimated Jaccard
+similarity to one of them reaches ``threshold`` is a near-duplicate of it.
+
+Within a batch, near-duplicates are dropped and their weight is added to
+the representative's ``weight``, so daily counts are unchanged while only
+one text is embedded. A near-duplicate of a representative from an earlier
+batch (already on its way through the pipeline) is kept with
+``embed_text`` set to the representative's text, which the embedding
+cache then serves without running the encoder.
+"""
+
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# MinHash permutations are a*x + b over the Mersenne prime 2^61 - 1
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class NearDuplicateFilter:
+    """
+    Per-day MinHash LSH index of representative reviews for one run.
+
+    ``num_perm`` hash functions are split into ``bands`` bands; two reviews
+    become candidates when any band matches, and near-duplicates when at
+    least ``threshold`` of their signature agrees. The filter is stateful
+    and meant for a single pipeline worker.
+    """
+
+    VERSION = 1
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 4, seed: int = 1):
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        # day -> {(band, band bytes): representative index}; day -> [(text, signature)]
+        self._buckets: Dict[str, Dict[Tuple[int, bytes], int]] = {}
+        self._representatives: Dict[str, List[Tuple[str, np.ndarray]]] = {}
+        self.stats = {'reviews': 0, 'collapsed': 0, 'reused': 0}
+
+    def shingles(self, text: str) -> List[str]:
+        """Overlapping character n-grams of the text without punctuation"""
+        text = ' '.join(re.sub(r'[^\w\s]+', ' ', text).split())
+        k = self.shingle_size
+        if len(text) <= k:
+            return [text]
+        return [text[i:i + k] for i in range(len(text) - k + 1)]
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (``num_perm`` uint64 values) of one text"""
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in set(self.shingles(text))), dtype=np.uint64)
+        # uint64 products wrap, which keeps the permutations cheap and still well mixed
+        with np.errstate(over='ignore'):
+            permuted = ((self._a[:, None] * hashes[None, :] + self._b[:, None]) % MERSENNE_PRIME) & MAX_HASH
+        return permuted.min(axis=1)
+
+    def find(self, day: str, signature: np.ndarray) -> Optional[int]:
+        """Index of the day's first representative this signature near-duplicates, if any"""
+        buckets = self._buckets.get(day)
+        if not buckets:
+            return None
+        representatives = self._representatives[day]
+        candidates = set()
+        for key in self._band_keys(signature):
+            if key in buckets:
+                candidates.add(buckets[key])
+        for index in sorted(candidates):
+            if np.mean(representatives[index][1] == signature) >= self.threshold:
+                return index
+        return None
+
+    def add(self, day: str, text: str, signature: np.ndarray) -> int:
+        """Register a new representative and return its index"""
+        representatives = self._representatives.setdefault(day, [])
+        buckets = self._buckets.setdefault(day, {})
+        index = len(representatives)
+        representatives.append((text, signature))
+        for key in self._band_keys(signature):
+            buckets.setdefault(key, index)
+        return index
+
+    def filter_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Collapse a batch of cleaned records (with ``at`` and ``clean_text``);
+        see the module docstring for what happens to near-duplicates
+        """
+        kept: List[Dict[str, Any]] = []
+        # (day, representative index) -> position in kept, for this batch's representatives
+        in_batch: Dict[Tuple[str, int], int] = {}
+        for record in records:
+            self.stats['reviews'] += 1
+            day = record['at'].strftime('%Y-%m-%d')
+            signature = self.signature(record['clean_text'])
+            index = self.find(day, signature)
+            if index is None:
+                in_batch[(day, self.add(day, record['clean_text'], signature))] = len(kept)
+                kept.append(record)
+            elif (day, index) in in_batch:
+                representative = kept[in_batch[(day, index)]]
+                representative['weight'] = _weight(representative) + _weight(record)
+                self.stats['collapsed'] += 1
+            else:
+                record['embed_text'] = self._representatives[day][index][0]
+                kept.append(record)
+                self.stats['reused'] += 1
+        return kept
+
+    def _band_keys(self, signature: np.ndarray):
+        rows = self.num_perm // self.bands
+        for band in range(self.bands):
+            yield band, signature[band * rows:(band + 1) * rows].tobytes()
+
+
+def _weight(record: Dict[str, Any]) -> float:
+    weight = record.get('weight')
+    return 1.0 if weight is None or weight != weight else float(weight)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Review Sampler - deterministic per-day reservoir sampling of a review stream
+
+Caps how many reviews of one day go through the pipeline, so a viral day
+costs the same memory and compute as a normal one. Each review's priority
+is a hash of (seed, review_id) and a day keeps the ``capacity`` reviews with
+the lowest priorities: a uniform random sample that is the same on every
+run and independent of the order pages arrive in. Kept reviews carry a
+``weight`` of seen / kept for their day, so weighted counts remain unbiased
+estimates of the day's true volume.
+
+A day can be split across increments (its later reviews are only posted
+after a run). The number of reviews each day has kept so far is passed to
+the next increment's reservoir as ``kept_before``, so the cap holds for
+the day as a whole rather than once per run.
+"""
+
+import hashlib
+import heapq
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class DailyReservoir:
+    """
+    Bottom-k sample per calendar day of reviews in [start, end).
+
+    A day's sample is released as soon as ``complete`` has been told that
+    every review of that day (within the window) has been seen, e.g. by
+    ``ReviewScraper.iter_reviews(on_complete=...)``; days still open when the
+    stream ends are released then. At most ``capacity`` reviews are held per
+    open day, whatever the day's volume.
+
+    ``kept_before`` maps days to reviews kept by earlier increments; such a
+    day only samples its remaining capacity, and at least one review so the
+    new reviews' volume is still counted. ``kept`` holds the cumulative
+    totals to hand to the next increment. A review whose ID is already in
+    its day's sample (pages can overlap) is ignored.
+    """
+
+    def __init__(self, capacity: int, start: datetime, end: datetime, seed: Any = 0,
+                 kept_before: Optional[Dict[str, int]] = None):
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        self.capacity = capacity
+        self.start = start
+        self.end = end
+        self.seed = str(seed)
+        self.seen: Dict[str, int] = {}
+        self.kept: Dict[str, int] = dict(kept_before or {})
+        self._heaps: Dict[str, List[Tuple[int, str, Dict[str, Any]]]] = {}
+        self._heap_ids: Dict[str, Set[str]] = {}
+        self._kept_before = sum(self.kept.values())
+        # Reviews seen per open day since its last release
+        self._open_seen: Dict[str, int] = {}
+        self._complete: List[Tuple[datetime, datetime]] = []
+        self._ready: Deque[Dict[str, Any]] = deque()
+
+    def priority(self, review: Dict[str, Any]) -> int:
+        digest = hashlib.blake2b(f"{self.seed}|{review['review_id']}".encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+
+    def day_capacity(self, day: str) -> int:
+        """Reviews the day may still keep, given what earlier increments kept"""
+        return max(1, self.capacity - self.kept.get(day, 0))
+
+    def add(self, review: Dict[str, Any]):
+        day = review['at'].strftime('%Y-%m-%d')
+        heap_ids = self._heap_ids.setdefault(day, set())
+        if review['review_id'] in heap_ids:
+            return
+        self.seen[day] = self.seen.get(day, 0) + 1
+        self._open_seen[day] = self._open_seen.get(day, 0) + 1
+        # Max-heap on priority via negation; IDs in a heap are unique, so entries never tie
+        entry = (-self.priority(review), review['review_id'], review)
+        heap = self._heaps.setdefault(day, [])
+        if len(heap) < self.day_capacity(day):
+            heapq.heappush(heap, entry)
+            heap_ids.add(entry[1])
+        elif entry > heap[0]:
+            heap_ids.discard(heapq.heapreplace(heap, entry)[1])
+            heap_ids.add(entry[1])
+
+    def complete(self, lo: datetime, hi: datetime):
+        """Record that every review with ``lo <= at < hi`` has been added"""
+        self._complete = _merge(self._complete + [(lo, hi)])
+        for day in sorted(self._heaps):
+            day_start = datetime.strptime(day, '%Y-%m-%d')
+            if self._covered(max(day_start, self.start), min(day_start + timedelta(days=1), self.end)):
+                self._ready.extend(self._release(day))
+
+    def sample(self, reviews: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield the sampled reviews, each day's as soon as the day is complete"""
+        for review in reviews:
+            self.add(review)
+            while self._ready:
+                yield self._ready.popleft()
+        while self._ready:
+            yield self._ready.popleft()
+        for day in sorted(self._heaps):
+            yield from self._release(day)
+
+    @property
+    def dropped(self) -> int:
+        kept = sum(self.kept.values()) - self._kept_before
+        return sum(self.seen.values()) - kept - sum(len(h) for h in self._heaps.values())
+
+    def _release(self, day: str) -> List[Dict[str, Any]]:
+        heap = self._heaps.pop(day)
+        self._heap_ids.pop(day, None)
+        weight = self._open_seen.pop(day) / len(heap)
+        self.kept[day] = self.kept.get(day, 0) + len(heap)
+        return [dict(review, weight=weight) for _, _, review in sorted(heap, key=lambda e: e[2]['at'])]
+
+    def _covered(self, lo: datetime, hi: datetime) -> bool:
+        return any(a <= lo and hi <= b for a, b in self._complete)
+
+
+def _merge(intervals: List[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    merged: List[Tuple[datetime, datetime]] = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
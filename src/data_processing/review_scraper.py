@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Review Scraper - streaming, paginated Play Store review ingestion
+"""
+
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+# HTTP status codes worth retrying with backoff
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """Raised when a review page cannot be fetched after all retries"""
+
+
+class HttpReviewSource:
+    """
+    Fetches review pages from a JSON endpoint speaking the continuation-token
+    protocol served by ``mock_play_store.MockPlayStoreServer``
+    """
+
+    # Each (app, day) window can be paged independently
+    supports_windows = True
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def fetch_page(self, app_id: str, start: datetime, end: datetime,
+                   token: Optional[str], count: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Fetch one page of reviews; returns (reviews, next_token)"""
+        params = {
+            'app_id': app_id,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'count': count,
+        }
+        if token:
+            params['token'] = token
+        url = f"{self.base_url}/reviews?{urlencode(params)}"
+        with urlopen(url, timeout=self.timeout) as response:
+            payload = json.load(response)
+        return payload.get('reviews', []), payload.get('nextToken')
+
+
+class PlayStoreReviewSource:
+    """
+    Fetches reviews from the Play Store through google-play-scraper.
+
+    The Play Store only pages newest-first, so a date window is a single
+    continuation chain that stops once it walks past the window start.
+    """
+
+    supports_windows = False
+
+    def __init__(self, lang: str = 'en', country: str = 'in'):
+        self.lang = lang
+        self.country = country
+
+    def fetch_page(self, app_id: str, start: datetime, end: datetime,
+                   token: Optional[Any], count: int) -> Tuple[List[Dict[str, Any]], Optional[Any]]:
+        """Fetch one page of reviews; returns (reviews, next_token)"""
+        from google_play_scraper import Sort, reviews
+
+        result, next_token = reviews(
+            app_id,
+            lang=self.lang,
+            country=self.country,
+            sort=Sort.NEWEST,
+            count=count,
+            continuation_token=token,
+        )
+        if not result:
+            return [], None
+
+        page = [r for r in result if start <= r['at'] < end]
+        if result[-1]['at'] < start:
+            next_token = None
+        return page, next_token
+
+
+class ReviewScraper:
+    """
+    Streams reviews for one app and date window.
+
+    The window is split into day slices that are paged concurrently on a
+    bounded thread pool; each slice follows its own continuation chain.
+    Reviews are yielded as pages arrive, so at most ``max_workers`` pages are
+    held in memory regardless of the window size.
+    """
+
+    def __init__(self, source=None, page_size: int = 200, max_workers: int = 4,
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 8.0):
+        self.source = source or PlayStoreReviewSource()
+        self.page_size = page_size
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def iter_reviews(self, app_id: str, start: datetime, end: datetime,
+                     on_complete: Optional[Callable[[datetime, datetime], None]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield normalized review records with ``start <= at < end``.
+
+        ``on_complete(lo, hi)`` is called once every review with
+        ``lo <= at < hi`` has been yielded: after the last page of a day
+        slice, or for newest-first sources after each page.
+        """
+        windowed = getattr(self.source, 'supports_windows', False)
+        windows = iter(self._split_windows(start, end))
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = {}
+
+        def submit(window, token=None):
+            future = pool.submit(self._fetch_with_backoff, app_id, window, token)
+            pending[future] = window
+
+        try:
+            for window in islice(windows, self.max_workers):
+                submit(window)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window = pending.pop(future)
+                    page, next_token = future.result()
+
+                    # Keep the pool busy before handing the page to the consumer
+                    if next_token:
+                        submit(window, next_token)
+                    else:
+                        next_window = next(windows, None)
+                        if next_window is not None:
+                            submit(next_window)
+
+                    oldest = None
+                    for raw in page:
+                        review = self._normalize(raw, app_id)
+                        oldest = review['at'] if oldest is None else min(oldest, review['at'])
+                        yield review
+                    if on_complete is not None:
+                        if not next_token:
+                            on_complete(*window)
+                        elif not windowed and oldest is not None:
+                            # Newest-first chain: later pages only hold reviews at or before oldest
+                            on_complete(oldest + timedelta(microseconds=1), window[1])
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _split_windows(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Split [start, end) into day slices when the source supports it"""
+        if not getattr(self.source, 'supports_windows', False):
+            return [(start, end)]
+        return day_windows(start, end)
+
+    def _fetch_with_backoff(self, app_id: str, window: Tuple[datetime, datetime], token):
+        """Fetch a page, retrying transient failures with jittered exponential backoff"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.source.fetch_page(app_id, window[0], window[1], token, self.page_size)
+            except Exception as e:
+                if not _is_retryable(e) or attempt == self.max_retries:
+                    raise FetchError(
+                        f"Failed to fetch reviews for {app_id} "
+                        f"({window[0]:%Y-%m-%d}) after {attempt + 1} attempts: {e}"
+                    ) from e
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+    @staticmethod
+    def _normalize(raw: Dict[str, Any], app_id: str) -> Dict[str, Any]:
+        """Map a Play Store review payload onto the pipeline's record layout"""
+        at = raw.get('at')
+        if isinstance(at, str):
+            at = datetime.fromisoformat(at)
+        return {
+            'review_id': raw.get('reviewId'),
+            'app_id': app_id,
+            'at': at,
+            'content': raw.get('content') or '',
+            'score': raw.get('score'),
+            'thumbs_up': raw.get('thumbsUpCount', 0),
+        }
+
+
+def day_windows(start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+    """Split [start, end) into consecutive slices of at most one day"""
+    windows = []
+    cursor = start
+    while cursor < end:
+        upper = min(cursor + timedelta(days=1), end)
+        windows.append((cursor, upper))
+        cursor = upper
+    return windows
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Decide whether a fetch failure is transient"""
+    if isinstance(error, HTTPError):
+        return error.code in RETRYABLE_STATUS
+    return isinstance(error, (URLError, ConnectionError, TimeoutError))
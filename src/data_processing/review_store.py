@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Review Store - columnar Parquet storage partitioned by app and day
+
+Layout::
+
+    <root>/app_id=<app>/date=<YYYY-MM-DD>/part-<uuid>.parquet
+
+Reads go through a pyarrow dataset restricted to one app directory, so the
+date filter prunes whole partitions and only the requested columns are
+decoded from the files that remain.
+"""
+
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+import pandas as pd
+
+# Columns written for every review; topic columns are filled once assigned:
+# topic_id for topics discovered into the registry, topic for taxonomy labels.
+# weight is how many reviews a sampled review stands for (null means 1).
+REVIEW_COLUMNS = ['review_id', 'at', 'content', 'clean_text', 'score', 'thumbs_up', 'topic_id', 'topic', 'weight']
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("ReviewStore needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def _review_schema(pa):
+    """Fixed file schema so partitions written at different stages stay compatible"""
+    return pa.schema([
+        ('review_id', pa.string()),
+        ('at', pa.timestamp('us')),
+        ('content', pa.string()),
+        ('clean_text', pa.string()),
+        ('score', pa.int64()),
+        ('thumbs_up', pa.int64()),
+        ('topic_id', pa.int64()),
+        ('topic', pa.string()),
+        ('weight', pa.float64()),
+    ])
+
+
+class ReviewStore:
+    """
+    Partitioned Parquet store for cleaned reviews and their topic assignments
+    """
+
+    def __init__(self, root: str = 'data/reviews', compression: str = 'zstd'):
+        self.root = root
+        self.compression = compression
+
+    def _partition_dir(self, app_id: str, day: str, root: Optional[str] = None) -> str:
+        return os.path.join(root or self.root, f"app_id={app_id}", f"date={day}")
+
+    def write(self, df: pd.DataFrame, mode: str = 'append') -> List[str]:
+        """
+        Write reviews, one file per (app_id, day) partition.
+
+        ``df`` needs ``app_id`` and ``at`` columns. With ``mode='overwrite'``
+        the touched partitions are replaced instead of appended to.
+        """
+        return self._write(df, self.root, mode)
+
+    def stage(self, mode: str = 'append', app_id: Optional[str] = None,
+              start: Optional[datetime] = None, end: Optional[datetime] = None) -> 'StagedWrite':
+        """
+        Start a write that only becomes visible on ``commit``; with
+        ``mode='overwrite'`` the committed partitions replace what is stored.
+
+        Giving ``app_id``, ``start`` and ``end`` to an overwrite clears every
+        stored day of the app in [start, end) on commit, including days the
+        run wrote nothing for.
+        """
+        return StagedWrite(self, mode, app_id, start, end)
+
+    def _write(self, df: pd.DataFrame, root: str, mode: str) -> List[str]:
+        pa = _require_pyarrow()
+        if df.empty:
+            return []
+
+        frame = df.reindex(columns=['app_id'] + REVIEW_COLUMNS)
+        frame['at'] = pd.to_datetime(frame['at'])
+        days = frame['at'].dt.strftime('%Y-%m-%d')
+
+        schema = _review_schema(pa)
+        written = []
+        for (app_id, day), part in frame.groupby([frame['app_id'], days], sort=False):
+            directory = self._partition_dir(app_id, day, root)
+            if mode == 'overwrite' and os.path.isdir(directory):
+                shutil.rmtree(directory)
+            os.makedirs(directory, exist_ok=True)
+
+            path = os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet")
+            table = pa.Table.from_pandas(part.drop(columns='app_id'), schema=schema, preserve_index=False)
+            pa.parquet.write_table(table, path, compression=self.compression)
+            written.append(path)
+        return written
+
+    def read(self, app_id: str, start: datetime, end: datetime,
+             columns: Optional[Sequence[str]] = None, filter=None) -> pd.DataFrame:
+        """
+        Read reviews for [start, end), loading only the given columns.
+
+        ``filter`` is an optional extra ``pyarrow.dataset`` expression that is
+        pushed down into the scan, e.g. ``ds.field('score') <= 2``.
+        """
+        pa = _require_pyarrow()
+        ds = pa.dataset
+        schema = _review_schema(pa).append(pa.field('date', pa.string()))
+        app_dir = os.path.join(self.root, f"app_id={app_id}")
+        if not os.path.isdir(app_dir):
+            # Typed like a real read, so callers can use e.g. the .dt accessor
+            empty = schema.empty_table()
+            return (empty.select(list(columns)) if columns else empty).to_pandas()
+
+        partitioning = ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive')
+        dataset = ds.dataset(app_dir, schema=schema, format='parquet', partitioning=partitioning)
+
+        last_day = (end - timedelta(microseconds=1)).strftime('%Y-%m-%d')
+        expression = (ds.field('date') >= start.strftime('%Y-%m-%d')) & (ds.field('date') <= last_day)
+        if filter is not None:
+            expression = expression & filter
+
+        table = dataset.to_table(columns=list(columns) if columns else None, filter=expression)
+        return table.to_pandas()
+
+    def daily_topic_counts(self, app_id: str, start: datetime, end: datetime) -> pd.DataFrame:
+        """
+        Topics × days count frame for [start, end), read from the topic,
+        date and weight columns only; sampled reviews count with their weight.
+        Rows are taxonomy labels or, for discovered topics, the topic ID as a
+        string.
+        """
+        df = self.read(app_id, start, end, columns=['date', 'topic_id', 'topic', 'weight'])
+        topic = df['topic'].astype(object).where(df['topic'].notna(), df['topic_id'].astype('Int64').astype(str))
+        df = df[df['topic'].notna() | df['topic_id'].notna()]
+        if df.empty:
+            return pd.DataFrame()
+        counts = df['weight'].fillna(1.0).groupby([topic[df.index], df['date']]).sum()
+        return counts.round().astype('int64').unstack(fill_value=0)
+
+    def partitions(self, app_id: str) -> List[str]:
+        """List stored days ('YYYY-MM-DD') for an app"""
+        app_dir = os.path.join(self.root, f"app_id={app_id}")
+        if not os.path.isdir(app_dir):
+            return []
+        return sorted(name.split('=', 1)[1] for name in os.listdir(app_dir) if name.startswith('date='))
+
+    def compact(self, app_id: str, day: str) -> Optional[str]:
+        """Merge a partition's small files into a single file"""
+        pa = _require_pyarrow()
+        directory = self._partition_dir(app_id, day)
+        files = sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith('.parquet'))
+        if len(files) <= 1:
+            return files[0] if files else None
+
+        table = pa.concat_tables([pa.parquet.read_table(f) for f in files])
+        path = os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet")
+        pa.parquet.write_table(table, path, compression=self.compression)
+        for f in files:
+            os.remove(f)
+        return path
+
+
+class StagedWrite:
+    """
+    Buffers partition files in a staging directory and moves them into the
+    store in one step, so readers never see a half-finished run
+    """
+
+    def __init__(self, store: ReviewStore, mode: str = 'append', app_id: Optional[str] = None,
+                 start: Optional[datetime] = None, end: Optional[datetime] = None):
+        if mode not in ('append', 'overwrite'):
+            raise ValueError(f"Unknown write mode: {mode}")
+        if (app_id, start, end).count(None) not in (0, 3):
+            raise ValueError("An overwrite range needs app_id, start and end")
+        self.store = store
+        self.mode = mode
+        self.app_id = app_id
+        self.start = start
+        self.end = end
+        self.staging_root = os.path.join(store.root, '_staging', uuid.uuid4().hex)
+
+    def write(self, df: pd.DataFrame) -> List[str]:
+        return self.store._write(df, self.staging_root, 'append')
+
+    def commit(self):
+        """Move staged files into their partitions"""
+        if self.mode == 'overwrite' and self.app_id is not None:
+            first, last = self.start.strftime('%Y-%m-%d'), (self.end - timedelta(microseconds=1)).strftime('%Y-%m-%d')
+            for day in self.store.partitions(self.app_id):
+                if first <= day <= last:
+                    shutil.rmtree(self.store._partition_dir(self.app_id, day))
+        if not os.path.isdir(self.staging_root):
+            return
+        for dirpath, _, filenames in os.walk(self.staging_root):
+            relative = os.path.relpath(dirpath, self.staging_root)
+            target_dir = os.path.join(self.store.root, relative)
+            if filenames and self.mode == 'overwrite' and os.path.isdir(target_dir):
+                for name in os.listdir(target_dir):
+                    if name.endswith('.parquet'):
+                        os.remove(os.path.join(target_dir, name))
+            for name in filenames:
+                os.makedirs(target_dir, exist_ok=True)
+                os.replace(os.path.join(dirpath, name), os.path.join(target_dir, name))
+        self.abort()
+
+    def abort(self):
+        """Discard anything staged"""
+        shutil.rmtree(self.staging_root, ignore_errors=True)
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Synthetic Play Store review corpus for benchmarks
+
+Topics and their relative frequencies come from the trend reports in
+``outputs/*.csv``. Each generated review is a fresh complaint, an exact
+duplicate of an earlier review, or a paraphrase of one, at configurable
+rates, and carries its ground-truth topic so clustering quality can be
+checked alongside speed.
+"""
+
+import csv
+import glob
+import hashlib
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+try:
+    from .mock_play_store import CLOSERS, OPENERS, TOPIC_PHRASES
+except ImportError:
+    from mock_play_store import CLOSERS, OPENERS, TOPIC_PHRASES
+
+DEFAULT_REPORTS = 'outputs/*.csv'
+
+# Word substitutions used to paraphrase a review
+SYNONYMS = {
+    'very': ['really', 'extremely', 'so'],
+    'late': ['delayed', 'slow', 'behind schedule'],
+    'delivery': ['order', 'delivery'],
+    'delivered': ['brought', 'dropped off'],
+    'never': ['not once', 'never ever'],
+    'arrived': ['came', 'showed up'],
+    'food': ['meal', 'food'],
+    'stale': ['old', 'not fresh', 'spoiled'],
+    'rude': ['impolite', 'disrespectful', 'arrogant'],
+    'guy': ['person', 'executive'],
+    'boy': ['person', 'agent'],
+    'badly': ['poorly', 'rudely'],
+    'wrong': ['incorrect', 'inaccurate'],
+    'map': ['maps', 'navigation'],
+    'app': ['application', 'app'],
+    'crashing': ['crashes', 'closing by itself'],
+    'crashes': ['crashes', 'force closes'],
+    'freezes': ['hangs', 'gets stuck'],
+    'failed': ['did not go through', 'failed'],
+    'money': ['amount', 'cash'],
+    'refund': ['money back', 'refund amount'],
+    'waiting': ['still waiting', 'waiting'],
+    'please': ['kindly', 'please'],
+    'poor': ['bad', 'terrible', 'awful'],
+    'issue': ['problem', 'issue'],
+    'missing': ['not included', 'absent'],
+    'damaged': ['broken', 'torn'],
+    'cancelled': ['canceled', 'called off'],
+}
+
+DETAILS = ["", " Order #{n}.", " Happened {n} times now.", " Since {n} days.", " Lost {n} rupees.",
+           " Area pin {n}.", " Third time this week.", " Support did nothing."]
+
+
+def load_topic_vocabulary(pattern: str = DEFAULT_REPORTS) -> Dict[str, float]:
+    """
+    Topic name -> total count over every report matching ``pattern`` (topics
+    in the first column, daily counts after it). Falls back to the mock
+    server's topics with equal weight when no report is found.
+    """
+    totals: Dict[str, float] = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = csv.reader(f)
+            next(rows, None)
+            for row in rows:
+                if not row or not row[0]:
+                    continue
+                try:
+                    count = sum(float(v) for v in row[1:] if v)
+                except ValueError:
+                    continue
+                totals[row[0]] = totals.get(row[0], 0.0) + count
+    return totals or {topic: 1.0 for topic in TOPIC_PHRASES}
+
+
+def paraphrase(text: str, rng: random.Random) -> str:
+    """Reword a complaint with synonym swaps and a new opener/closer"""
+    words = [rng.choice(SYNONYMS[w]) if w in SYNONYMS and rng.random() < 0.6 else w
+             for w in text.lower().split()]
+    return rng.choice(OPENERS) + ' '.join(words) + rng.choice(CLOSERS)
+
+
+class SyntheticCorpus:
+    """
+    Deterministic generator of review records for a given seed.
+
+    ``duplicate_rate`` of the reviews repeat an earlier review's text
+    verbatim and ``paraphrase_rate`` reword an earlier review of the same
+    topic; the rest are fresh. Records use the scraper's normalized keys plus
+    ``topic`` (ground truth) and ``kind`` ('fresh', 'duplicate' or
+    'paraphrase'). Timestamps rise evenly over ``days`` days from ``start``.
+    """
+
+    def __init__(self, topics: Optional[Dict[str, float]] = None, duplicate_rate: float = 0.1,
+                 paraphrase_rate: float = 0.2, start: datetime = datetime(2024, 6, 1), days: int = 30,
+                 app_id: str = 'in.swiggy.android', seed: int = 0, memory: int = 5000):
+        if duplicate_rate + paraphrase_rate > 1:
+            raise ValueError("duplicate_rate + paraphrase_rate must not exceed 1")
+        self.topics = topics if topics is not None else load_topic_vocabulary()
+        self.duplicate_rate = duplicate_rate
+        self.paraphrase_rate = paraphrase_rate
+        self.start = start
+        self.days = days
+        self.app_id = app_id
+        self.seed = seed
+        # How many recent fresh reviews duplicates and paraphrases draw from
+        self.memory = memory
+        self.phrases = {
+            topic: TOPIC_PHRASES.get(topic) or [topic.lower(), f"{topic.lower()} again", f"{topic.lower()} every time"]
+            for topic in self.topics
+        }
+
+    def iter_reviews(self, n: int) -> Iterator[dict]:
+        rng = random.Random(self.seed)
+        names = list(self.topics)
+        cumulative = []
+        total = 0.0
+        for name in names:
+            total += max(self.topics[name], 0.0) or 1.0
+            cumulative.append(total)
+        recent: List[tuple] = []
+        seconds = self.days * 86400
+
+        for i in range(n):
+            roll = rng.random()
+            if recent and roll < self.duplicate_rate:
+                topic, _, content = rng.choice(recent)
+                kind = 'duplicate'
+            elif recent and roll < self.duplicate_rate + self.paraphrase_rate:
+                topic, core, _ = rng.choice(recent)
+                content = paraphrase(core, rng)
+                kind = 'paraphrase'
+            else:
+                topic = rng.choices(names, cum_weights=cumulative)[0]
+                core = rng.choice(self.phrases[topic]) + rng.choice(DETAILS).format(n=rng.randrange(2, 9999))
+                content = rng.choice(OPENERS) + core + rng.choice(CLOSERS)
+                kind = 'fresh'
+                if len(recent) < self.memory:
+                    recent.append((topic, core, content))
+                else:
+                    recent[rng.randrange(self.memory)] = (topic, core, content)
+
+            yield {
+                'review_id': hashlib.md5(f"{self.seed}|{i}".encode()).hexdigest(),
+                'app_id': self.app_id,
+                'at': self.start + timedelta(seconds=i * seconds // max(n, 1)),
+                'content': content,
+                'score': rng.randint(1, 3),
+                'thumbs_up': rng.randrange(20),
+                'topic': topic,
+                'kind': kind,
+            }
+
+    def batches(self, n: int, batch_size: int = 10000) -> Iterator[List[dict]]:
+        batch = []
+        for review in self.iter_reviews(n):
+            batch.append(review)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def frame(self, n: int):
+        """The corpus as a DataFrame"""
+        import pandas as pd
+        return pd.DataFrame.from_records(list(self.iter_reviews(n)))
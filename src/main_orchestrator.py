@@ -3,11 +3,81 @@
 Main Orchestrator for PulseGen AI Agent
 """
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from itertools import islice
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 import os
+import re
 import sys
+import time
+
+try:
+    from .data_processing.review_scraper import ReviewScraper, HttpReviewSource, PlayStoreReviewSource
+    from .data_processing.async_fetcher import AsyncReviewFetcher
+    from .data_processing.checkpoint_store import AppCheckpoint, CheckpointStore, IncrementalIngestor
+    from .data_processing.review_sampler import DailyReservoir
+    from .data_processing.review_store import ReviewStore
+    from .data_processing.data_cleaner import DataCleaner
+    from .data_processing.near_duplicates import NearDuplicateFilter
+    from .agentic_ai.topic_analyzer import EmbeddingService, OnnxEncoder, TaxonomyClassifier
+    from .agentic_ai.topic_discoverer import OnlineTopicDiscoverer, TopicRegistry
+    from .agentic_ai.topic_labeler import TopicLabeler
+    from .utils.pipeline import Stage, StagedPipeline, max_items_in_flight
+    from .trend_analysis.topic_matrix import TopicDayMatrix
+    from .trend_analysis.report_generator import ReportGenerator
+    from .utils.metrics import RunMetrics
+    from .utils.config import get_config
+    from .utils.artifact_cache import ArtifactCache, fingerprint
+except ImportError:
+    from data_processing.review_scraper import ReviewScraper, HttpReviewSource, PlayStoreReviewSource
+    from data_processing.async_fetcher import AsyncReviewFetcher
+    from data_processing.checkpoint_store import AppCheckpoint, CheckpointStore, IncrementalIngestor
+    from data_processing.review_sampler import DailyReservoir
+    from data_processing.review_store import ReviewStore
+    from data_processing.data_cleaner import DataCleaner
+    from data_processing.near_duplicates import NearDuplicateFilter
+    from agentic_ai.topic_analyzer import EmbeddingService, OnnxEncoder, TaxonomyClassifier
+    from agentic_ai.topic_discoverer import OnlineTopicDiscoverer, TopicRegistry
+    from agentic_ai.topic_labeler import TopicLabeler
+    from utils.pipeline import Stage, StagedPipeline, max_items_in_flight
+    from trend_analysis.topic_matrix import TopicDayMatrix
+    from trend_analysis.report_generator import ReportGenerator
+    from utils.metrics import RunMetrics
+    from utils.config import get_config
+    from utils.artifact_cache import ArtifactCache, fingerprint
+
+# Play Store package names, e.g. in.swiggy.android
+APP_ID_PATTERN = re.compile(r'^[A-Za-z][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)+$')
+
+# Rough memory per review: the raw record, and with its cleaned text and embedding
+REVIEW_RECORD_BYTES = 2048
+REVIEW_BYTES = 4096
+
+# Review store columns a rebuild starts from
+RAW_COLUMNS = ['review_id', 'at', 'content', 'score', 'thumbs_up', 'weight']
+# Bump when the way rebuilt assignments are turned into daily counts changes
+COUNTS_VERSION = 2
+
+class AppReport:
+    """
+    Outcome of one app in a batch run: the report, or the error that stopped it
+    """
+    
+    def __init__(self, app_id: str, report: Optional[pd.DataFrame] = None,
+                 error: Optional[str] = None, elapsed: float = 0.0, metrics: Optional[RunMetrics] = None):
+        self.app_id = app_id
+        self.report = report
+        self.error = error
+        self.elapsed = elapsed
+        self.metrics = metrics
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 class TrendAnalysisOrchestrator:
     """
@@ -16,47 +86,764 @@ class TrendAnalysisOrchestrator:
     
     def __init__(self, config=None):
         self.config = config or self._create_default_config()
+        self.review_scraper = self._create_review_scraper()
+        self.checkpoint_store = CheckpointStore(getattr(self.config, 'checkpoint_dir', 'data/checkpoints'))
+        self.review_store = self._create_review_store()
+        self.ingestor = IncrementalIngestor(
+            self.review_scraper,
+            self.checkpoint_store,
+            batch_size=self._ingest_batch_size(),
+            review_store=self.review_store,
+            max_reviews_per_day=getattr(self.config, 'max_reviews_per_day', None),
+        )
+        self.data_cleaner = DataCleaner(
+            min_length=getattr(self.config, 'cleaner_min_length', 3),
+            language=getattr(self.config, 'cleaner_language', 'en'),
+            use_spacy=getattr(self.config, 'use_spacy', False),
+        )
+        self.embedding_service = EmbeddingService(
+            model_name=getattr(self.config, 'embedding_model', 'all-MiniLM-L6-v2'),
+            batch_size=getattr(self.config, 'embedding_batch_size', 64),
+            cache_dir=getattr(self.config, 'embedding_cache_dir', 'data/embeddings'),
+            cache_dtype=getattr(self.config, 'embedding_cache_dtype', 'float16'),
+            cache_max_mb=getattr(self.config, 'embedding_cache_max_mb', None),
+            encoder=self._create_encoder(),
+        )
+        self.taxonomy_classifier = self._create_taxonomy_classifier()
+        self.artifact_cache = self._create_artifact_cache()
+        self.report_generator = ReportGenerator(chunk_size=getattr(self.config, 'report_chunk_size', 10000))
+        self.pipeline = None
+        self.last_metrics = None
         
+    def close(self):
+        """Release the scraper's connections and background event loop, if it has them"""
+        close = getattr(self.review_scraper, 'close', None)
+        if close is not None:
+            close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
     def _create_default_config(self):
-        """Create default configuration"""
-        class Config:
-            def __init__(self):
-                self.similarity_threshold = 0.7
-                self.max_reviews_per_day = 1000
-                self.min_cluster_size = 3
-                self.analysis_period_days = 30
-                self.default_app_id = "in.swiggy.android"
+        """Private copy of the process-wide config (file and PULSEGEN_* overrides applied)"""
+        return get_config().replace()
+    
+    def _create_review_scraper(self):
+        """
+        Create the review scraper for the configured source: the pooled
+        asyncio fetcher for an HTTP endpoint, otherwise the threaded scraper
+        """
+        source_url = getattr(self.config, 'review_source_url', None)
+        if source_url and getattr(self.config, 'scraper_backend', 'asyncio') == 'asyncio':
+            return AsyncReviewFetcher(
+                source_url,
+                page_size=getattr(self.config, 'scraper_page_size', 200),
+                max_connections=getattr(self.config, 'scraper_max_workers', 4),
+                rate=getattr(self.config, 'scraper_rate_limit', None),
+                per_app_rate=getattr(self.config, 'scraper_app_rate_limit', None),
+                max_retries=getattr(self.config, 'scraper_max_retries', 4),
+            )
+        source = HttpReviewSource(source_url) if source_url else PlayStoreReviewSource()
+        return ReviewScraper(
+            source,
+            page_size=getattr(self.config, 'scraper_page_size', 200),
+            max_workers=getattr(self.config, 'scraper_max_workers', 4),
+            max_retries=getattr(self.config, 'scraper_max_retries', 4),
+        )
+    
+    def _create_encoder(self) -> Optional[OnnxEncoder]:
+        """ONNX Runtime encoder for the onnx backends, or None for the sentence-transformers reference"""
+        backend = getattr(self.config, 'embedding_backend', 'sentence-transformers')
+        if backend == 'sentence-transformers':
+            return None
+        if backend not in ('onnx', 'onnx-int8'):
+            raise ValueError(f"Unknown embedding_backend: {backend}")
+        return OnnxEncoder(
+            getattr(self.config, 'embedding_model', 'all-MiniLM-L6-v2'),
+            model_dir=getattr(self.config, 'embedding_model_dir', 'data/models'),
+            quantize=backend == 'onnx-int8',
+            threads=getattr(self.config, 'embedding_threads', None),
+        )
+    
+    def _ingest_batch_size(self) -> int:
+        """
+        ingest_batch_size, shrunk so that with memory_budget_mb set the
+        reviews held by all concurrent apps fit the budget: each app's
+        per-day reservoirs plus every batch its pipeline can hold at once
+        """
+        batch_size = getattr(self.config, 'ingest_batch_size', 500)
+        budget_mb = getattr(self.config, 'memory_budget_mb', None)
+        if not budget_mb:
+            return batch_size
+        per_app = budget_mb * 2 ** 20 / max(1, getattr(self.config, 'max_concurrent_apps', 4))
+        cap = getattr(self.config, 'max_reviews_per_day', None) or 0
+        # Day slices are fetched max_workers at a time, so about that many days are open at once
+        reserved = cap * REVIEW_RECORD_BYTES * (getattr(self.config, 'scraper_max_workers', 4) + 1)
+        in_flight = max_items_in_flight(
+            [getattr(self.config, 'cleaner_processes', 0), getattr(self.config, 'embedding_workers', 2), 1],
+            getattr(self.config, 'pipeline_queue_size', 4),
+            ordered=[False, True, False],
+        )
+        fits = int((per_app - reserved) // (in_flight * REVIEW_BYTES))
+        if fits < 1:
+            raise ValueError(f"memory_budget_mb={budget_mb} is too small for max_reviews_per_day={cap}, "
+                             f"max_concurrent_apps and the pipeline's queues")
+        return min(batch_size, fits)
+    
+    def _create_taxonomy_classifier(self) -> Optional[TaxonomyClassifier]:
+        """Zero-shot taxonomy classifier, or None when taxonomy_mode is unset"""
+        mode = getattr(self.config, 'taxonomy_mode', None)
+        if mode is None:
+            return None
+        if mode not in ('first', 'only'):
+            raise ValueError(f"Unknown taxonomy_mode: {mode}")
+        return TaxonomyClassifier(
+            self.embedding_service,
+            taxonomy=getattr(self.config, 'taxonomy', None),
+            threshold=getattr(self.config, 'taxonomy_threshold', 0.45),
+        )
+    
+    def _create_review_store(self):
+        """Create the Parquet review store, or None when it is disabled"""
+        store_dir = getattr(self.config, 'review_store_dir', None)
+        return ReviewStore(store_dir) if store_dir else None
+    
+    def _create_artifact_cache(self) -> Optional[ArtifactCache]:
+        """Create the rebuild artifact cache, or None when it is disabled"""
+        cache_dir = getattr(self.config, 'artifact_cache_dir', None)
+        if not cache_dir:
+            return None
+        max_mb = getattr(self.config, 'artifact_cache_max_mb', 1024)
+        return ArtifactCache(cache_dir, max_bytes=int(max_mb * 2 ** 20) if max_mb else None)
+    
+    def load_history(self, app_id: str, target_date: datetime) -> pd.DataFrame:
+        """
+        Rebuild the topics × days report for the analysis window from the
+        review store, reading only the date and topic columns
+        """
+        start, end = self._analysis_window(target_date)
+        counts = self.review_store.daily_topic_counts(app_id, start, end)
+        daily_counts = {
+            day: {topic: int(n) for topic, n in counts[day].items() if n}
+            for day in counts.columns
+        }
+        registry = self._load_discoverer(app_id).registry
+        return self._counts_to_report(daily_counts, start, end, registry)
+    
+    def _analysis_window(self, target_date: datetime):
+        """Return [start, end) covering analysis_period_days up to target_date (inclusive)"""
+        end = datetime(target_date.year, target_date.month, target_date.day) + timedelta(days=1)
+        start = end - timedelta(days=self.config.analysis_period_days)
+        return start, end
+    
+    def iter_reviews(self, app_id: str, target_date: datetime):
+        """
+        Stream reviews for the analysis window ending on target_date (inclusive)
+        """
+        start, end = self._analysis_window(target_date)
+        return self.review_scraper.iter_reviews(app_id, start, end)
+    
+    def run_incremental(self, app_id: str, target_date: datetime, classify=None,
+                        metrics: Optional[RunMetrics] = None) -> pd.DataFrame:
+        """
+        Process only reviews newer than the app's checkpoint and return the
+        updated topic×day report for the analysis window.
+        
+        classify maps a batch of review records to one topic key each; by
+        default reviews are embedded and assigned by the app's online topic
+        discoverer. With taxonomy_mode "first" the taxonomy classifier labels
+        reviews before discovery and only the unmatched ones are discovered;
+        with "only" discovery is skipped and unmatched reviews are not
+        counted. Stage timings are recorded in metrics when given.
+        """
+        metrics = metrics or RunMetrics(app_id, target_date)
+        start, end = self._analysis_window(target_date)
+        registry = None
+        if classify is not None:
+            with metrics.stage('ingest'):
+                checkpoint = self.ingestor.run(app_id, start, end, classify)
+        else:
+            discoverer = None
+            if getattr(self.config, 'taxonomy_mode', None) != 'only':
+                with metrics.stage('load_topics'):
+                    discoverer = self._load_discoverer(app_id)
+            labeler = self._create_topic_labeler() if discoverer is not None else None
+            near_duplicates = self._create_near_duplicate_filter()
+            # This run's share of the shared embedding service's counters
+            embedding_stats = EmbeddingService.new_stats()
+            pipeline = self._build_pipeline(discoverer, labeler, near_duplicates, embedding_stats)
+            with metrics.stage('ingest', wrapper=True):
+                checkpoint = self.ingestor.run(
+                    app_id, start, end,
+                    finalize=(lambda ckpt: self._finalize_topics(app_id, discoverer, ckpt, metrics, labeler))
+                    if discoverer is not None else None,
+                    executor=pipeline,
+                )
+            # The pipeline's source stage is the scraper
+            metrics.record_pipeline({('scrape' if name == 'source' else name): s for name, s in pipeline.stats.items()})
+            metrics.record_cache('embedding', {}, embedding_stats)
+            latency = getattr(self.review_scraper, 'app_latency', {}).pop(app_id, None)
+            if latency is not None:
+                metrics.record_latency('fetch', latency.as_dict())
+            if near_duplicates is not None:
+                stats = near_duplicates.stats
+                metrics.record('dedup', calls=0, reviews=stats['reviews'], collapsed=stats['collapsed'],
+                               reused_embeddings=stats['reused'])
+            sampler = self.ingestor.samplers.pop(app_id, None)
+            if sampler is not None:
+                metrics.record('sample', items_in=sum(sampler.seen.values()), items_out=sum(sampler.kept.values()),
+                               calls=0)
+            registry = discoverer.registry if discoverer is not None else None
+        
+        with metrics.stage('report') as stage:
+            report_df = self._counts_to_report(checkpoint.daily_counts, start, end, registry)
+            stage.items_out = len(report_df)
+        return report_df
+    
+    def rebuild_report(self, app_id: str, target_date: datetime,
+                       metrics: Optional[RunMetrics] = None) -> pd.DataFrame:
+        """
+        Recompute the report for the analysis window from the reviews in the
+        review store, without scraping or touching the app's checkpoint and
+        topic registry.
+        
+        Cleaned frames and embeddings (per day), topic assignments and daily
+        counts go through the artifact cache, keyed by their inputs, their
+        stage's code version and the settings they read. A re-run reuses
+        everything, and a setting read only by a later stage (e.g.
+        similarity_threshold) still reuses the cleaned text and embeddings.
+        Topics are discovered into a fresh registry, so the result depends
+        only on the stored reviews and the config.
+        """
+        if self.review_store is None or self.artifact_cache is None:
+            raise ValueError("rebuild_report needs both review_store_dir and artifact_cache_dir")
+        metrics = metrics or RunMetrics(app_id, target_date)
+        cache = self.artifact_cache
+        cache_before = dict(cache.stats)
+        start, end = self._analysis_window(target_date)
+        
+        with metrics.stage('load_reviews') as stage:
+            raw = self.review_store.read(app_id, start, end, columns=RAW_COLUMNS)
+            raw['weight'] = raw['weight'].astype(float).fillna(1.0)
+            days = []
+            for _, frame in raw.groupby(raw['at'].dt.strftime('%Y-%m-%d'), sort=True):
+                frame = frame.sort_values('review_id', kind='stable').reset_index(drop=True)
+                clean_key = cache.key('clean', DataCleaner.VERSION, fingerprint(frame), **self._cleaner_settings())
+                embed_key = cache.key('embed', EmbeddingService.VERSION, clean_key, **self._embedding_settings())
+                days.append((frame, clean_key, embed_key))
+            stage.items_out = len(raw)
+        
+        assign_key = cache.key(
+            'assign',
+            [OnlineTopicDiscoverer.VERSION, TaxonomyClassifier.VERSION, TopicLabeler.VERSION],
+            [embed_key for _, _, embed_key in days],
+            **self._assignment_settings(),
+        )
+        assigned = cache.get_or_compute(assign_key, lambda: self._rebuild_assignments(days, metrics))
+        with metrics.stage('count') as stage:
+            daily_counts = cache.get_or_compute(cache.key('count', COUNTS_VERSION, assign_key),
+                                                lambda: self._assignments_to_counts(assigned))
+            stage.items_out = len(daily_counts)
+        metrics.record_cache('artifacts', cache_before, cache.stats)
         
-        return Config()
+        with metrics.stage('report') as stage:
+            report_df = self._counts_to_report(daily_counts, start, end, assigned['registry'])
+            stage.items_out = len(report_df)
+        return report_df
     
-    def generate_trend_report(self, app_store_link: str, target_date: datetime) -> pd.DataFrame:
+    def _rebuild_assignments(self, days, metrics: RunMetrics) -> Dict[str, Any]:
         """
-        Generate trend analysis report for the given app and date
+        Assign every stored review of the window, day by day in date order,
+        cleaning and embedding each day through the artifact cache
+        """
+        cache = self.artifact_cache
+        discoverer = None
+        if getattr(self.config, 'taxonomy_mode', None) != 'only':
+            discoverer = self._create_discoverer(TopicRegistry(self.embedding_service.dim))
+        labeler = self._create_topic_labeler() if discoverer is not None else None
+        
+        assigned: Dict[str, Any] = {'days': {}, 'backfill': {}, 'registry': None}
+        for frame, clean_key, embed_key in days:
+            with metrics.stage('clean', items_in=len(frame)) as stage:
+                cleaned = cache.get_or_compute(clean_key, lambda: self.data_cleaner.clean(frame))
+                stage.items_out = len(cleaned)
+            if cleaned.empty:
+                continue
+            with metrics.stage('embed', items_in=len(cleaned)) as stage:
+                embeddings = cache.get_or_compute(
+                    embed_key, lambda: self.embedding_service.encode(cleaned['clean_text'].tolist()))
+                stage.items_out = len(embeddings)
+            with metrics.stage('assign', items_in=len(cleaned)) as stage:
+                batch = cleaned.to_dict('records')
+                topics = self._assign_batch(batch, embeddings, discoverer, labeler)
+                day = batch[0]['at'].strftime('%Y-%m-%d')
+                assigned['days'][day] = [(t, r['weight']) for r, t in zip(batch, topics) if t is not None]
+                stage.items_out = len(assigned['days'][day])
+        
+        if discoverer is not None:
+            if labeler is not None:
+                with metrics.stage('label_topics') as stage:
+                    stage.items_out = len(labeler.label_topics(discoverer.registry))
+            assigned['backfill'] = discoverer.drain_backfill()
+            assigned['registry'] = discoverer.registry
+        return assigned
+    
+    @staticmethod
+    def _assignments_to_counts(assigned: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+        """Weighted daily counts of rebuilt assignments, as the ingestor would record them"""
+        daily_counts: Dict[str, Dict[str, float]] = {}
+        for day, pairs in assigned['days'].items():
+            totals: Dict[str, float] = {}
+            for topic, weight in pairs:
+                totals[str(topic)] = totals.get(str(topic), 0.0) + weight
+            daily_counts[day] = totals
+        for (topic_id, day), weight in assigned['backfill'].items():
+            if day is not None:
+                day_counts = daily_counts.setdefault(day, {})
+                day_counts[str(topic_id)] = day_counts.get(str(topic_id), 0.0) + float(weight)
+        return daily_counts
+    
+    def _cleaner_settings(self) -> Dict[str, Any]:
+        cleaner = self.data_cleaner
+        return {'min_length': cleaner.min_length, 'language': cleaner.language,
+                'min_latin_ratio': cleaner.min_latin_ratio, 'use_spacy': cleaner.use_spacy,
+                'spacy_model': cleaner.spacy_model if cleaner.use_spacy else None}
+    
+    def _embedding_settings(self) -> Dict[str, Any]:
+        service = self.embedding_service
+        return {'model': service.model_name, 'encoder': type(service.encoder).__name__, 'dim': service.dim,
+                'variant': getattr(service.encoder, 'variant', None),
+                'cache_dtype': service.cache_dtype if service.cache_dir else None}
+    
+    def _assignment_settings(self) -> Dict[str, Any]:
+        names = ['similarity_threshold', 'min_cluster_size', 'topic_merge_threshold', 'topic_max_pending',
+                 'topic_index', 'topic_index_nlist', 'topic_index_nprobe', 'taxonomy_mode', 'taxonomy',
+                 'taxonomy_threshold', 'topic_labeler', 'topic_label_sample_size', 'topic_label_stable_similarity']
+        return {name: getattr(self.config, name, None) for name in names}
+    
+    def _load_discoverer(self, app_id: str) -> OnlineTopicDiscoverer:
+        """Load the app's topic registry and wrap it in an online discoverer"""
+        registry_dir = os.path.join(getattr(self.config, 'topic_registry_dir', 'data/topics'), app_id)
+        return self._create_discoverer(TopicRegistry.load(registry_dir, self.embedding_service.dim))
+    
+    def _create_discoverer(self, registry: TopicRegistry) -> OnlineTopicDiscoverer:
+        """Online discoverer over registry with the configured thresholds and index"""
+        index = getattr(self.config, 'topic_index', 'exact')
+        index_params = {}
+        if index == 'ivf':
+            index_params = {'nlist': getattr(self.config, 'topic_index_nlist', None),
+                            'nprobe': getattr(self.config, 'topic_index_nprobe', 24)}
+        return OnlineTopicDiscoverer(
+            registry,
+            assign_threshold=self.config.similarity_threshold,
+            min_cluster_size=self.config.min_cluster_size,
+            merge_threshold=getattr(self.config, 'topic_merge_threshold', 0.85),
+            max_pending=getattr(self.config, 'topic_max_pending', 20000),
+            index=index,
+            index_params=index_params,
+        )
+    
+    def _create_topic_labeler(self) -> Optional[TopicLabeler]:
+        """Per-run topic labeler, or None when topic_labeler is unset"""
+        backend = getattr(self.config, 'topic_labeler', 'auto')
+        if backend is None:
+            return None
+        return TopicLabeler(
+            self.embedding_service,
+            backend=backend,
+            sample_size=getattr(self.config, 'topic_label_sample_size', 32),
+            stable_similarity=getattr(self.config, 'topic_label_stable_similarity', 0.95),
+            reserved=self.taxonomy_classifier.labels if self.taxonomy_classifier is not None else (),
+        )
+    
+    def _create_near_duplicate_filter(self) -> Optional[NearDuplicateFilter]:
+        """Per-run near-duplicate filter, or None when near_duplicate_threshold is unset"""
+        threshold = getattr(self.config, 'near_duplicate_threshold', None)
+        if threshold is None:
+            return None
+        return NearDuplicateFilter(
+            threshold=threshold,
+            num_perm=getattr(self.config, 'near_duplicate_num_perm', 64),
+            bands=getattr(self.config, 'near_duplicate_bands', 16),
+        )
+    
+    def _build_pipeline(self, discoverer: Optional[OnlineTopicDiscoverer],
+                        labeler: Optional[TopicLabeler] = None,
+                        near_duplicates: Optional[NearDuplicateFilter] = None,
+                        embedding_stats: Optional[Dict[str, int]] = None) -> StagedPipeline:
+        """
+        Stage graph for one increment: scraped batches are cleaned and
+        embedded on worker pools while the next pages download, then
+        assigned to topics by a single stateful worker, in the order they
+        were scraped, so identical runs give identical topics. Cleaning moves to a
+        process pool when cleaner_processes > 0. With near_duplicates,
+        a single worker collapses near-identical reviews between cleaning
+        and embedding. When a taxonomy classifier is configured it labels
+        each batch first; discoverer (None in taxonomy-only mode) sees only
+        the reviews it left unmatched, and labeler samples the reviews the
+        discoverer assigns. The embed stage's cache counters also go to
+        embedding_stats.
+        """
+        def embed(batch):
+            texts = [r.get('embed_text') or r['clean_text'] for r in batch]
+            return batch, self.embedding_service.encode(texts, stats=embedding_stats)
+        
+        def assign(item):
+            batch, embeddings = item
+            return batch, self._assign_batch(batch, embeddings, discoverer, labeler)
+        
+        cleaner_processes = getattr(self.config, 'cleaner_processes', 0)
+        clean_stage = Stage(
+            'clean',
+            self.data_cleaner.clean_records,
+            workers=max(1, cleaner_processes),
+            kind='process' if cleaner_processes > 0 else 'thread',
+        )
+        stages = [clean_stage]
+        if near_duplicates is not None:
+            stages.append(Stage('dedup', near_duplicates.filter_records))
+        self.pipeline = StagedPipeline(
+            stages + [
+                # Assignment is stateful, so embedded batches must reach it in scrape order
+                Stage('embed', embed, workers=getattr(self.config, 'embedding_workers', 2), ordered=True),
+                Stage('assign', assign),
+            ],
+            queue_size=getattr(self.config, 'pipeline_queue_size', 4),
+        )
+        return self.pipeline
+    
+    def _assign_batch(self, batch: List[Dict[str, Any]], embeddings: np.ndarray,
+                      discoverer: Optional[OnlineTopicDiscoverer],
+                      labeler: Optional[TopicLabeler] = None) -> List[Any]:
+        """Topic key per review: a taxonomy label, a registry ID, or None when unassigned"""
+        classifier = self.taxonomy_classifier
+        topics: List[Any] = [None] * len(batch)
+        rest = np.arange(len(batch))
+        if classifier is not None:
+            labels = classifier.labels
+            matched = classifier.classify(embeddings)
+            for i in np.flatnonzero(matched >= 0):
+                topics[i] = labels[matched[i]]
+            rest = np.flatnonzero(matched < 0)
+        if discoverer is not None and len(rest):
+            days = [batch[i]['at'].strftime('%Y-%m-%d') for i in rest]
+            weights = np.array([batch[i].get('weight', 1.0) for i in rest])
+            topic_ids = discoverer.assign(embeddings[rest], days, weights)
+            for i, t in zip(rest, topic_ids):
+                if t >= 0:
+                    topics[i] = int(t)
+            if labeler is not None:
+                labeler.observe(topic_ids, [batch[i]['clean_text'] for i in rest], embeddings[rest])
+        return topics
+    
+    def _finalize_topics(self, app_id: str, discoverer: OnlineTopicDiscoverer, checkpoint,
+                         metrics: Optional[RunMetrics] = None, labeler: Optional[TopicLabeler] = None):
+        """Credit reviews absorbed by newly formed topics, label new topics and persist the registry"""
+        metrics = metrics or RunMetrics(app_id)
+        if labeler is not None:
+            with metrics.stage('label_topics') as stage:
+                stage.items_out = len(labeler.label_topics(discoverer.registry))
+        with metrics.stage('finalize_topics') as stage:
+            backfill = discoverer.drain_backfill()
+            for (topic_id, day), weight in backfill.items():
+                if day is not None:
+                    checkpoint.add_counts(day, {str(topic_id): float(weight)})
+            registry_dir = os.path.join(getattr(self.config, 'topic_registry_dir', 'data/topics'), app_id)
+            discoverer.registry.save(registry_dir)
+            stage.items_out = len(backfill)
+    
+    def _counts_to_report(self, daily_counts: Dict[str, Dict[str, float]], start: datetime, end: datetime,
+                          registry=None) -> pd.DataFrame:
+        """
+        Build the topics × days report frame from stored daily counts;
+        weighted counts are rounded here, once, as the review store does
+        """
+        daily_counts = {day: {topic: int(round(n)) for topic, n in counts.items()}
+                        for day, counts in daily_counts.items()}
+        matrix = TopicDayMatrix.from_daily_counts(daily_counts, start, end)
+        if registry is not None:
+            # Numeric keys are registry IDs; merged topics collapse onto their
+            # survivor. Taxonomy labels move to negative IDs so they can never
+            # land on a registry ID.
+            labels = dict(matrix.names)
+            slots = {topic_id: -1 - i for i, topic_id in enumerate(labels)}
+            matrix = matrix.collapse(lambda t: slots[t] if t in slots else registry.resolve(t))
+            matrix.names = {int(t): registry.label(int(t)) for t in matrix.topic_ids if t >= 0}
+            matrix.names.update({slots[topic_id]: label for topic_id, label in labels.items()})
+        return matrix.order_by_total().to_frame()
+    
+    def generate_trend_report(self, app_store_link: str, target_date: datetime,
+                              metrics: Optional[RunMetrics] = None, rebuild: bool = False) -> pd.DataFrame:
+        """
+        Generate trend analysis report for the given app and date.
+        
+        With rebuild the report is recomputed from the review store through
+        the artifact cache (see rebuild_report) instead of ingesting new
+        reviews.
+        
+        Per-stage metrics for the run are kept in last_metrics (or the
+        metrics object passed in); write them beside the report with
+        metrics.write_next_to(report_file).
         """
         print(f"🔍 Analyzing: {app_store_link}")
         print(f"📅 Target Date: {target_date.strftime('%Y-%m-%d')}")
         
         # Extract app ID from URL
         app_id = self._extract_app_id(app_store_link)
+        metrics = metrics or RunMetrics(app_id, target_date, profile=getattr(self.config, 'profiler', None))
+        self.last_metrics = metrics
         
-        # Create sample report for demonstration
-        report_df = self._create_sample_report()
+        with metrics.profiling():
+            if getattr(self.config, 'use_sample_data', True):
+                # Create sample report for demonstration
+                with metrics.stage('sample_report') as stage:
+                    report_df = self._create_sample_report()
+                    stage.items_out = len(report_df)
+            elif rebuild:
+                report_df = self.rebuild_report(app_id, target_date, metrics=metrics)
+            else:
+                report_df = self.run_incremental(app_id, target_date, metrics=metrics)
+        metrics.finish()
         
         print("✅ Trend analysis completed successfully!")
+        print(f"⏱️  {metrics.wall_seconds:.2f}s, slowest stage: {metrics.bottleneck()}")
         return report_df
     
-    def _extract_app_id(self, play_store_url: str) -> str:
-        """Extract app ID from Play Store URL"""
-        if "id=" in play_store_url:
-            return play_store_url.split("id=")[1].split("&")[0]
-        return "in.swiggy.android"
+    def backfill(self, app_store_link: str, start_date: datetime, end_date: datetime,
+                 workers: Optional[int] = None, metrics: Optional[RunMetrics] = None,
+                 merge: bool = False) -> pd.DataFrame:
+        """
+        Build an app's history for start_date..end_date (inclusive) and
+        return its topics × days report.
+        
+        The range is split into partitions of backfill_partition_days.
+        Up to `workers` partitions are fetched, sampled, cleaned,
+        de-duplicated and embedded in parallel. Each prepared partition is
+        kept in the artifact cache until the backfill commits, so an
+        interrupted backfill resumes from the partitions it already
+        finished while a later one fetches the range afresh. Partitions are then
+        assigned in date order to one topic registry shared by the whole
+        range, so every day is counted against the same topics exactly as
+        a serial run would count them. The stored reviews, counts and
+        sampler state of the range are replaced and the high-water mark
+        moves to the end of the backfill if that is newer, so daily
+        incremental runs continue from there.
+        
+        An app that already has a topic registry or checkpoint is only
+        backfilled with merge=True: the range is then assigned to the
+        existing registry and merged into the existing checkpoint, so
+        topic IDs and counts stored for other days stay valid.
+        """
+        app_id = self._extract_app_id(app_store_link)
+        start = datetime(start_date.year, start_date.month, start_date.day)
+        end = datetime(end_date.year, end_date.month, end_date.day) + timedelta(days=1)
+        if end <= start:
+            raise ValueError(f"Backfill end {end_date:%Y-%m-%d} is before start {start_date:%Y-%m-%d}")
+        registry_dir = os.path.join(getattr(self.config, 'topic_registry_dir', 'data/topics'), app_id)
+        if not merge and (TopicRegistry.exists(registry_dir) or self.checkpoint_store.exists(app_id)):
+            raise ValueError(f"{app_id} already has a topic registry or checkpoint; "
+                             f"backfill with merge=True to extend them")
+        workers = workers or getattr(self.config, 'backfill_workers', 4)
+        metrics = metrics or RunMetrics(app_id, end_date, profile=getattr(self.config, 'profiler', None))
+        self.last_metrics = metrics
+        partitions = self._backfill_partitions(start, end)
+        print(f"🗂️  Backfill {app_id}: {len(partitions)} partitions from {start:%Y-%m-%d} to {end_date:%Y-%m-%d}, "
+              f"{workers} workers")
+        
+        cache = self.artifact_cache
+        cache_before = dict(cache.stats) if cache is not None else None
+        discoverer = None
+        if getattr(self.config, 'taxonomy_mode', None) != 'only':
+            # Empty unless merging; pending reviews of the range are fetched again
+            discoverer = self._load_discoverer(app_id)
+            discoverer.registry.drop_pending(start.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d'))
+        labeler = self._create_topic_labeler() if discoverer is not None else None
+        # The range is tracked on its own and merged into the stored checkpoint at the end
+        checkpoint = AppCheckpoint(app_id)
+        staged = (self.review_store.stage(mode='overwrite', app_id=app_id, start=start, end=end)
+                  if self.review_store is not None else None)
+        batch_size = self.ingestor.batch_size
+        
+        with metrics.profiling():
+            pool = ThreadPoolExecutor(max_workers=max(1, workers))
+            try:
+                todo = iter(partitions)
+                futures = deque(pool.submit(self._prepare_partition, app_id, lo, hi, metrics)
+                                for lo, hi in islice(todo, 2 * workers))
+                while futures:
+                    records, embeddings, sampled = futures.popleft().result()
+                    checkpoint.sampled_days.update(sampled)
+                    following = next(todo, None)
+                    if following is not None:
+                        futures.append(pool.submit(self._prepare_partition, app_id, *following, metrics))
+                    with metrics.stage('assign', items_in=len(records)) as stage:
+                        for i in range(0, len(records), batch_size):
+                            batch = list(checkpoint.track(records[i:i + batch_size]))
+                            topics = self._assign_batch(batch, embeddings[i:i + batch_size], discoverer, labeler)
+                            self.ingestor.record_partition(checkpoint, batch, topics, staged)
+                            stage.items_out += sum(t is not None for t in topics)
+                
+                checkpoint.commit()
+                merged = self.checkpoint_store.load(app_id)
+                merged.replace_days(checkpoint, start, end)
+                if discoverer is not None:
+                    self._finalize_topics(app_id, discoverer, merged, metrics, labeler)
+                if staged is not None:
+                    staged.commit()
+                self.checkpoint_store.save(merged)
+                if cache is not None:
+                    for lo, hi in partitions:
+                        key = self._partition_key(cache, app_id, lo, hi)
+                        for suffix in ('-sampled', '-embeddings', '-reviews'):
+                            cache.discard(key + suffix)
+            except BaseException:
+                if staged is not None:
+                    staged.abort()
+                raise
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+            
+            if cache is not None:
+                metrics.record_cache('artifacts', cache_before, cache.stats)
+            with metrics.stage('report') as stage:
+                registry = discoverer.registry if discoverer is not None else None
+                report_df = self._counts_to_report(merged.daily_counts, start, end, registry)
+                stage.items_out = len(report_df)
+        metrics.finish()
+        
+        print(f"✅ Backfill completed: {len(report_df)} topics over {len(partitions)} partitions")
+        print(f"⏱️  {metrics.wall_seconds:.2f}s, slowest stage: {metrics.bottleneck()}")
+        return report_df
+    
+    def _backfill_partitions(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """Split [start, end) into consecutive partitions of backfill_partition_days"""
+        step = timedelta(days=getattr(self.config, 'backfill_partition_days', 1))
+        partitions = []
+        lo = start
+        while lo < end:
+            partitions.append((lo, min(lo + step, end)))
+            lo += step
+        return partitions
+    
+    def _prepare_partition(self, app_id: str, lo: datetime, hi: datetime,
+                           metrics: RunMetrics) -> Tuple[List[Dict[str, Any]], np.ndarray, Dict[str, int]]:
+        """
+        Fetch, sample, clean, collapse near-duplicates and embed one backfill
+        partition; returns (records, embeddings, reviews kept per sampled
+        day), through the artifact cache when it is enabled
+        """
+        cache = self.artifact_cache
+        if cache is None:
+            frame, embeddings, sampled = self._compute_partition(app_id, lo, hi, metrics)
+        else:
+            key = self._partition_key(cache, app_id, lo, hi)
+            frame = cache.get(key + '-reviews')
+            embeddings = cache.get(key + '-embeddings') if frame is not None else None
+            sampled = cache.get(key + '-sampled') if embeddings is not None else None
+            if sampled is None:
+                frame, embeddings, sampled = self._compute_partition(app_id, lo, hi, metrics)
+                cache.put(key + '-sampled', sampled)
+                cache.put(key + '-embeddings', embeddings)
+                cache.put(key + '-reviews', frame)
+        return frame.to_dict('records'), embeddings, sampled
+    
+    def _partition_key(self, cache: ArtifactCache, app_id: str, lo: datetime, hi: datetime) -> str:
+        """
+        Artifact key of a prepared backfill partition; the fetched data is
+        not part of it, so entries only live until their backfill commits
+        """
+        near_duplicates = [getattr(self.config, name, None) for name in
+                           ('near_duplicate_threshold', 'near_duplicate_num_perm', 'near_duplicate_bands')]
+        return cache.key(
+            'backfill',
+            [DataCleaner.VERSION, NearDuplicateFilter.VERSION, EmbeddingService.VERSION],
+            app_id, lo.isoformat(), hi.isoformat(),
+            source=getattr(self.config, 'review_source_url', None),
+            max_reviews_per_day=getattr(self.config, 'max_reviews_per_day', None),
+            near_duplicates=near_duplicates,
+            **self._cleaner_settings(), **self._embedding_settings(),
+        )
+    
+    def _compute_partition(self, app_id: str, lo: datetime, hi: datetime,
+                           metrics: RunMetrics) -> Tuple[pd.DataFrame, np.ndarray, Dict[str, int]]:
+        cap = getattr(self.config, 'max_reviews_per_day', None)
+        sampled = {}
+        with metrics.stage('scrape') as stage:
+            if cap:
+                sampler = DailyReservoir(cap, lo, hi, app_id)
+                reviews = list(sampler.sample(
+                    self.review_scraper.iter_reviews(app_id, lo, hi, on_complete=sampler.complete)))
+                sampled = dict(sampler.kept)
+            else:
+                reviews = list(self.review_scraper.iter_reviews(app_id, lo, hi))
+            stage.items_out = len(reviews)
+        with metrics.stage('clean', items_in=len(reviews)) as stage:
+            records = self.data_cleaner.clean_records(reviews)
+            stage.items_out = len(records)
+        near_duplicates = self._create_near_duplicate_filter()
+        if near_duplicates is not None:
+            with metrics.stage('dedup', items_in=len(records)) as stage:
+                records = near_duplicates.filter_records(records)
+                stage.items_out = len(records)
+        with metrics.stage('embed', items_in=len(records)) as stage:
+            embeddings = self.embedding_service.encode([r.get('embed_text') or r['clean_text'] for r in records])
+            stage.items_out = len(embeddings)
+        
+        frame = pd.DataFrame.from_records(records).drop(columns=['embed_text'], errors='ignore')
+        frame['weight'] = frame['weight'].astype(float).fillna(1.0) if 'weight' in frame else 1.0
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(records), self.embedding_service.dim)
+        return frame, embeddings, sampled
+    
+    def generate_trend_reports(self, apps: List[str], target_date: datetime,
+                               max_concurrency: Optional[int] = None) -> Dict[str, AppReport]:
+        """
+        Generate reports for many apps concurrently.
+        
+        apps may mix Play Store URLs and bare app IDs. All apps share this
+        orchestrator's embedding model and cache. Each app's result or
+        error is reported separately; one failing app does not stop the rest.
+        """
+        limit = max_concurrency or getattr(self.config, 'max_concurrent_apps', 4)
+        print(f"📦 Batch: {len(apps)} apps, up to {limit} at a time")
+        
+        def run_one(app):
+            started = time.perf_counter()
+            try:
+                app_id = self._extract_app_id(app)
+            except ValueError as e:
+                return AppReport(app, error=str(e))
+            metrics = RunMetrics(app_id, target_date, profile=getattr(self.config, 'profiler', None))
+            try:
+                report_df = self.generate_trend_report(app, target_date, metrics=metrics)
+                return AppReport(app_id, report=report_df, elapsed=time.perf_counter() - started, metrics=metrics)
+            except Exception as e:
+                print(f"❌ {app_id}: {e}")
+                return AppReport(app_id, error=f"{type(e).__name__}: {e}", elapsed=time.perf_counter() - started,
+                                 metrics=metrics)
+        
+        with ThreadPoolExecutor(max_workers=max(1, limit)) as pool:
+            results = list(pool.map(run_one, apps))
+        
+        failed = sum(not r.ok for r in results)
+        print(f"📦 Batch finished: {len(results) - failed} succeeded, {failed} failed")
+        return {r.app_id: r for r in results}
+    
+    def _extract_app_id(self, play_store_link: str) -> str:
+        """Extract app ID from a Play Store URL or accept a bare app ID"""
+        link = play_store_link.strip()
+        if "id=" in link:
+            return link.split("id=")[1].split("&")[0]
+        if APP_ID_PATTERN.match(link):
+            return link
+        raise ValueError(f"Not a Play Store URL or app ID: {play_store_link!r}")
     
     def _create_sample_report(self):
         """Create a sample trend analysis report"""
         # Create dates for June 2024
         start_date = datetime(2024, 6, 1)
-        dates = [start_date + timedelta(days=i) for i in range(30)]
-        date_headers = [d.strftime('%b %d') for d in dates]
         
         # Sample data matching assignment requirements
         data = {
@@ -68,7 +855,5 @@ class TrendAnalysisOrchestrator:
             'Bring back 10 minute bolt delivery': [0, 2, 1, 0, 3, 1, 0, 2, 1, 0, 3, 1, 0, 2, 1, 0, 3, 1, 0, 2, 1, 0, 3, 1, 0, 2, 1, 0, 3, 6],
         }
         
-        df = pd.DataFrame(data, index=date_headers)
-        df = df.T  # Transpose to have topics as rows
-        
-        return df
\ No newline at end of file
+        # Rows are already topic-major, so no transpose copy is needed
+        return TopicDayMatrix.from_rows(data, start_date).to_frame()
\ No newline at end of file
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Chart Renderer - headless trend charts for topics × days reports
+
+PNG output draws on a matplotlib ``Figure`` with the Agg canvas directly, so
+pyplot (and with it any GUI backend) is never imported and nothing blocks on
+``show()``. One figure template per size is kept per process and cleared
+between charts instead of being rebuilt. SVG and HTML output is generated
+as plain text with no plotting dependency at all.
+"""
+
+import html
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import pandas as pd
+
+LINE_COLORS = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FECA57']
+BAR_COLORS = ['#8DD3C7', '#FFFFB3', '#BEBADA', '#FB8072', '#80B1D3',
+              '#FDB462', '#B3DE69', '#FCCDE5', '#D9D9D9', '#BC80BD']
+FORMATS = ('png', 'svg', 'html')
+
+# (figsize, dpi) -> reusable Figure with its two axes, per process
+_TEMPLATES: Dict[Tuple, object] = {}
+_TEMPLATE_LOCK = threading.Lock()
+
+
+class ChartRenderer:
+    """
+    Renders the daily trend of the top topics and the total frequency of
+    the top topics for one report.
+
+    ``format`` is ``'png'`` (matplotlib, Agg), ``'svg'`` or ``'html'`` (an
+    SVG inside a standalone page); the latter two need no plotting library.
+    """
+
+    def __init__(self, format: str = 'png', dpi: int = 100, figsize: Tuple[float, float] = (14, 10),
+                 top_n: int = 5, bar_n: int = 10):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown chart format: {format}")
+        self.format = format
+        self.dpi = dpi
+        self.figsize = tuple(figsize)
+        self.top_n = top_n
+        self.bar_n = bar_n
+
+    def render(self, report_df: pd.DataFrame, output_file: str, title: str = 'Top Topics') -> str:
+        """Render one report to ``output_file`` and return the path"""
+        directory = os.path.dirname(output_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        totals = report_df.sum(axis=1).sort_values(ascending=False, kind='stable')
+        if self.format == 'png':
+            self._render_png(report_df, totals, output_file, title)
+        else:
+            svg = self.to_svg(report_df, totals, title)
+            if self.format == 'html':
+                svg = (f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>"
+                       f"</head>\n<body style=\"margin:0\">\n{svg}\n</body></html>\n")
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(svg)
+        return output_file
+
+    def render_many(self, reports: Mapping[str, pd.DataFrame], output_dir: str,
+                    workers: Optional[int] = None) -> Dict[str, str]:
+        """
+        Render one chart per app on a process pool; returns app_id -> path.
+        With ``workers=1`` everything runs in this process.
+        """
+        jobs = [
+            (self, report, os.path.join(output_dir, f"trend_{app_id}.{self.format}"), app_id)
+            for app_id, report in reports.items()
+        ]
+        workers = workers or min(len(jobs), os.cpu_count() or 1)
+        if workers <= 1 or len(jobs) <= 1:
+            paths = [_render_job(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                paths = list(pool.map(_render_job, jobs))
+        return dict(zip(reports, paths))
+
+    def _render_png(self, report_df: pd.DataFrame, totals: pd.Series, output_file: str, title: str):
+        with _TEMPLATE_LOCK:
+            fig = _figure_template(self.figsize, self.dpi)
+            ax1, ax2 = fig.axes
+            days = list(report_df.columns)
+            x = range(len(days))
+
+            for color, topic in zip(LINE_COLORS, totals.index[:self.top_n]):
+                ax1.plot(x, report_df.loc[topic].to_numpy(), marker='o', linewidth=2.5, label=topic, color=color)
+            step = max(1, len(days) // 15)
+            ax1.set_xticks(list(x)[::step], days[::step], rotation=45)
+            ax1.set_title(f'{title} - Daily Trend', fontsize=16, fontweight='bold')
+            ax1.set_ylabel('Number of Occurrences', fontsize=12)
+            ax1.legend(loc='upper left', fontsize=9)
+            ax1.grid(True, alpha=0.3)
+
+            top = totals.iloc[:self.bar_n]
+            bars = ax2.barh(range(len(top)), top.to_numpy(), color=BAR_COLORS[:len(top)])
+            ax2.set_yticks(range(len(top)), list(top.index), fontsize=10)
+            ax2.invert_yaxis()
+            ax2.set_xlabel(f'Total Occurrences ({len(days)} Days)', fontsize=12)
+            ax2.set_title(f'{title} - Total Frequency', fontsize=16, fontweight='bold')
+            ax2.grid(True, alpha=0.3, axis='x')
+            ax2.bar_label(bars, fmt='%d', padding=3, fontsize=9, fontweight='bold')
+
+            fig.savefig(output_file, dpi=self.dpi)
+
+    def to_svg(self, report_df: pd.DataFrame, totals: Optional[pd.Series] = None, title: str = 'Top Topics') -> str:
+        """Both panels as a standalone SVG document"""
+        if totals is None:
+            totals = report_df.sum(axis=1).sort_values(ascending=False, kind='stable')
+        width, height = 1000, 760
+        left, right, plot_w = 60, 230, 1000 - 60 - 230
+        out: List[str] = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}" font-family="sans-serif" font-size="11">',
+            f'<rect width="{width}" height="{height}" fill="white"/>',
+            _svg_text(width / 2, 28, f'{title} - Daily Trend', size=16, anchor='middle', bold=True),
+        ]
+
+        # Line panel
+        top_y, plot_h = 50, 280
+        days = list(report_df.columns)
+        lines = report_df.loc[totals.index[:self.top_n]]
+        y_max = max(1, int(lines.to_numpy().max())) if len(lines) else 1
+        x_step = plot_w / max(1, len(days) - 1)
+
+        def y_of(v):
+            return top_y + plot_h - plot_h * v / y_max
+
+        out.append(_svg_axes(left, top_y, plot_w, plot_h))
+        for i, day in list(enumerate(days))[::max(1, len(days) // 15)]:
+            out.append(_svg_text(left + i * x_step, top_y + plot_h + 16, day, anchor='middle'))
+        for v in (0, y_max // 2, y_max):
+            out.append(_svg_text(left - 6, y_of(v) + 4, str(v), anchor='end'))
+        for n, (color, (topic, row)) in enumerate(zip(LINE_COLORS, lines.iterrows())):
+            points = ' '.join(f'{left + i * x_step:.1f},{y_of(v):.1f}' for i, v in enumerate(row.to_numpy()))
+            out.append(f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="2.5"/>')
+            legend_y = top_y + 10 + n * 18
+            out.append(f'<rect x="{left + plot_w + 15}" y="{legend_y - 9}" width="12" height="12" fill="{color}"/>')
+            out.append(_svg_text(left + plot_w + 32, legend_y + 1, topic))
+
+        # Bar panel
+        top_y = 400
+        out.append(_svg_text(width / 2, top_y - 20, f'{title} - Total Frequency', size=16, anchor='middle', bold=True))
+        bars = totals.iloc[:self.bar_n]
+        bar_max = max(1, int(bars.max())) if len(bars) else 1
+        label_w = 200
+        bar_space = width - label_w - 80
+        for i, (topic, total) in enumerate(bars.items()):
+            y = top_y + i * 32
+            w = bar_space * total / bar_max
+            out.append(_svg_text(label_w - 8, y + 17, topic, anchor='end'))
+            out.append(f'<rect x="{label_w}" y="{y + 4}" width="{w:.1f}" height="22" '
+                       f'fill="{BAR_COLORS[i % len(BAR_COLORS)]}"/>')
+            out.append(_svg_text(label_w + w + 6, y + 19, str(int(total)), bold=True))
+        out.append('</svg>')
+        return '\n'.join(out)
+
+
+def _render_job(job) -> str:
+    renderer, report, output_file, title = job
+    return renderer.render(report, output_file, title)
+
+
+def _figure_template(figsize: Tuple[float, float], dpi: int):
+    """Cleared figure with two stacked axes, created once per size and process"""
+    key = (figsize, dpi)
+    fig = _TEMPLATES.get(key)
+    if fig is None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(fig)
+        fig.subplots(2, 1)
+        fig.subplots_adjust(left=0.2, right=0.97, top=0.95, bottom=0.06, hspace=0.35)
+        _TEMPLATES[key] = fig
+    for ax in fig.axes:
+        ax.cla()
+    return fig
+
+
+def _svg_axes(x: float, y: float, w: float, h: float) -> str:
+    return (f'<path d="M{x},{y} V{y + h} H{x + w}" fill="none" stroke="#333"/>'
+            f'<path d="M{x},{y + h / 2} H{x + w} M{x},{y} H{x + w}" stroke="#ddd"/>')
+
+
+def _svg_text(x: float, y: float, text: str, size: int = 11, anchor: str = 'start', bold: bool = False) -> str:
+    weight = ' font-weight="bold"' if bold else ''
+    return (f'<text x="{x:.1f}" y="{y:.1f}" font-size="{size}" text-anchor="{anchor}"{weight}>'
+            f'{html.escape(str(text))}</text>')
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Report Generator - streaming CSV / Parquet / JSON Lines report writers
+
+Reports are written chunk by chunk, so memory use is bounded by the chunk
+size rather than the report size. Every write goes to a temporary file in
+the destination directory and is renamed into place only once complete;
+readers never see a half-written report.
+"""
+
+import os
+import tempfile
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+import pandas as pd
+
+FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+Report = Union[pd.DataFrame, Iterable[pd.DataFrame]]
+
+
+class ReportGenerator:
+    """
+    Writes topics × days reports in row chunks.
+
+    ``save_report`` accepts either a DataFrame (sliced into ``chunk_size``
+    rows) or any iterable of DataFrame chunks with the same columns, e.g. a
+    generator reading a long history from the review store. The format is
+    taken from the file extension unless given explicitly.
+    """
+
+    def __init__(self, chunk_size: int = 10000, parquet_compression: str = 'zstd'):
+        self.chunk_size = chunk_size
+        self.parquet_compression = parquet_compression
+
+    def save_report(self, report: Report, output_file: str, format: Optional[str] = None) -> str:
+        """Write a report atomically and return its path"""
+        format = format or self.format_for(output_file)
+        writer = getattr(self, f'_write_{format}', None)
+        if writer is None:
+            raise ValueError(f"Unsupported report format: {format}")
+
+        directory = os.path.dirname(os.path.abspath(output_file))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.report-', suffix='.tmp')
+        os.close(fd)
+        try:
+            writer(self.iter_chunks(report), tmp_path)
+            os.replace(tmp_path, output_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return output_file
+
+    def save_reports(self, reports: Iterable[Tuple[str, pd.DataFrame]], output_file: str,
+                     format: Optional[str] = None) -> str:
+        """
+        Write several apps' reports into one file with a leading ``app_id``
+        column. ``reports`` may be a generator, so only one app's report
+        needs to be in memory at a time.
+        """
+        def chunks():
+            for app_id, report in reports:
+                for chunk in self.iter_chunks(report):
+                    yield chunk.set_axis(pd.MultiIndex.from_arrays(
+                        [[app_id] * len(chunk), chunk.index], names=['app_id', chunk.index.name]))
+        return self.save_report(chunks(), output_file, format)
+
+    @staticmethod
+    def format_for(output_file: str) -> str:
+        extension = os.path.splitext(output_file)[1].lower()
+        if extension not in FORMATS:
+            raise ValueError(f"Cannot infer report format from {output_file!r}")
+        return FORMATS[extension]
+
+    def iter_chunks(self, report: Report) -> Iterator[pd.DataFrame]:
+        """Row chunks of a DataFrame (views, not copies) or chunks as given"""
+        if isinstance(report, pd.DataFrame):
+            if report.empty:
+                yield report
+            for start in range(0, len(report), self.chunk_size):
+                yield report.iloc[start:start + self.chunk_size]
+        else:
+            yield from report
+
+    def _write_csv(self, chunks: Iterator[pd.DataFrame], path: str):
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(f, header=i == 0)
+
+    def _write_jsonl(self, chunks: Iterator[pd.DataFrame], path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                if chunk.empty:
+                    continue
+                records = _index_as_columns(chunk)
+                f.write(records.to_json(orient='records', lines=True, force_ascii=False))
+
+    def _write_parquet(self, chunks: Iterator[pd.DataFrame], path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet reports require pyarrow (pip install pyarrow)") from e
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(_index_as_columns(chunk), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression=self.parquet_compression)
+                elif table.schema != writer.schema:
+                    table = table.cast(writer.schema)
+                writer.write_table(table)
+            if writer is None:
+                # No chunks at all: still write a valid file holding just the topic column
+                empty = pa.table({'topic': pa.array([], type=pa.string())})
+                pq.write_table(empty, path, compression=self.parquet_compression)
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+def _index_as_columns(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Move the (topic[, app_id]) index into columns; an unnamed level becomes 'topic'"""
+    names = [name or 'topic' for name in chunk.index.names]
+    return chunk.rename_axis(names).reset_index()
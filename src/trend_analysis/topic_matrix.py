@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Topic Matrix - compact int32 topic×day count storage
+
+Counts live in one dense int32 buffer indexed by (topic row, day ordinal),
+with spare capacity on both axes so appending a day or a topic is amortized
+O(1) instead of a full frame copy. Topic names are kept in a separate
+dictionary keyed by integer topic ID and only applied on export.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+DayLike = Union[date, datetime, str]
+
+
+class TopicDayMatrix:
+    """
+    Topic-ID × day-ordinal count matrix.
+
+    Day ordinal 0 is ``start``. Rows are allocated in the order topics are
+    first seen; ``topic_ids[row]`` gives the topic ID of a row and ``names``
+    maps topic IDs to display labels.
+    """
+
+    def __init__(self, start: DayLike, n_days: int = 0, capacity: tuple = (16, 32)):
+        self.start = _to_date(start)
+        self.names: Dict[int, str] = {}
+        self._data = np.zeros((max(1, capacity[0]), max(1, capacity[1], n_days)), dtype=np.int32)
+        self._ids = np.zeros(self._data.shape[0], dtype=np.int64)
+        self._rows: Dict[int, int] = {}
+        self._interned: Dict[str, int] = {}
+        self._next_id = 0
+        self._n_topics = 0
+        self._n_days = n_days
+
+    @property
+    def shape(self) -> tuple:
+        return self._n_topics, self._n_days
+
+    @property
+    def n_days(self) -> int:
+        return self._n_days
+
+    @property
+    def topic_ids(self) -> np.ndarray:
+        return self._ids[:self._n_topics]
+
+    @property
+    def counts(self) -> np.ndarray:
+        """(n_topics, n_days) view of the stored counts (not a copy)"""
+        return self._data[:self._n_topics, :self._n_days]
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes + self._ids.nbytes
+
+    def day(self, ordinal: int) -> date:
+        return self.start + timedelta(days=ordinal)
+
+    def ordinal(self, day: DayLike) -> int:
+        return (_to_date(day) - self.start).days
+
+    def row(self, topic_id: int) -> int:
+        """Row of a topic, allocating one (amortized O(1)) if it is new"""
+        topic_id = int(topic_id)
+        row = self._rows.get(topic_id)
+        if row is None:
+            row = self._n_topics
+            if row == self._data.shape[0]:
+                self._grow(rows=2 * row)
+            self._ids[row] = topic_id
+            self._rows[topic_id] = row
+            self._n_topics += 1
+            self._next_id = max(self._next_id, topic_id + 1)
+        return row
+
+    def intern(self, name: str) -> int:
+        """Topic ID for a free-text name, assigning the next unused ID if needed"""
+        topic_id = self._interned.get(name)
+        if topic_id is None:
+            topic_id = self._interned[name] = self._next_id
+            self.names[topic_id] = name
+            self.row(topic_id)
+        return topic_id
+
+    def append_day(self, counts: Optional[Mapping[int, int]] = None) -> int:
+        """Add the next day (optionally with its counts) and return its ordinal"""
+        ordinal = self._n_days
+        if ordinal == self._data.shape[1]:
+            self._grow(cols=2 * ordinal)
+        self._n_days += 1
+        if counts:
+            self.add_counts(ordinal, counts)
+        return ordinal
+
+    def add_counts(self, day: Union[int, DayLike], counts: Mapping[int, int]):
+        """Add ``{topic_id: count}`` to one day, given as an ordinal or a date"""
+        ordinal = day if isinstance(day, (int, np.integer)) else self.ordinal(day)
+        if ordinal < 0:
+            raise ValueError(f"Day {self.day(ordinal)} is before the matrix start {self.start}")
+        while ordinal >= self._n_days:
+            self.append_day()
+        rows = [self.row(topic_id) for topic_id in counts]
+        np.add.at(self._data[:, ordinal], rows, np.fromiter(counts.values(), dtype=np.int32, count=len(rows)))
+
+    def collapse(self, resolve: Callable[[int], int]) -> 'TopicDayMatrix':
+        """New matrix with each topic's row summed into ``resolve(topic_id)``"""
+        merged = TopicDayMatrix(self.start, self._n_days, capacity=(self._n_topics, self._n_days))
+        merged.names = dict(self.names)
+        merged._interned = dict(self._interned)
+        targets = np.array([merged.row(resolve(int(t))) for t in self.topic_ids], dtype=np.int64)
+        np.add.at(merged._data[:, :self._n_days], targets, self.counts)
+        return merged
+
+    def to_frame(self, labels: bool = True, date_format: str = '%b %d') -> pd.DataFrame:
+        """
+        Topics × days DataFrame sharing memory with the matrix.
+
+        Rows are topic names (``Topic N`` when unnamed) or topic IDs; columns
+        are the days formatted with ``date_format``.
+        """
+        if labels:
+            index = pd.Index([self.names.get(int(t), f"Topic {t}") for t in self.topic_ids])
+        else:
+            index = pd.Index(self.topic_ids, name='topic_id')
+        columns = [self.day(i).strftime(date_format) for i in range(self._n_days)]
+        return pd.DataFrame(self.counts, index=index, columns=columns, copy=False)
+
+    def order_by_total(self) -> 'TopicDayMatrix':
+        """New matrix with rows sorted by total count, largest first"""
+        order = np.argsort(-self.counts.sum(axis=1, dtype=np.int64), kind='stable')
+        ordered = TopicDayMatrix(self.start, self._n_days, capacity=(self._n_topics, self._n_days))
+        ordered.names = dict(self.names)
+        ordered._interned = dict(self._interned)
+        for topic_id in self.topic_ids[order]:
+            ordered.row(topic_id)
+        ordered._data[:self._n_topics, :self._n_days] = self.counts[order]
+        return ordered
+
+    @classmethod
+    def from_rows(cls, rows: Mapping[str, Iterable[int]], start: DayLike) -> 'TopicDayMatrix':
+        """Build from ``{topic name: daily counts}`` without a transpose"""
+        data = np.array([list(values) for values in rows.values()], dtype=np.int32).reshape(len(rows), -1)
+        matrix = cls(start, data.shape[1], capacity=data.shape)
+        for name in rows:
+            matrix.intern(name)
+        matrix._data[:len(rows), :data.shape[1]] = data
+        return matrix
+
+    @classmethod
+    def from_daily_counts(cls, daily_counts: Mapping[str, Mapping[str, int]], start: DayLike,
+                          end: DayLike) -> 'TopicDayMatrix':
+        """
+        Build from checkpoint-style ``{'YYYY-MM-DD': {topic key: count}}`` for
+        [start, end). Numeric keys are topic IDs; other keys are interned as names.
+        """
+        start, end = _to_date(start), _to_date(end)
+        matrix = cls(start, (end - start).days)
+        in_window = {day: counts for day, counts in daily_counts.items()
+                     if 0 <= matrix.ordinal(day) < matrix.n_days}
+        named: List[str] = []
+        for counts in in_window.values():
+            for key in counts:
+                if _is_topic_id(key):
+                    matrix.row(int(key))
+                else:
+                    named.append(key)
+        ids = {key: matrix.intern(key) for key in dict.fromkeys(named)}
+
+        for day, counts in in_window.items():
+            if counts:
+                matrix.add_counts(day, {
+                    (int(key) if _is_topic_id(key) else ids[key]): n for key, n in counts.items()
+                })
+        return matrix
+
+    def _grow(self, rows: Optional[int] = None, cols: Optional[int] = None):
+        rows = max(rows or 0, self._data.shape[0])
+        cols = max(cols or 0, self._data.shape[1])
+        data = np.zeros((rows, cols), dtype=np.int32)
+        data[:self._n_topics, :self._n_days] = self.counts
+        self._data = data
+        ids = np.zeros(rows, dtype=np.int64)
+        ids[:self._n_topics] = self.topic_ids
+        self._ids = ids
+
+
+def _to_date(day: DayLike) -> date:
+    if isinstance(day, datetime):
+        return day.date()
+    if isinstance(day, date):
+        return day
+    return datetime.strptime(day, '%Y-%m-%d').date()
+
+
+def _is_topic_id(key) -> bool:
+    return isinstance(key, (int, np.integer)) or (isinstance(key, str) and key.lstrip('-').isdigit())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Trend Calculator - vectorized trend statistics over a topic×day count matrix
+
+All statistics are computed for every topic at once on an (n_topics, n_days)
+NumPy array. ``TrendState`` carries the same statistics forward one day at a
+time in O(n_topics), so a daily run never recomputes the window.
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class TrendCalculator:
+    """
+    Rolling means, EWMA z-score spike flags and week-over-week deltas.
+
+    A day is a spike for a topic when its count is at least ``min_count``
+    and lies ``z_threshold`` standard deviations above the topic's EWMA
+    baseline as it stood the day before. The first ``window`` days only
+    warm the baseline up and are never flagged.
+    """
+
+    def __init__(self, window: int = 7, ewma_alpha: float = 0.3, z_threshold: float = 3.0,
+                 min_count: int = 5, eps: float = 1.0):
+        self.window = window
+        self.ewma_alpha = ewma_alpha
+        self.z_threshold = z_threshold
+        self.min_count = min_count
+        # Added to the variance so sparse topics don't turn a single review into a spike
+        self.eps = eps
+
+    def rolling_mean(self, counts: np.ndarray) -> np.ndarray:
+        """Trailing mean over up to ``window`` days (shorter at the start)"""
+        counts = np.asarray(counts, dtype=np.float64)
+        cumsum = np.cumsum(counts, axis=1)
+        shifted = np.zeros_like(cumsum)
+        shifted[:, self.window:] = cumsum[:, :-self.window]
+        lengths = np.minimum(np.arange(1, counts.shape[1] + 1), self.window)
+        return (cumsum - shifted) / lengths
+
+    def ewma(self, counts: np.ndarray):
+        """
+        EWMA mean and variance *before* each day, shape (n_topics, n_days)
+        """
+        counts = np.asarray(counts, dtype=np.float64)
+        n_topics, n_days = counts.shape
+        means = np.zeros((n_topics, n_days))
+        variances = np.zeros((n_topics, n_days))
+        mean = counts[:, 0].copy() if n_days else np.zeros(n_topics)
+        var = np.zeros(n_topics)
+        for day in range(n_days):
+            means[:, day], variances[:, day] = mean, var
+            mean, var = _ewma_step(mean, var, counts[:, day], self.ewma_alpha)
+        return means, variances
+
+    def zscores(self, counts: np.ndarray) -> np.ndarray:
+        """Deviation of each day from the prior EWMA baseline, in standard deviations"""
+        counts = np.asarray(counts, dtype=np.float64)
+        means, variances = self.ewma(counts)
+        return (counts - means) / _scale(means, variances, self.eps)
+
+    def spikes(self, counts: np.ndarray, zscores: Optional[np.ndarray] = None) -> np.ndarray:
+        """Boolean spike flags, shape (n_topics, n_days)"""
+        counts = np.asarray(counts)
+        z = self.zscores(counts) if zscores is None else zscores
+        warmed_up = np.arange(counts.shape[1]) >= self.window
+        return (z >= self.z_threshold) & (counts >= self.min_count) & warmed_up
+
+    def week_over_week(self, counts: np.ndarray) -> np.ndarray:
+        """Last ``window`` days total minus the ``window`` days before it"""
+        counts = np.asarray(counts, dtype=np.float64)
+        w = self.window
+        return counts[:, -w:].sum(axis=1) - counts[:, -2 * w:-w].sum(axis=1)
+
+    def compute(self, counts: np.ndarray) -> Dict[str, np.ndarray]:
+        """All per-topic statistics in one pass"""
+        counts = np.asarray(counts, dtype=np.float64)
+        w = min(self.window, counts.shape[1])
+        z = self.zscores(counts)
+        return {
+            'total': counts.sum(axis=1),
+            'volatility': counts.std(axis=1, ddof=1) if counts.shape[1] > 1 else np.zeros(len(counts)),
+            'rolling_mean': self.rolling_mean(counts),
+            'zscore': z,
+            'spikes': self.spikes(counts, z),
+            'wow_delta': self.week_over_week(counts),
+            'trend': counts[:, -w:].mean(axis=1) - counts[:, :w].mean(axis=1),
+        }
+
+    def summarize(self, report_df: pd.DataFrame) -> pd.DataFrame:
+        """Per-topic summary frame for a topics × days report"""
+        stats = self.compute(report_df.to_numpy())
+        return pd.DataFrame({
+            'total': stats['total'].astype(int),
+            'volatility': stats['volatility'],
+            'rolling_mean': stats['rolling_mean'][:, -1],
+            'wow_delta': stats['wow_delta'],
+            'trend': stats['trend'],
+            'zscore_today': stats['zscore'][:, -1],
+            'spike_today': stats['spikes'][:, -1],
+            'spike_days': stats['spikes'].sum(axis=1),
+        }, index=report_df.index)
+
+    def state(self, counts: Optional[np.ndarray] = None, n_topics: int = 0) -> 'TrendState':
+        """Create an incremental state, optionally primed with history"""
+        state = TrendState(self, n_topics if counts is None else len(counts))
+        if counts is not None:
+            for day in np.asarray(counts, dtype=np.float64).T:
+                state.append(day)
+        return state
+
+
+class TrendState:
+    """
+    Incremental trend statistics: ``append`` one day column in O(n_topics).
+
+    Keeps the EWMA mean/variance per topic and a ring buffer of the last
+    ``2 * window`` days for the rolling mean and week-over-week delta.
+    """
+
+    def __init__(self, calculator: TrendCalculator, n_topics: int):
+        self.calc = calculator
+        self.days = 0
+        self.mean = np.zeros(n_topics)
+        self.var = np.zeros(n_topics)
+        self._ring = np.zeros((n_topics, 2 * calculator.window))
+
+    @property
+    def n_topics(self) -> int:
+        return len(self.mean)
+
+    def grow(self, n_topics: int):
+        """Add rows for newly discovered topics (zero history)"""
+        extra = n_topics - self.n_topics
+        if extra <= 0:
+            return
+        self.mean = np.concatenate([self.mean, np.zeros(extra)])
+        self.var = np.concatenate([self.var, np.zeros(extra)])
+        self._ring = np.vstack([self._ring, np.zeros((extra, self._ring.shape[1]))])
+
+    def append(self, column: Sequence[float]) -> Dict[str, np.ndarray]:
+        """Fold in one day's counts and return that day's statistics"""
+        calc = self.calc
+        column = np.asarray(column, dtype=np.float64)
+        self.grow(len(column))
+        if len(column) < self.n_topics:
+            column = np.concatenate([column, np.zeros(self.n_topics - len(column))])
+
+        if self.days == 0:
+            self.mean = column.copy()
+        z = (column - self.mean) / _scale(self.mean, self.var, calc.eps)
+        self.mean, self.var = _ewma_step(self.mean, self.var, column, calc.ewma_alpha)
+
+        w = calc.window
+        slot = self.days % (2 * w)
+        self._ring[:, slot] = column
+        self.days += 1
+
+        recent = [(self.days - 1 - i) % (2 * w) for i in range(min(w, self.days))]
+        previous = [(self.days - 1 - i) % (2 * w) for i in range(w, min(2 * w, self.days))]
+        return {
+            'zscore': z,
+            'spike': (z >= calc.z_threshold) & (column >= calc.min_count) & (self.days > w),
+            'ewma': self.mean.copy(),
+            'rolling_mean': self._ring[:, recent].mean(axis=1),
+            'wow_delta': self._ring[:, recent].sum(axis=1) - self._ring[:, previous].sum(axis=1),
+        }
+
+
+def _scale(mean: np.ndarray, var: np.ndarray, eps: float) -> np.ndarray:
+    """Standard deviation for z-scores, floored at the Poisson level for counts"""
+    return np.sqrt(np.maximum(var, mean) + eps)
+
+
+def _ewma_step(mean: np.ndarray, var: np.ndarray, x: np.ndarray, alpha: float):
+    """One exponentially weighted mean/variance update"""
+    diff = x - mean
+    incr = alpha * diff
+    return mean + incr, (1 - alpha) * (var + diff * incr)
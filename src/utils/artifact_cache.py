@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Artifact Cache - content-addressed store for intermediate pipeline results
+
+An artifact's key hashes everything that determines it: the stage name, the
+stage's code version (the ``VERSION`` attribute of the class doing the
+work, bumped whenever its output changes), fingerprints of its inputs
+(usually the keys of the upstream artifacts) and the config fields the
+stage reads. Unchanged inputs
+therefore hit the cache, and changing a setting only misses for the stages
+that read it and those downstream of them.
+
+    cache = ArtifactCache('data/artifacts', max_bytes=2 ** 30)
+    key = cache.key('clean', DataCleaner.VERSION, raw_key, min_length=3)
+    cleaned = cache.get_or_compute(key, lambda: cleaner.clean(raw))
+
+Frames are stored as Parquet, arrays as ``.npy`` and anything else pickled.
+Once the cache grows past ``max_bytes`` the least recently used artifacts
+are deleted.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+try:
+    from .logger import get_logger
+except ImportError:
+    from logger import get_logger
+
+logger = get_logger(__name__)
+
+_MISSING = object()
+EXTENSIONS = ('.parquet', '.npy', '.pkl')
+
+
+def fingerprint(value: Any) -> str:
+    """Stable content hash of a (nested) value, frame or array"""
+    digest = hashlib.blake2b(digest_size=16)
+    _feed(digest, value)
+    return digest.hexdigest()
+
+
+def _feed(digest, value: Any):
+    if isinstance(value, np.ndarray):
+        digest.update(f"ndarray{value.dtype.str}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif type(value).__name__ == 'DataFrame':
+        import pandas as pd
+        digest.update(f"frame{list(value.columns)}{[str(t) for t in value.dtypes]}".encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, dict):
+        digest.update(b'{')
+        for k in sorted(value, key=str):
+            _feed(digest, str(k))
+            _feed(digest, value[k])
+        digest.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'[')
+        for item in value:
+            _feed(digest, item)
+        digest.update(b']')
+    elif isinstance(value, bytes):
+        digest.update(b'b' + value)
+    else:
+        digest.update(json.dumps(value, default=str).encode('utf-8'))
+
+
+class ArtifactCache:
+    """
+    Size-bounded, content-addressed artifact store in one directory.
+
+    Recency is the file's modification time, refreshed on every hit, so the
+    LRU order survives restarts. Several processes may share a directory:
+    writes are atomic renames and an artifact evicted by another process
+    is simply a miss.
+    """
+
+    def __init__(self, directory: str = 'data/artifacts', max_bytes: Optional[int] = 2 ** 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._bytes = 0
+        self._scan()
+
+    @staticmethod
+    def key(stage: str, version: Any, *inputs: Any, **config: Any) -> str:
+        """Key for ``stage`` at code ``version`` over ``inputs`` and the config it reads"""
+        return f"{stage}-{fingerprint([version, list(inputs), config])}"
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Counters change under the lock too: backfill reads from several threads
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return default
+        path = entry[0]
+        try:
+            value = _load(path)
+            os.utime(path)
+        except (FileNotFoundError, EOFError, ValueError, pickle.UnpicklingError):
+            with self._lock:
+                self._forget(key)
+                self.stats['misses'] += 1
+            return default
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+        return value
+
+    def put(self, key: str, value: Any) -> Any:
+        """Store ``value`` under ``key`` (atomically) and return it"""
+        os.makedirs(self.directory, exist_ok=True)
+        extension = _extension(value)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.artifact-', suffix=extension)
+        os.close(fd)
+        try:
+            _dump(value, tmp_path)
+            path = os.path.join(self.directory, key + extension)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self._forget(key)
+            size = os.path.getsize(path)
+            self._entries[key] = (path, size)
+            self._bytes += size
+            self._evict(keep=key)
+        return value
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, compute())
+        return value
+
+    def discard(self, key: str):
+        """Delete one artifact if it is stored"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def _scan(self):
+        if not os.path.isdir(self.directory):
+            return
+        found = []
+        for name in os.listdir(self.directory):
+            stem, extension = os.path.splitext(name)
+            if extension in EXTENSIONS and not name.startswith('.'):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                found.append((stat.st_mtime, stem, path, stat.st_size))
+        for _, key, path, size in sorted(found):
+            self._entries[key] = (path, size)
+            self._bytes += size
+
+    def _evict(self, keep: str):
+        while self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                self._entries.move_to_end(keep)
+                continue
+            self._remove(oldest)
+            self.stats['evictions'] += 1
+            logger.debug("evicted artifact %s", oldest)
+
+    def _remove(self, key: str):
+        path, _ = self._entries[key]
+        self._forget(key)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _forget(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+
+def _extension(value: Any) -> str:
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        return '.npy'
+    if type(value).__name__ == 'DataFrame':
+        return '.parquet'
+    return '.pkl'
+
+
+def _dump(value: Any, path: str):
+    if path.endswith('.npy'):
+        with open(path, 'wb') as f:
+            np.save(f, value, allow_pickle=False)
+    elif path.endswith('.parquet'):
+        value.to_parquet(path, compression='zstd')
+    else:
+        with open(path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load(path: str) -> Any:
+    if path.endswith('.npy'):
+        return np.load(path, allow_pickle=False)
+    if path.endswith('.parquet'):
+        import pandas as pd
+        return pd.read_parquet(path)
+    with open(path, 'rb') as f:
+        return pickle.load(f)
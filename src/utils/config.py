@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Configuration - typed settings from defaults, a YAML/TOML file and the environment
+
+Settings are resolved in order defaults -> file -> ``PULSEGEN_*`` environment
+variables, coerced to each field's type and validated once. ``get_config``
+caches the result for the process; a ``Config`` is a plain dataclass, so it
+pickles cleanly into worker processes (pass it to ``set_config`` in the
+worker's initializer).
+
+    # pulsegen.toml
+    analysis_period_days = 30
+
+    [embedding]
+    batch_size = 128        # -> embedding_batch_size
+    workers = 4
+
+    $ PULSEGEN_EMBEDDING_BATCH_SIZE=256 PULSEGEN_CONFIG=pulsegen.toml python main.py
+"""
+
+import dataclasses
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Union, get_args, get_origin, get_type_hints
+
+ENV_PREFIX = 'PULSEGEN_'
+CONFIG_ENV = 'PULSEGEN_CONFIG'
+# PULSEGEN_* variables read elsewhere that are not settings (see utils.logger)
+NON_SETTING_ENV = frozenset({CONFIG_ENV, 'PULSEGEN_LOG_LEVEL'})
+
+_CACHE: Dict[Optional[str], 'Config'] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+@dataclass
+class Config:
+    """All settings of the agent; every field can be set from a file or the environment"""
+
+    # Analysis
+    similarity_threshold: float = 0.7
+    max_reviews_per_day: Optional[int] = 1000  # per-day reservoir sample size; None keeps every review
+    min_cluster_size: int = 3
+    analysis_period_days: int = 30
+    default_app_id: str = "in.swiggy.android"
+    use_sample_data: bool = True
+    topic_merge_threshold: float = 0.85
+    taxonomy_mode: Optional[str] = None  # None (discovery only), "first" or "only"
+    taxonomy: Optional[Dict[str, str]] = None  # {label: description}; None uses DEFAULT_TAXONOMY
+    taxonomy_threshold: float = 0.45
+
+    # Review source
+    review_source_url: Optional[str] = None
+    scraper_page_size: int = 200
+    scraper_max_workers: int = 4
+    scraper_max_retries: int = 4
+    scraper_backend: str = "asyncio"  # "asyncio" (pooled, for review_source_url) or "threads"
+    scraper_rate_limit: Optional[float] = None  # requests/s across all apps; None is unlimited
+    scraper_app_rate_limit: Optional[float] = None  # requests/s per app
+
+    # Cleaning
+    cleaner_min_length: int = 3
+    cleaner_language: str = "en"
+    cleaner_processes: int = 0
+    use_spacy: bool = False
+    near_duplicate_threshold: Optional[float] = 0.8  # MinHash Jaccard; None embeds every review
+    near_duplicate_num_perm: int = 64
+    near_duplicate_bands: int = 16
+
+    # Embeddings
+    embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_backend: str = "sentence-transformers"  # or "onnx" / "onnx-int8" (ONNX Runtime on CPU)
+    embedding_threads: Optional[int] = None  # ONNX Runtime intra-op threads; None lets it decide
+    embedding_model_dir: str = "data/models"  # exported ONNX graphs
+    embedding_batch_size: int = 64
+    embedding_workers: int = 2
+    embedding_cache_dir: Optional[str] = "data/embeddings"
+    embedding_cache_dtype: str = "float16"
+    embedding_cache_max_mb: Optional[float] = None
+
+    # Topic registry and its clustering index
+    topic_registry_dir: str = "data/topics"
+    topic_max_pending: int = 20000
+    topic_index: str = "exact"  # "exact" or "ivf"
+    topic_index_nlist: Optional[int] = None
+    topic_index_nprobe: int = 24
+    topic_labeler: Optional[str] = "auto"  # None, "auto", "embedding", "keybert" or "yake"
+    topic_label_sample_size: int = 32
+    topic_label_stable_similarity: float = 0.95
+
+    # Ingestion, storage and throughput
+    checkpoint_dir: str = "data/checkpoints"
+    review_store_dir: Optional[str] = "data/reviews"
+    ingest_batch_size: int = 500
+    pipeline_queue_size: int = 4
+    max_concurrent_apps: int = 4
+    backfill_workers: int = 4
+    backfill_partition_days: int = 1
+    report_chunk_size: int = 10000
+    artifact_cache_dir: Optional[str] = "data/artifacts"  # None disables rebuild caching
+    artifact_cache_max_mb: Optional[float] = 1024
+    memory_budget_mb: Optional[float] = None  # caps ingest_batch_size so in-flight reviews fit
+    profiler: Optional[str] = None  # None, "cprofile" or "pyinstrument"
+
+    def __post_init__(self):
+        self.validate()
+
+    def validate(self) -> 'Config':
+        """Raise ValueError on the first invalid setting"""
+        hints = _field_types()
+        for f in dataclasses.fields(self):
+            setattr(self, f.name, _coerce(f.name, hints[f.name], getattr(self, f.name)))
+
+        for name in ('similarity_threshold', 'topic_merge_threshold', 'taxonomy_threshold',
+                     'topic_label_stable_similarity'):
+            if not 0 < getattr(self, name) <= 1:
+                raise ValueError(f"{name} must be in (0, 1], got {getattr(self, name)}")
+        for name in ('min_cluster_size', 'analysis_period_days', 'scraper_page_size',
+                     'scraper_max_workers', 'embedding_batch_size', 'embedding_workers', 'topic_max_pending',
+                     'topic_index_nprobe', 'topic_label_sample_size', 'near_duplicate_num_perm',
+                     'near_duplicate_bands', 'ingest_batch_size', 'pipeline_queue_size', 'max_concurrent_apps',
+                     'backfill_workers', 'backfill_partition_days',
+                     'report_chunk_size'):
+            if getattr(self, name) < 1:
+                raise ValueError(f"{name} must be at least 1, got {getattr(self, name)}")
+        for name in ('scraper_max_retries', 'cleaner_min_length', 'cleaner_processes'):
+            if getattr(self, name) < 0:
+                raise ValueError(f"{name} must not be negative, got {getattr(self, name)}")
+        if self.near_duplicate_threshold is not None and not 0 < self.near_duplicate_threshold <= 1:
+            raise ValueError(f"near_duplicate_threshold must be in (0, 1], got {self.near_duplicate_threshold}")
+        if self.near_duplicate_num_perm % max(1, self.near_duplicate_bands):
+            raise ValueError(f"near_duplicate_num_perm ({self.near_duplicate_num_perm}) must be a multiple "
+                             f"of near_duplicate_bands ({self.near_duplicate_bands})")
+        for name in ('max_reviews_per_day', 'topic_index_nlist', 'embedding_threads'):
+            if getattr(self, name) is not None and getattr(self, name) < 1:
+                raise ValueError(f"{name} must be at least 1, got {getattr(self, name)}")
+        for name in ('embedding_cache_max_mb', 'memory_budget_mb', 'artifact_cache_max_mb',
+                     'scraper_rate_limit', 'scraper_app_rate_limit'):
+            if getattr(self, name) is not None and getattr(self, name) <= 0:
+                raise ValueError(f"{name} must be positive, got {getattr(self, name)}")
+
+        choices = {
+            'taxonomy_mode': (None, 'first', 'only'),
+            'profiler': (None, 'cprofile', 'pyinstrument'),
+            'scraper_backend': ('asyncio', 'threads'),
+            'topic_index': ('exact', 'ivf'),
+            'topic_labeler': (None, 'auto', 'embedding', 'keybert', 'yake'),
+            'embedding_cache_dtype': ('float16', 'float32'),
+            'embedding_backend': ('sentence-transformers', 'onnx', 'onnx-int8'),
+        }
+        for name, allowed in choices.items():
+            if getattr(self, name) not in allowed:
+                raise ValueError(f"{name} must be one of {allowed}, got {getattr(self, name)!r}")
+        return self
+
+    def replace(self, **changes) -> 'Config':
+        """Validated copy with some settings changed"""
+        return dataclasses.replace(self, **changes)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], base: Optional['Config'] = None) -> 'Config':
+        """
+        Settings from a mapping on top of ``base`` (defaults when None).
+        Nested tables are flattened: ``{'embedding': {'batch_size': 8}}``
+        sets ``embedding_batch_size``. Unknown keys are rejected.
+        """
+        values = (base or cls()).as_dict()
+        for key, value in _flatten(data).items():
+            if key not in values:
+                raise ValueError(f"Unknown config setting: {key}")
+            values[key] = value
+        return cls(**values)
+
+    @classmethod
+    def from_file(cls, path: str, base: Optional['Config'] = None) -> 'Config':
+        return cls.from_dict(read_config_file(path), base)
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None, base: Optional['Config'] = None) -> 'Config':
+        """Settings from ``PULSEGEN_<SETTING>`` variables, e.g. PULSEGEN_EMBEDDING_WORKERS=4"""
+        environ = os.environ if environ is None else environ
+        names = {f.name for f in dataclasses.fields(cls)}
+        values = {}
+        for key, value in environ.items():
+            if key.startswith(ENV_PREFIX) and key not in NON_SETTING_ENV:
+                name = key[len(ENV_PREFIX):].lower()
+                if name not in names:
+                    raise ValueError(f"Unknown config setting in environment: {key}")
+                values[name] = value
+        return cls.from_dict(values, base)
+
+
+def read_config_file(path: str) -> Dict[str, Any]:
+    """Parse a .yaml/.yml or .toml file into a dict"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("YAML config files require PyYAML (pip install pyyaml)") from e
+        with open(path, encoding='utf-8') as f:
+            data = yaml.safe_load(f) or {}
+    elif extension == '.toml':
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        raise ValueError(f"Unsupported config file type: {path}")
+    if not isinstance(data, dict):
+        raise ValueError(f"Config file {path} must hold a mapping of settings")
+    return data
+
+
+def load_config(path: Optional[str] = None, environ: Optional[Mapping[str, str]] = None) -> Config:
+    """
+    Build a fresh Config: defaults, then ``path`` (or the file named by
+    PULSEGEN_CONFIG), then PULSEGEN_* environment variables
+    """
+    environ = os.environ if environ is None else environ
+    path = path or environ.get(CONFIG_ENV)
+    config = Config.from_file(path) if path else Config()
+    return Config.from_env(environ, base=config)
+
+
+def get_config(path: Optional[str] = None) -> Config:
+    """
+    Process-wide Config, loaded once per path. The instance is shared;
+    use ``get_config().replace(...)`` for a private, modified copy.
+    """
+    with _CACHE_LOCK:
+        config = _CACHE.get(path)
+        if config is None:
+            config = _CACHE[path] = load_config(path)
+        return config
+
+
+def set_config(config: Config, path: Optional[str] = None):
+    """Install a Config as the process-wide one, e.g. in a worker process initializer"""
+    with _CACHE_LOCK:
+        _CACHE[path] = config
+
+
+def reset_config():
+    """Forget cached configs so the next get_config reloads"""
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+
+def _flatten(data: Mapping[str, Any], prefix: str = '') -> Dict[str, Any]:
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}".replace('-', '_').lower()
+        # taxonomy is itself a mapping setting, not a section
+        if isinstance(value, Mapping) and name != 'taxonomy':
+            flat.update(_flatten(value, name + '_'))
+        else:
+            flat[name] = value
+    return flat
+
+
+_TYPES: Dict[str, Any] = {}
+
+
+def _field_types() -> Dict[str, Any]:
+    if not _TYPES:
+        _TYPES.update(get_type_hints(Config))
+    return _TYPES
+
+
+def _coerce(name: str, hint, value):
+    """Convert ``value`` (possibly an environment string) to the field's type"""
+    optional = False
+    if get_origin(hint) is Union:
+        args = [a for a in get_args(hint) if a is not type(None)]
+        optional, hint = len(args) < len(get_args(hint)), args[0]
+    if value is None or (optional and isinstance(value, str) and value.strip().lower() in ('', 'none', 'null')):
+        if optional:
+            return None
+        raise ValueError(f"{name} must not be empty")
+
+    try:
+        if hint is bool:
+            if isinstance(value, str):
+                lowered = value.strip().lower()
+                if lowered not in ('1', '0', 'true', 'false', 'yes', 'no', 'on', 'off'):
+                    raise ValueError(value)
+                return lowered in ('1', 'true', 'yes', 'on')
+            if not isinstance(value, (bool, int)):
+                raise ValueError(value)
+            return bool(value)
+        if hint is int:
+            if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+                raise ValueError(value)
+            return int(value)
+        if hint is float:
+            if isinstance(value, bool):
+                raise ValueError(value)
+            return float(value)
+        if hint is str:
+            if not isinstance(value, str):
+                raise ValueError(value)
+            return value
+        if get_origin(hint) is dict:
+            if isinstance(value, str):
+                value = json.loads(value)
+            if not isinstance(value, Mapping):
+                raise ValueError(value)
+            return {str(k): str(v) for k, v in value.items()}
+    except ValueError:
+        raise ValueError(f"Invalid value for {name}: {value!r}") from None
+    return value
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Logging helpers shared by the pipeline modules
+"""
+
+import logging
+import os
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
+
+
+def configure_logging(level: str = None):
+    """Configure the root logger; the level defaults to $PULSEGEN_LOG_LEVEL or WARNING"""
+    logging.basicConfig(level=(level or os.environ.get('PULSEGEN_LOG_LEVEL', 'WARNING')).upper(), format=LOG_FORMAT)
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Run metrics - per-stage timing, memory and throughput for one analysis run
+
+A ``RunMetrics`` object collects, for every stage it is told about, the
+wall time, CPU time, peak RSS and items in/out, plus hit/miss counters for
+caches and request latency histograms. It is written as JSON next to the report, and can optionally wrap
+the run in cProfile or pyinstrument.
+
+    metrics = RunMetrics(app_id='in.swiggy.android')
+    with metrics.stage('clean', items_in=len(df)) as stage:
+        df = cleaner.clean(df)
+        stage.items_out = len(df)
+    metrics.write_next_to('outputs/report.csv')   # outputs/report.metrics.json
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional
+
+try:
+    from .logger import get_logger
+except ImportError:
+    from logger import get_logger
+
+PROFILERS = ('cprofile', 'pyinstrument')
+
+logger = get_logger(__name__)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """High-water resident set size of this process, or None where unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+class StageMetrics:
+    """Totals for one named stage; a stage may be entered many times"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.items_in = 0
+        self.items_out = 0
+        self.peak_rss_mb: Optional[float] = None
+        # Set for stages that only enclose other stages (e.g. a whole increment)
+        self.wrapper = False
+        self.extra: Dict[str, Any] = {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        items = max(self.items_in, self.items_out)
+        data = {
+            'calls': self.calls,
+            'wall_seconds': round(self.wall_seconds, 4),
+            'cpu_seconds': round(self.cpu_seconds, 4),
+            'items_in': self.items_in,
+            'items_out': self.items_out,
+            'items_per_second': round(items / self.wall_seconds, 1) if self.wall_seconds else None,
+            'peak_rss_mb': round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+        }
+        data.update(self.extra)
+        return data
+
+
+class _StageHandle:
+    """Yielded by ``RunMetrics.stage``; set ``items_out`` before leaving the block"""
+
+    def __init__(self, items_in: int):
+        self.items_out = items_in
+
+
+class RunMetrics:
+    """
+    Metrics for one run (one app, one target date).
+
+    ``stage`` is safe to use from several threads. CPU time is the calling
+    thread's CPU time, so concurrent stages are not double counted.
+    ``profile`` is None, ``'cprofile'`` or ``'pyinstrument'``; when set,
+    ``profiling()`` records the wrapped block and ``write_next_to`` also
+    writes the profile.
+    """
+
+    def __init__(self, app_id: Optional[str] = None, target_date: Optional[datetime] = None,
+                 profile: Optional[str] = None):
+        if profile is not None and profile not in PROFILERS:
+            raise ValueError(f"Unknown profiler: {profile}")
+        self.app_id = app_id
+        self.target_date = target_date
+        self.profile = profile
+        self.started_at = datetime.now()
+        self.stages: Dict[str, StageMetrics] = {}
+        self.caches: Dict[str, Dict[str, Any]] = {}
+        self.latencies: Dict[str, Dict[str, Any]] = {}
+        self._profiler = None
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _stage(self, name: str) -> StageMetrics:
+        if name not in self.stages:
+            self.stages[name] = StageMetrics(name)
+        return self.stages[name]
+
+    @contextmanager
+    def stage(self, name: str, items_in: int = 0, wrapper: bool = False):
+        """
+        Time the enclosed block as ``name``. A ``wrapper`` stage encloses
+        other recorded stages, so it is never reported as the bottleneck.
+        """
+        handle = _StageHandle(items_in)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield handle
+        finally:
+            self.record(name, wall=time.perf_counter() - wall, cpu=time.thread_time() - cpu,
+                        items_in=items_in, items_out=handle.items_out, wrapper=wrapper)
+
+    def record(self, name: str, wall: float = 0.0, cpu: float = 0.0, items_in: int = 0, items_out: int = 0,
+               calls: int = 1, wrapper: bool = False, **extra):
+        """Add measurements for a stage timed elsewhere"""
+        rss = peak_rss_mb()
+        with self._lock:
+            stage = self._stage(name)
+            stage.wrapper = stage.wrapper or wrapper
+            stage.calls += calls
+            stage.wall_seconds += wall
+            stage.cpu_seconds += cpu
+            stage.items_in += items_in
+            stage.items_out += items_out
+            stage.peak_rss_mb = rss
+            stage.extra.update(extra)
+
+    def record_pipeline(self, stats: Mapping[str, Any], prefix: str = ''):
+        """Fold in ``StagedPipeline.stats`` (busy time counts as wall time)"""
+        for name, s in stats.items():
+            self.record(prefix + name, wall=s.busy_seconds, cpu=s.cpu_seconds, items_in=s.items_in,
+                        items_out=s.items_out, calls=0, blocked_seconds=round(s.blocked_seconds, 4),
+                        max_queue_depth=s.max_queue_depth)
+
+    def record_cache(self, name: str, before: Mapping[str, int], after: Mapping[str, int]):
+        """Counter deltas for a cache between two snapshots of its stats"""
+        delta = {k: after[k] - before.get(k, 0) for k in after}
+        requested = delta.get('requested')
+        if requested:
+            delta['hit_rate'] = round(delta.get('cache_hits', 0) / requested, 4)
+        with self._lock:
+            self.caches[name] = delta
+
+    def record_latency(self, name: str, histogram: Mapping[str, Any]):
+        """Keep a latency histogram summary (e.g. ``LatencyHistogram.as_dict()``)"""
+        with self._lock:
+            self.latencies[name] = dict(histogram)
+
+    @contextmanager
+    def profiling(self):
+        """Profile the wrapped block with the configured profiler (no-op when unset)"""
+        if self.profile is None:
+            yield
+            return
+        if self.profile == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            try:
+                yield
+            finally:
+                self._profiler.disable()
+        else:
+            from pyinstrument import Profiler
+            self._profiler = Profiler()
+            self._profiler.start()
+            try:
+                yield
+            finally:
+                self._profiler.stop()
+
+    def finish(self):
+        self._finished = time.perf_counter()
+
+    @property
+    def wall_seconds(self) -> float:
+        return (self._finished or time.perf_counter()) - self._started
+
+    def bottleneck(self) -> Optional[str]:
+        """Stage with the most wall time (pipeline busy time), wrapper stages aside"""
+        leaves = [s for s in self.stages.values() if not s.wrapper]
+        if not leaves:
+            return None
+        return max(leaves, key=lambda s: s.wall_seconds).name
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'app_id': self.app_id,
+                'target_date': self.target_date.strftime('%Y-%m-%d') if self.target_date else None,
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'wall_seconds': round(self.wall_seconds, 4),
+                'peak_rss_mb': round(peak_rss_mb(), 1) if peak_rss_mb() is not None else None,
+                'bottleneck': self.bottleneck(),
+                'stages': {name: s.as_dict() for name, s in self.stages.items()},
+                'caches': dict(self.caches),
+                'latency': dict(self.latencies),
+            }
+
+    def write(self, path: str) -> str:
+        """Write the metrics JSON atomically"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.as_dict(), f, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        logger.debug("metrics written to %s (bottleneck: %s)", path, self.bottleneck())
+        return path
+
+    def write_next_to(self, report_file: str) -> str:
+        """Write ``<report>.metrics.json`` (and the profile, if any) beside a report"""
+        base = os.path.splitext(report_file)[0]
+        if self._profiler is not None:
+            if self.profile == 'cprofile':
+                self._profiler.dump_stats(base + '.prof')
+            else:
+                with open(base + '.profile.html', 'w', encoding='utf-8') as f:
+                    f.write(self._profiler.output_html())
+        return self.write(base + '.metrics.json')
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Staged pipeline executor with bounded queues between stages
+
+Stages run concurrently and hand items to each other through bounded
+queues, so an I/O-bound source (the scraper) overlaps CPU-bound work
+(cleaning, embedding) instead of alternating with it. A full queue blocks
+its producer, which is the backpressure signal; the time each stage spends
+blocked is recorded in its ``StageStats``.
+
+Thread stages suit work that releases the GIL (I/O, NumPy, torch). Process
+stages fan a picklable, stateless function out over a process pool.
+
+Items are numbered as the source produces them. A thread stage with
+several workers finishes items out of order unless it is ``ordered``, in
+which case it holds results back until their predecessors are out; put one
+in front of any stateful stage whose result depends on the order it sees
+items in. An ordered stage takes at most ``workers + queue_size`` items
+ahead of the oldest one it has not emitted, so a stalled item still
+bounds the run; this needs its input in source order, so every stage in
+front of it must keep the order too.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+_END = object()
+_POLL_SECONDS = 0.05
+
+
+class _Stopped(Exception):
+    """Raised inside pipeline threads once the run has been cancelled"""
+
+
+class Stage:
+    """
+    One pipeline step: ``fn`` maps an input item to an output item.
+
+    ``kind`` is ``'thread'`` (``workers`` threads share the input queue) or
+    ``'process'`` (``fn`` runs on a pool of ``workers`` processes, so it must
+    pickle: a module-level function, or a bound method of a picklable
+    object). Thread stages with several workers may emit items out of order
+    unless ``ordered`` is set, which restores the source's order; process
+    stages always emit items in the order they received them.
+    """
+
+    @property
+    def keeps_order(self) -> bool:
+        return self.kind == 'process' or self.workers == 1 or self.ordered
+
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers: int = 1, kind: str = 'thread',
+                 initializer: Optional[Callable] = None, initargs: tuple = (), ordered: bool = False):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"Unknown stage kind: {kind}")
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.kind = kind
+        self.initializer = initializer
+        self.initargs = initargs
+        self.ordered = ordered
+
+
+class StageStats:
+    """Counters for one stage of a run"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+        # CPU time of the stage's own threads; not measured for process stages
+        self.cpu_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+
+    def record(self, busy: float = 0.0, blocked: float = 0.0, items_in: int = 0, items_out: int = 0,
+               cpu: float = 0.0):
+        with self._lock:
+            self.busy_seconds += busy
+            self.cpu_seconds += cpu
+            self.blocked_seconds += blocked
+            self.items_in += items_in
+            self.items_out += items_out
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'items_in': self.items_in,
+            'items_out': self.items_out,
+            'busy_seconds': round(self.busy_seconds, 4),
+            'cpu_seconds': round(self.cpu_seconds, 4),
+            'blocked_seconds': round(self.blocked_seconds, 4),
+            'max_queue_depth': self.max_queue_depth,
+        }
+
+
+def max_items_in_flight(workers: Sequence[int], queue_size: int, ordered: Sequence[bool] = ()) -> int:
+    """
+    Most items a pipeline with these per-stage worker counts can hold at
+    once: every queue full, one item per busy worker (or, for the stages
+    flagged in ``ordered``, busy and held back together up to workers +
+    queue_size), plus the one the source is producing and the one the
+    consumer is handling
+    """
+    ordered = list(ordered) + [False] * (len(workers) - len(ordered))
+    held = sum(queue_size for flag in ordered if flag)
+    return (len(workers) + 1) * queue_size + sum(max(1, w) for w in workers) + held + 2
+
+
+class StagedPipeline:
+    """
+    Runs items from a source through a list of stages.
+
+    ``run`` returns a generator of final items; consuming it drives the
+    pipeline and any stage error is re-raised there. Closing the generator
+    early cancels the remaining work.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 4):
+        for index, stage in enumerate(stages):
+            if stage.ordered and not all(s.keeps_order for s in stages[:index]):
+                raise ValueError(f"Ordered stage {stage.name!r} needs every stage before it to keep the order")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats: Dict[str, StageStats] = {}
+        self._queues: List[queue.Queue] = []
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Current number of items waiting in front of each stage"""
+        return {stage.name: q.qsize() for stage, q in zip(self.stages, self._queues)}
+
+    def run(self, source: Iterable[Any]) -> Iterator[Any]:
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        self.stats = {'source': StageStats('source')}
+        self.stats.update({stage.name: StageStats(stage.name) for stage in self.stages})
+        self._queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+
+        def fail(error):
+            errors.append(error)
+            stop.set()
+
+        threads = [threading.Thread(target=self._feed, args=(source, stop, fail), daemon=True)]
+        for index, stage in enumerate(self.stages):
+            inbox, outbox = self._queues[index], self._queues[index + 1]
+            if stage.kind == 'process':
+                threads.append(threading.Thread(
+                    target=self._run_process_stage, args=(stage, inbox, outbox, stop, fail), daemon=True))
+            else:
+                # Shared by the stage's workers: live worker count and, when ordered,
+                # items taken so far, the next sequence number due and results waiting for it
+                shared = {'remaining': stage.workers, 'taken': 0, 'next': 0, 'held': {}}
+                lock = threading.Condition()
+                for _ in range(stage.workers):
+                    threads.append(threading.Thread(
+                        target=self._run_thread_worker,
+                        args=(stage, inbox, outbox, stop, fail, shared, lock), daemon=True))
+
+        for thread in threads:
+            thread.start()
+        try:
+            results = self._queues[-1]
+            while True:
+                try:
+                    item = results.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    if stop.is_set():
+                        break
+                    continue
+                if item is _END:
+                    break
+                yield item[1]
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+
+    def _put(self, q: queue.Queue, item, stop: threading.Event, stats: StageStats):
+        started = time.perf_counter()
+        while True:
+            try:
+                q.put(item, timeout=_POLL_SECONDS)
+                break
+            except queue.Full:
+                if stop.is_set():
+                    raise _Stopped()
+        stats.record(blocked=time.perf_counter() - started)
+        stats.max_queue_depth = max(stats.max_queue_depth, q.qsize())
+
+    @staticmethod
+    def _get(q: queue.Queue, stop: threading.Event):
+        while True:
+            try:
+                return q.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                if stop.is_set():
+                    raise _Stopped()
+
+    def _feed(self, source, stop, fail):
+        stats = self.stats['source']
+        try:
+            iterator = iter(source)
+            seq = 0
+            while True:
+                started, cpu = time.perf_counter(), time.thread_time()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                stats.record(busy=time.perf_counter() - started, items_out=1, cpu=time.thread_time() - cpu)
+                self._put(self._queues[0], (seq, item), stop, stats)
+                seq += 1
+            self._put(self._queues[0], _END, stop, stats)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            fail(e)
+
+    def _run_thread_worker(self, stage, inbox, outbox, stop, fail, shared, lock):
+        stats = self.stats[stage.name]
+        window = stage.workers + self.queue_size
+        try:
+            while True:
+                if stage.ordered:
+                    # Reserve the next item, waiting while the window behind a stalled one is full
+                    started = time.perf_counter()
+                    with lock:
+                        while shared['taken'] - shared['next'] >= window:
+                            if stop.is_set():
+                                raise _Stopped()
+                            lock.wait(_POLL_SECONDS)
+                        shared['taken'] += 1
+                    stats.record(blocked=time.perf_counter() - started)
+                item = self._get(inbox, stop)
+                if item is _END:
+                    # Let sibling workers see the end marker; the last one forwards it
+                    inbox.put(_END)
+                    with lock:
+                        if stage.ordered:
+                            shared['taken'] -= 1
+                        shared['remaining'] -= 1
+                        last = shared['remaining'] == 0
+                    if last:
+                        self._put(outbox, _END, stop, stats)
+                    return
+                seq, item = item
+                started, cpu = time.perf_counter(), time.thread_time()
+                result = stage.fn(item)
+                stats.record(busy=time.perf_counter() - started, items_in=1, items_out=1,
+                             cpu=time.thread_time() - cpu)
+                if not stage.ordered:
+                    self._put(outbox, (seq, result), stop, stats)
+                    continue
+                # Every stage maps one item to one, so sequence numbers arrive without gaps
+                with lock:
+                    shared['held'][seq] = result
+                    while shared['next'] in shared['held']:
+                        due = shared['next']
+                        self._put(outbox, (due, shared['held'].pop(due)), stop, stats)
+                        shared['next'] += 1
+                    lock.notify_all()
+        except _Stopped:
+            pass
+        except BaseException as e:
+            fail(e)
+
+    def _run_process_stage(self, stage, inbox, outbox, stop, fail):
+        stats = self.stats[stage.name]
+        in_flight = deque()
+        try:
+            with ProcessPoolExecutor(max_workers=stage.workers, initializer=stage.initializer,
+                                     initargs=stage.initargs) as pool:
+                def emit_oldest():
+                    seq, submitted, future = in_flight.popleft()
+                    result = future.result()
+                    stats.record(busy=time.perf_counter() - submitted, items_out=1)
+                    self._put(outbox, (seq, result), stop, stats)
+
+                while True:
+                    item = self._get(inbox, stop)
+                    if item is _END:
+                        break
+                    seq, item = item
+                    stats.record(items_in=1)
+                    in_flight.append((seq, time.perf_counter(), pool.submit(stage.fn, item)))
+                    # Two items per worker keeps the pool busy while bounding memory
+                    if len(in_flight) >= 2 * stage.workers:
+                        emit_oldest()
+                while in_flight:
+                    emit_oldest()
+                self._put(outbox, _END, stop, stats)
+        except _Stopped:
+            for _, _, future in in_flight:
+                future.cancel()
+        except BaseException as e:
+            fail(e)
@@ -0,0 +1,78 @@
+"""
+Tests for the content-addressed artifact cache
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.utils.artifact_cache import ArtifactCache, fingerprint
+
+
+def test_keys_change_with_inputs_version_and_config():
+    frame = pd.DataFrame({'review_id': ['a', 'b'], 'content': ['late', 'cold']})
+    key = ArtifactCache.key('clean', 1, fingerprint(frame), min_length=3)
+
+    assert key == ArtifactCache.key('clean', 1, fingerprint(frame.copy()), min_length=3)
+    assert key.startswith('clean-')
+    assert key != ArtifactCache.key('clean', 2, fingerprint(frame), min_length=3)
+    assert key != ArtifactCache.key('clean', 1, fingerprint(frame), min_length=4)
+    assert key != ArtifactCache.key('clean', 1, fingerprint(frame.assign(content=['late', 'warm'])), min_length=3)
+    assert fingerprint(np.zeros(3, np.float32)) != fingerprint(np.zeros(3, np.float16))
+
+
+def test_round_trips_and_persists_across_instances(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    frame = pd.DataFrame({'clean_text': ['late delivery'], 'score': [1]})
+    cache.put('clean-x', frame)
+    cache.put('embed-x', np.ones((1, 4), np.float32))
+    cache.put('assign-x', {'days': {'2024-06-01': [(0, 1.0)]}})
+
+    reopened = ArtifactCache(str(tmp_path))
+    calls = []
+
+    assert reopened.get('clean-x').equals(frame)
+    assert reopened.get_or_compute('embed-x', lambda: calls.append(1)).dtype == np.float32
+    assert reopened.get('assign-x') == {'days': {'2024-06-01': [(0, 1.0)]}}
+    assert not calls and reopened.stats['hits'] == 3
+    assert reopened.get('count-x') is None and reopened.stats['misses'] == 1
+
+
+def test_counters_are_exact_under_concurrent_reads(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    cache.put('clean-x', np.ones(4, np.float32))
+
+    def read(_):
+        for _ in range(200):
+            cache.get('clean-x')
+            cache.get('clean-missing')
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(read, range(8)))
+    assert cache.stats == {'hits': 1600, 'misses': 1600, 'evictions': 0}
+
+
+def test_discard_removes_one_artifact(tmp_path):
+    cache = ArtifactCache(str(tmp_path))
+    cache.put('clean-x', np.ones(4, np.float32))
+    cache.put('clean-y', np.ones(4, np.float32))
+
+    cache.discard('clean-x')
+    cache.discard('clean-z')
+    assert 'clean-x' not in cache and 'clean-y' in cache
+    assert sorted(os.listdir(tmp_path)) == ['clean-y.npy']
+
+
+def test_evicts_least_recently_used_past_max_bytes(tmp_path):
+    array = np.zeros(1000, np.float64)
+    cache = ArtifactCache(str(tmp_path), max_bytes=3 * 8200)
+    for name in 'abc':
+        cache.put(name, array)
+    cache.get('a')
+    cache.put('d', array)
+
+    assert 'b' not in cache and {'a', 'c', 'd'} <= set(cache._entries)
+    assert cache.stats['evictions'] == 1 and cache.size_bytes <= cache.max_bytes
+    assert sorted(os.listdir(tmp_path)) == ['a.npy', 'c.npy', 'd.npy']
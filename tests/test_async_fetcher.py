@@ -0,0 +1,125 @@
+"""
+Tests for the asyncio review fetcher against the local Play Store stand-in
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from src.data_processing.async_fetcher import AsyncReviewFetcher, LatencyHistogram, TokenBucket
+from src.data_processing.mock_play_store import MockPlayStoreServer
+from src.data_processing.review_scraper import FetchError
+
+START = datetime(2024, 6, 1)
+END = datetime(2024, 6, 4)
+APP = "in.swiggy.android"
+
+
+@pytest.fixture
+def server():
+    with MockPlayStoreServer(reviews_per_day=120) as srv:
+        yield srv
+
+
+def test_streams_full_window_over_pooled_connections(server):
+    completed = []
+    with AsyncReviewFetcher(server.base_url, page_size=25, max_connections=3) as fetcher:
+        reviews = list(fetcher.iter_reviews(APP, START, END, on_complete=lambda lo, hi: completed.append(lo)))
+
+        assert len(reviews) == server.expected_count(START, END)
+        assert len({r['review_id'] for r in reviews}) == len(reviews)
+        assert all(START <= r['at'] < END and r['app_id'] == APP for r in reviews)
+        assert sorted(completed) == [datetime(2024, 6, d) for d in (1, 2, 3)]
+        assert fetcher.pool.stats['opened'] <= 3 and fetcher.pool.stats['reused'] >= 12
+        assert fetcher.latency.count == fetcher.stats['requests'] == server.requests_served
+        assert fetcher.app_latency[APP].as_dict()['count'] == fetcher.latency.count
+
+
+def test_cursor_resumes_after_an_interruption(server):
+    cursor = {}
+    with AsyncReviewFetcher(server.base_url, page_size=50, max_connections=1) as fetcher:
+        stream = fetcher.iter_reviews(APP, START, END, cursor=cursor)
+        first = [next(stream) for _ in range(120)]
+        stream.close()
+        rest = list(fetcher.iter_reviews(APP, START, END, cursor=cursor))
+
+    assert list(cursor.values()) == [None, None, None]
+    ids = [r['review_id'] for r in first + rest]
+    # At most the page in hand when interrupted is fetched again
+    assert set(ids) == {r['review_id'] for r in first + rest} and len(set(ids)) == 360
+    assert len(ids) - len(set(ids)) <= 50
+
+
+def test_async_stream_retries_transient_failures():
+    async def collect(fetcher):
+        return [r async for r in fetcher.stream(APP, START, END)]
+
+    with MockPlayStoreServer(reviews_per_day=40, failure_rate=0.3) as server:
+        fetcher = AsyncReviewFetcher(server.base_url, page_size=10, max_connections=2,
+                                     max_retries=8, backoff_base=0.001)
+        reviews = asyncio.run(collect(fetcher))
+
+    assert len(reviews) == server.expected_count(START, END)
+    assert fetcher.stats['retries'] > 0
+
+
+def test_a_failing_window_cancels_the_other_workers(server):
+    class BrokenDayFetcher(AsyncReviewFetcher):
+        async def fetch_page(self, app_id, start, end, token, count):
+            if start.day == 2:
+                raise FetchError("day 2 is unavailable")
+            return await super().fetch_page(app_id, start, end, token, count)
+
+    async def run():
+        fetcher = BrokenDayFetcher(server.base_url, page_size=5, max_connections=3)
+        with pytest.raises(FetchError):
+            async for _ in fetcher.pages(APP, START, END):
+                pass
+        await fetcher.pool.close()
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+
+
+def test_one_fetcher_serves_several_event_loops(server):
+    async def collect(fetcher):
+        return [r async for r in fetcher.stream(APP, START, END)]
+
+    fetcher = AsyncReviewFetcher(server.base_url, page_size=10, max_connections=2)
+    counts = [len(asyncio.run(collect(fetcher))) for _ in range(2)]
+    with fetcher:
+        counts.append(len(list(fetcher.iter_reviews(APP, START, END))))
+
+    assert counts == [server.expected_count(START, END)] * 3
+
+
+def test_permanent_failures_raise(server):
+    with AsyncReviewFetcher(server.base_url + "/missing", backoff_base=0.001) as fetcher:
+        with pytest.raises(FetchError):
+            list(fetcher.iter_reviews(APP, START, END))
+
+
+def test_rate_limits_space_out_requests(server):
+    with AsyncReviewFetcher(server.base_url, page_size=60, max_connections=3, rate=1000,
+                            per_app_rate=5) as fetcher:
+        started = time.perf_counter()
+        list(fetcher.iter_reviews(APP, START, END))
+        elapsed = time.perf_counter() - started
+
+    # A burst of 5, then one request every 200ms
+    requests = fetcher.stats['requests']
+    assert requests > 5 and elapsed >= (requests - 5) * 0.2 * 0.9
+
+
+def test_token_bucket_and_histogram():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, pytest.approx(0.1, abs=0.01)]
+
+    histogram = LatencyHistogram()
+    for seconds in [0.003] * 90 + [0.2] * 9 + [30.0]:
+        histogram.record(seconds)
+    summary = histogram.as_dict()
+    assert summary['p50_seconds'] == 0.005 and summary['p95_seconds'] == 0.25 and summary['max_seconds'] == 30.0
+    assert summary['buckets']['le_0.005'] == 90 and summary['buckets']['inf'] == 1
@@ -0,0 +1,54 @@
+"""
+Tests for the headless chart renderer
+"""
+
+import sys
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+import pytest
+
+from src.trend_analysis.chart_renderer import ChartRenderer
+
+
+def sample_report():
+    return pd.DataFrame(
+        {'Jun 01': [5, 2, 0], 'Jun 02': [7, 1, 3], 'Jun 03': [4, 6, 1]},
+        index=['Delivery issue', 'Food & drinks', 'App crashing'],
+    )
+
+
+def test_svg_is_well_formed_and_orders_topics_by_total(tmp_path):
+    path = ChartRenderer(format='svg').render(sample_report(), str(tmp_path / "chart.svg"))
+
+    root = ET.parse(path).getroot()
+    texts = [t.text for t in root.iter('{http://www.w3.org/2000/svg}text')]
+    assert len(list(root.iter('{http://www.w3.org/2000/svg}polyline'))) == 3
+    assert texts.index('Delivery issue') < texts.index('Food & drinks') < texts.index('App crashing')
+
+
+def test_html_wraps_svg(tmp_path):
+    path = ChartRenderer(format='html').render(sample_report(), str(tmp_path / "chart.html"), title='Swiggy')
+
+    page = open(path, encoding='utf-8').read()
+    assert page.startswith('<!DOCTYPE html>') and '<svg' in page and 'Swiggy - Daily Trend' in page
+
+
+def test_render_many_uses_process_pool(tmp_path):
+    reports = {f'app.{i}': sample_report() * i for i in range(1, 4)}
+
+    paths = ChartRenderer(format='svg').render_many(reports, str(tmp_path), workers=2)
+
+    assert sorted(paths) == sorted(reports)
+    assert all(p.endswith('.svg') for p in paths.values())
+
+
+def test_png_never_imports_pyplot(tmp_path):
+    pytest.importorskip("matplotlib")
+    renderer = ChartRenderer(format='png', dpi=50)
+
+    renderer.render(sample_report(), str(tmp_path / "a.png"))
+    renderer.render(sample_report(), str(tmp_path / "b.png"))
+
+    assert (tmp_path / "b.png").stat().st_size > 0
+    assert 'matplotlib.pyplot' not in sys.modules
@@ -0,0 +1,83 @@
+"""
+Tests for incremental ingestion with per-app high-water marks
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.data_processing.checkpoint_store import AppCheckpoint, CheckpointStore, IncrementalIngestor
+
+
+class ListScraper:
+    """Scraper stub serving a fixed list of reviews and recording requested windows"""
+
+    def __init__(self, reviews):
+        self.reviews = reviews
+        self.calls = []
+
+    def iter_reviews(self, app_id, start, end):
+        self.calls.append((start, end))
+        return (r for r in self.reviews if start <= r['at'] < end)
+
+
+def review(review_id, at):
+    return {'review_id': review_id, 'app_id': 'app', 'at': at, 'content': review_id}
+
+
+def classify(batch):
+    return ['Delivery issue' for _ in batch]
+
+
+def test_second_run_only_processes_new_reviews(tmp_path):
+    reviews = [
+        review('a', datetime(2024, 6, 1, 9)),
+        review('b', datetime(2024, 6, 1, 18)),
+        review('c', datetime(2024, 6, 1, 18)),
+    ]
+    scraper = ListScraper(reviews)
+    ingestor = IncrementalIngestor(scraper, CheckpointStore(str(tmp_path)), batch_size=2)
+    window = (datetime(2024, 6, 1), datetime(2024, 6, 3))
+
+    checkpoint = ingestor.run('app', *window, classify)
+    assert checkpoint.daily_counts == {'2024-06-01': {'Delivery issue': 3}}
+    assert checkpoint.last_timestamp == datetime(2024, 6, 1, 18)
+    assert checkpoint.boundary_ids == {'b', 'c'}
+
+    seen = []
+    reviews.append(review('d', datetime(2024, 6, 2, 8)))
+    checkpoint = ingestor.run('app', *window, lambda batch: seen.extend(batch) or classify(batch))
+
+    assert [r['review_id'] for r in seen] == ['d']
+    assert scraper.calls[-1][0] == datetime(2024, 6, 1, 18)
+    assert checkpoint.daily_counts == {
+        '2024-06-01': {'Delivery issue': 3},
+        '2024-06-02': {'Delivery issue': 1},
+    }
+
+
+def test_failed_run_does_not_advance_checkpoint(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    ingestor = IncrementalIngestor(ListScraper([review('a', datetime(2024, 6, 1, 9))]), store)
+
+    def boom(batch):
+        raise RuntimeError("classifier crashed")
+
+    with pytest.raises(RuntimeError):
+        ingestor.run('app', datetime(2024, 6, 1), datetime(2024, 6, 2), boom)
+
+    checkpoint = store.load('app')
+    assert checkpoint.last_timestamp is None
+    assert checkpoint.daily_counts == {}
+
+
+def test_checkpoint_round_trip_and_prune():
+    checkpoint = AppCheckpoint('app', 'x', datetime(2024, 6, 30, 12), ['x'])
+    checkpoint.add_counts('2024-05-01', {'Food stale': 2})
+    checkpoint.add_counts('2024-06-30', {'Food stale': 1})
+    checkpoint.prune(datetime(2024, 6, 1))
+
+    restored = AppCheckpoint.from_dict(checkpoint.to_dict())
+    assert restored.last_timestamp == datetime(2024, 6, 30, 12)
+    assert restored.boundary_ids == {'x'}
+    assert restored.daily_counts == {'2024-06-30': {'Food stale': 1}}
@@ -0,0 +1,68 @@
+"""
+Tests for the typed config loader
+"""
+
+import pickle
+
+import pytest
+
+from src.utils.config import Config, get_config, load_config, reset_config
+
+
+def test_file_then_environment_overrides(tmp_path):
+    path = tmp_path / 'pulsegen.toml'
+    path.write_text('analysis_period_days = 14\n\n[embedding]\nbatch_size = 128\nworkers = 3\n')
+    yaml_path = tmp_path / 'pulsegen.yaml'
+    yaml_path.write_text('taxonomy_mode: first\ntopic:\n  index: ivf\n  index_nprobe: 8\n')
+
+    config = load_config(str(path), environ={'PULSEGEN_EMBEDDING_WORKERS': '6', 'PULSEGEN_USE_SPACY': 'yes',
+                                             'PULSEGEN_EMBEDDING_CACHE_MAX_MB': '512', 'HOME': '/root'})
+    from_yaml = load_config(environ={'PULSEGEN_CONFIG': str(yaml_path), 'PULSEGEN_REVIEW_STORE_DIR': 'none'})
+
+    assert (config.analysis_period_days, config.embedding_batch_size) == (14, 128)
+    assert config.embedding_workers == 6 and config.use_spacy is True
+    assert config.embedding_cache_max_mb == 512.0
+    assert (from_yaml.taxonomy_mode, from_yaml.topic_index, from_yaml.topic_index_nprobe) == ('first', 'ivf', 8)
+    assert from_yaml.review_store_dir is None
+
+
+@pytest.mark.parametrize('settings', [
+    {'similarity_threshold': 1.5},
+    {'embedding_batch_size': 0},
+    {'topic_index': 'hnsw'},
+    {'embedding_backend': 'tensorrt'},
+    {'embedding_threads': 0},
+    {'embedding_workers': 'two'},
+    {'embedding_batch_size': 12.5},
+    {'no_such_setting': 1},
+])
+def test_invalid_settings_are_rejected(settings):
+    with pytest.raises(ValueError):
+        Config.from_dict(settings)
+
+
+def test_non_setting_variables_are_allowed_in_environment(tmp_path):
+    path = tmp_path / 'pulsegen.yaml'
+    path.write_text('analysis_period_days: 14\n')
+
+    config = load_config(environ={'PULSEGEN_CONFIG': str(path), 'PULSEGEN_LOG_LEVEL': 'DEBUG',
+                                  'PULSEGEN_EMBEDDING_WORKERS': '3'})
+
+    assert (config.analysis_period_days, config.embedding_workers) == (14, 3)
+    with pytest.raises(ValueError):
+        load_config(environ={'PULSEGEN_LOG_LEVL': 'DEBUG'})
+
+
+def test_config_is_cached_and_picklable(monkeypatch):
+    reset_config()
+    monkeypatch.setenv('PULSEGEN_MAX_CONCURRENT_APPS', '9')
+    try:
+        config = get_config()
+        assert get_config() is config
+        assert config.max_concurrent_apps == 9
+
+        copy = config.replace(profiler='cprofile')
+        assert copy is not config and config.profiler is None
+        assert pickle.loads(pickle.dumps(copy)) == copy
+    finally:
+        reset_config()
@@ -0,0 +1,33 @@
+"""
+Tests for the vectorized review cleaner
+"""
+
+import pandas as pd
+
+from src.data_processing.data_cleaner import DataCleaner
+
+
+def test_normalize_strips_urls_emoji_and_width():
+    text = pd.Series(["Worst APP 😡😡 see https://example.com/x now", "Ｆｕｌｌ width  👍🏽 text", None])
+
+    assert DataCleaner().normalize(text).tolist() == ["worst app see now", "full width text", ""]
+
+
+def test_clean_filters_language_length_and_duplicate_ids():
+    df = pd.DataFrame({
+        'review_id': ['1', '2', '2', '3', '4'],
+        'content': ["Delivery was late", "खाना ठंडा था", "dup of 2", "ok", "khana thanda tha, बहुत बुरा"],
+    })
+
+    cleaned = DataCleaner(min_length=3).clean(df)
+
+    assert cleaned['review_id'].tolist() == ['1', '4']
+    assert cleaned['clean_text'].tolist()[0] == "delivery was late"
+
+
+def test_clean_records_round_trip():
+    records = [{'review_id': 'a', 'content': "Food stale!!"}, {'review_id': 'b', 'content': "🙂"}]
+
+    assert DataCleaner().clean_records(records) == [
+        {'review_id': 'a', 'content': "Food stale!!", 'clean_text': "food stale!!"},
+    ]
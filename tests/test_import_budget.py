@@ -0,0 +1,61 @@
+"""
+Import-time budget: CLI entry points and packages must not load heavy
+libraries they don't need
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that cost seconds to import and are only needed once a model runs
+HEAVY = ('torch', 'transformers', 'sentence_transformers', 'spacy', 'keybert', 'yake',
+         'sklearn', 'matplotlib', 'seaborn', 'google_play_scraper')
+# Budget for `--help`, including interpreter startup
+HELP_BUDGET_SECONDS = 1.0
+
+
+def imported_modules(args):
+    """Run python -X importtime and return (top-level modules imported, cumulative seconds)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=ROOT,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    modules, total_us = set(), 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.add(name.strip().split('.')[0])
+        # Nested imports are indented beyond the single separator space
+        if not name.startswith('  '):
+            total_us += int(cumulative)
+    return modules, total_us / 1e6
+
+
+@pytest.mark.parametrize('script', ['main.py', 'run_project.py', 'scripts/run_analysis.py', 'scripts/run_batch.py',
+                                    'scripts/run_backfill.py', 'scripts/check_encoder_parity.py'])
+def test_help_does_not_import_pandas(script):
+    modules, seconds = imported_modules([script, '--help'])
+
+    assert not modules & {'pandas', 'numpy', 'pyarrow', *HEAVY}
+    assert seconds < HELP_BUDGET_SECONDS
+
+
+def test_packages_import_submodules_lazily():
+    modules, _ = imported_modules(['-c', 'import src.agentic_ai, src.data_processing; '
+                                         'from src.data_processing import ReviewScraper'])
+
+    assert not modules & {'pandas', 'numpy'}
+
+
+def test_sample_report_does_not_load_models():
+    code = ('from datetime import datetime; '
+            'from src.main_orchestrator import TrendAnalysisOrchestrator; '
+            'TrendAnalysisOrchestrator().generate_trend_report("in.swiggy.android", datetime(2024, 6, 30))')
+    modules, _ = imported_modules(['-c', code])
+
+    assert 'pandas' in modules
+    assert not modules & set(HEAVY)
@@ -0,0 +1,288 @@
+"""
+End-to-end tests for the orchestrator against the local Play Store stand-in
+"""
+
+import os
+import re
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.data_processing.mock_play_store import MockPlayStoreServer
+from src.main_orchestrator import TrendAnalysisOrchestrator
+
+APP_URL = "https://play.google.com/store/apps/details?id=in.swiggy.android"
+
+
+class BagOfWordsEncoder:
+    """Cheap hashed bag-of-words encoder standing in for the sentence-transformer"""
+
+    dim = 256
+
+    def encode(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in re.findall(r'\w+', text.lower()):
+                out[i, zlib.crc32(word.encode()) % self.dim] += 1
+        return out / np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-9)
+
+
+@pytest.fixture
+def server():
+    with MockPlayStoreServer(reviews_per_day=40) as srv:
+        yield srv
+
+
+@pytest.fixture
+def make_orchestrator(tmp_path, server):
+    def make(**overrides):
+        orchestrator = TrendAnalysisOrchestrator()
+        config = orchestrator.config
+        config.review_source_url = server.base_url
+        config.use_sample_data = False
+        config.analysis_period_days = 3
+        for name in ('checkpoint_dir', 'review_store_dir', 'embedding_cache_dir', 'topic_registry_dir',
+                     'artifact_cache_dir'):
+            setattr(config, name, str(tmp_path / name))
+        for name, value in overrides.items():
+            setattr(config, name, value)
+        orchestrator = TrendAnalysisOrchestrator(config)
+        orchestrator.embedding_service.encoder = BagOfWordsEncoder()
+        return orchestrator
+    return make
+
+
+def test_daily_runs_only_process_new_reviews(make_orchestrator):
+    # Without the labeler or near-duplicate collapsing every embedding request is a review
+    orchestrator = make_orchestrator(topic_labeler=None, near_duplicate_threshold=None)
+
+    first = orchestrator.generate_trend_report(APP_URL, datetime(2024, 6, 3))
+    assert list(first.columns) == ['Jun 01', 'Jun 02', 'Jun 03']
+    assert first.values.sum() > 0
+
+    requested = orchestrator.embedding_service.stats['requested']
+    second = orchestrator.generate_trend_report(APP_URL, datetime(2024, 6, 4))
+
+    assert orchestrator.embedding_service.stats['requested'] - requested == 40
+    assert list(second.columns) == ['Jun 02', 'Jun 03', 'Jun 04']
+    # Earlier pending reviews can only be credited later, never removed
+    assert second['Jun 02'].sum() >= first['Jun 02'].sum()
+
+
+def test_batch_reports_each_app_separately(make_orchestrator):
+    orchestrator = make_orchestrator()
+    encoder = orchestrator.embedding_service.encoder
+
+    results = orchestrator.generate_trend_reports(
+        [APP_URL, "com.application.zomato", "not an app"], datetime(2024, 6, 3), max_concurrency=2)
+
+    assert set(results) == {"in.swiggy.android", "com.application.zomato", "not an app"}
+    assert results["in.swiggy.android"].ok and results["com.application.zomato"].ok
+    assert results["com.application.zomato"].report.values.sum() > 0
+    assert not results["not an app"].ok
+    assert orchestrator.embedding_service.encoder is encoder
+    # Concurrent apps share the embedding service but each counts only its own requests
+    for app_id in ("in.swiggy.android", "com.application.zomato"):
+        metrics = results[app_id].metrics.as_dict()
+        assert metrics['caches']['embedding']['requested'] == 120 - metrics['stages']['dedup']['collapsed']
+
+
+def test_run_metrics_cover_every_stage(make_orchestrator, tmp_path):
+    orchestrator = make_orchestrator(topic_labeler=None)
+
+    orchestrator.generate_trend_report(APP_URL, datetime(2024, 6, 3))
+    metrics = orchestrator.last_metrics.as_dict()
+
+    assert {'scrape', 'clean', 'embed', 'assign', 'ingest', 'finalize_topics', 'report'} <= set(metrics['stages'])
+    assert metrics['stages']['embed']['items_in'] == metrics['stages']['scrape']['items_out']
+    assert metrics['caches']['embedding']['requested'] == 120 - metrics['stages']['dedup']['collapsed']
+    assert metrics['latency']['fetch']['count'] >= 3
+    # The ingest stage encloses the pipeline, so only a leaf stage can be the bottleneck
+    assert metrics['bottleneck'] in {'scrape', 'clean', 'dedup', 'embed', 'assign', 'load_topics',
+                                     'finalize_topics', 'report'}
+
+    path = orchestrator.last_metrics.write_next_to(str(tmp_path / "report.csv"))
+    assert path.endswith("report.metrics.json")
+
+
+def test_taxonomy_modes_label_reviews_without_discovery(make_orchestrator, tmp_path):
+    only = make_orchestrator(taxonomy_mode='only', taxonomy_threshold=0.5)
+    report = only.generate_trend_report(APP_URL, datetime(2024, 6, 3))
+    classified = report.to_numpy().sum()
+
+    assert set(report.index) <= set(only.taxonomy_classifier.labels)
+    assert 'Refund issue' in report.index
+    assert not (tmp_path / 'topic_registry_dir').exists()
+    assert 'load_topics' not in only.last_metrics.stages
+
+    first = make_orchestrator(taxonomy_mode='first', taxonomy_threshold=0.5,
+                              checkpoint_dir=str(tmp_path / 'first'))
+    report = first.generate_trend_report(APP_URL, datetime(2024, 6, 3))
+    discovered = [topic for topic in report.index if topic not in first.taxonomy_classifier.labels]
+
+    assert 'Refund issue' in report.index and discovered
+    assert report.to_numpy().sum() > classified
+
+
+def test_new_topics_are_labeled_once(make_orchestrator, tmp_path):
+    orchestrator = make_orchestrator(topic_labeler='embedding')
+
+    first = orchestrator.generate_trend_report(APP_URL, datetime(2024, 6, 3))
+    labeled = orchestrator.last_metrics.stages['label_topics'].items_out
+    second = orchestrator.generate_trend_report(APP_URL, datetime(2024, 6, 4))
+
+    assert labeled > 0 and not any(topic.startswith('Topic ') for topic in first.index)
+    assert orchestrator.last_metrics.stages['label_topics'].items_out < labeled
+    assert set(first.index) & set(second.index)
+
+
+def test_near_duplicates_skip_the_encoder_but_keep_their_weight(make_orchestrator, tmp_path):
+    runs = {}
+    for name, threshold in (('plain', None), ('dedup', 0.8)):
+        dirs = {setting: str(tmp_path / name / setting) for setting in
+                ('checkpoint_dir', 'review_store_dir', 'embedding_cache_dir', 'topic_registry_dir')}
+        runs[name] = make_orchestrator(topic_labeler=None, near_duplicate_threshold=threshold, **dirs)
+        runs[name].generate_trend_report(APP_URL, datetime(2024, 6, 3))
+
+    dedup = runs['dedup'].last_metrics.stages['dedup'].extra
+    assert dedup['reviews'] == 120 and dedup['collapsed'] > 0
+    assert runs['dedup'].embedding_service.stats['encoded'] < runs['plain'].embedding_service.stats['encoded']
+    stored = runs['dedup'].review_store.read('in.swiggy.android', datetime(2024, 6, 1), datetime(2024, 6, 4))
+    assert len(stored) == 120 - dedup['collapsed'] and stored['weight'].fillna(1.0).sum() == 120
+
+
+def test_rebuild_reuses_upstream_artifacts(make_orchestrator):
+    orchestrator = make_orchestrator(topic_labeler='embedding')
+    orchestrator.generate_trend_report(APP_URL, datetime(2024, 6, 3))
+
+    first = orchestrator.generate_trend_report(APP_URL, datetime(2024, 6, 3), rebuild=True)
+    assert first.values.sum() > 0
+    assert orchestrator.last_metrics.caches['artifacts']['misses'] == 3 * 2 + 2
+
+    requested = orchestrator.embedding_service.stats['requested']
+    again = orchestrator.generate_trend_report(APP_URL, datetime(2024, 6, 3), rebuild=True)
+    assert again.equals(first)
+    assert orchestrator.last_metrics.caches['artifacts'] == {'hits': 2, 'misses': 0, 'evictions': 0}
+    assert orchestrator.embedding_service.stats['requested'] == requested
+
+    tweaked = make_orchestrator(topic_labeler='embedding', similarity_threshold=0.5)
+    tweaked.generate_trend_report(APP_URL, datetime(2024, 6, 3), rebuild=True)
+    # Cleaned text and embeddings of all three days are reused; only assignment and counts rerun
+    assert tweaked.last_metrics.caches['artifacts'] == {'hits': 6, 'misses': 2, 'evictions': 0}
+
+
+def test_rebuild_without_stored_reviews_gives_an_empty_report(make_orchestrator):
+    orchestrator = make_orchestrator()
+    report = orchestrator.rebuild_report('in.swiggy.android', datetime(2024, 6, 3))
+    assert report.empty
+
+
+def test_parallel_backfill_matches_serial_and_resumes(make_orchestrator, tmp_path):
+    def make(name):
+        dirs = {setting: str(tmp_path / name / setting) for setting in
+                ('checkpoint_dir', 'review_store_dir', 'embedding_cache_dir', 'topic_registry_dir',
+                 'artifact_cache_dir')}
+        return make_orchestrator(topic_labeler='embedding', **dirs)
+
+    start, end = datetime(2024, 6, 1), datetime(2024, 6, 6)
+    serial = make('serial').backfill(APP_URL, start, end, workers=1)
+
+    def recording(orchestrator, fetched, fail_on=None):
+        fetch = orchestrator.review_scraper.iter_reviews
+
+        def iter_reviews(app_id, lo, hi, **kwargs):
+            if lo.day == fail_on:
+                raise ConnectionError("network down")
+            fetched.add(lo.day)
+            return fetch(app_id, lo, hi, **kwargs)
+
+        orchestrator.review_scraper.iter_reviews = iter_reviews
+
+    finished, refetched = set(), set()
+    interrupted = make('parallel')
+    recording(interrupted, finished, fail_on=4)
+    with pytest.raises(ConnectionError):
+        interrupted.backfill(APP_URL, start, end, workers=3)
+    assert not os.path.exists(tmp_path / 'parallel' / 'checkpoint_dir' / 'in.swiggy.android.json')
+    # Days before the failure were consumed in order, so they always finished
+    assert {1, 2, 3} <= finished
+
+    resumed = make('parallel')
+    recording(resumed, refetched)
+    parallel = resumed.backfill(APP_URL, start, end, workers=3)
+
+    assert list(parallel.columns) == ['Jun 01', 'Jun 02', 'Jun 03', 'Jun 04', 'Jun 05', 'Jun 06']
+    assert parallel.equals(serial) and parallel.values.sum() > 0
+    # Only the partitions that had not finished before the failure are fetched again
+    assert refetched == set(range(1, 7)) - finished
+    assert resumed.last_metrics.stages['scrape'].calls == len(refetched)
+    checkpoint = resumed.checkpoint_store.load('in.swiggy.android')
+    assert sorted(checkpoint.daily_counts) == [f"2024-06-0{d}" for d in range(1, 7)]
+    stored = resumed.review_store.read('in.swiggy.android', start, datetime(2024, 6, 7))
+    assert stored['weight'].sum() == 240
+    # Prepared partitions only serve to resume; once committed a backfill fetches afresh
+    assert not [name for name in os.listdir(tmp_path / 'parallel' / 'artifact_cache_dir')
+                if name.startswith('backfill-')]
+
+    # Daily runs continue from the end of the backfill
+    resumed.generate_trend_report(APP_URL, datetime(2024, 6, 7))
+    assert resumed.checkpoint_store.load('in.swiggy.android').last_timestamp.day == 7
+    assert resumed.last_metrics.stages['dedup'].extra['reviews'] == 40
+
+
+def test_backfill_extends_existing_state_only_with_merge(make_orchestrator):
+    orchestrator = make_orchestrator(topic_labeler=None)
+    orchestrator.generate_trend_report(APP_URL, datetime(2024, 6, 5))
+    before = orchestrator.checkpoint_store.load('in.swiggy.android')
+    topic_ids = orchestrator._load_discoverer('in.swiggy.android').registry.ids.tolist()
+    assert topic_ids
+
+    with pytest.raises(ValueError, match='merge=True'):
+        orchestrator.backfill(APP_URL, datetime(2024, 6, 1), datetime(2024, 6, 3))
+    orchestrator.backfill(APP_URL, datetime(2024, 6, 1), datetime(2024, 6, 3), merge=True)
+
+    after = orchestrator.checkpoint_store.load('in.swiggy.android')
+    assert after.last_timestamp == before.last_timestamp
+    assert sorted(after.daily_counts) == [f"2024-06-0{d}" for d in range(1, 6)]
+    # Days outside the range keep their counts (pending reviews may only have been credited since)
+    for day in ('2024-06-04', '2024-06-05'):
+        assert all(after.daily_counts[day].get(t, 0) >= n for t, n in before.daily_counts[day].items())
+    registry = orchestrator._load_discoverer('in.swiggy.android').registry
+    assert set(registry.resolve(t) for t in topic_ids) <= set(registry.ids.tolist())
+
+
+def test_backfill_records_the_daily_sample_sizes(make_orchestrator):
+    orchestrator = make_orchestrator(topic_labeler=None, max_reviews_per_day=10)
+    orchestrator.backfill(APP_URL, datetime(2024, 6, 1), datetime(2024, 6, 3), workers=2)
+
+    checkpoint = orchestrator.checkpoint_store.load('in.swiggy.android')
+    assert checkpoint.sampled_days == {f"2024-06-0{d}": 10 for d in range(1, 4)}
+
+
+def test_embedding_backend_selects_the_encoder(make_orchestrator):
+    assert make_orchestrator()._create_encoder() is None
+
+    encoder = make_orchestrator(embedding_backend='onnx-int8', embedding_threads=2)._create_encoder()
+    assert (encoder.variant, encoder.threads, encoder.quantize) == ('onnx-int8', 2, True)
+    assert make_orchestrator(embedding_backend='onnx')._create_encoder().variant == 'onnx'
+
+
+def test_closing_stops_the_fetcher_loop(make_orchestrator):
+    with make_orchestrator() as orchestrator:
+        orchestrator.generate_trend_report(APP_URL, datetime(2024, 6, 2))
+        thread = orchestrator.review_scraper._thread
+        assert thread.is_alive()
+
+    assert not thread.is_alive() and orchestrator.review_scraper._loop is None
+
+
+def test_memory_budget_bounds_the_batch_size(make_orchestrator):
+    assert make_orchestrator(memory_budget_mb=None).ingestor.batch_size == 500
+    assert make_orchestrator(memory_budget_mb=20, max_concurrent_apps=1).ingestor.batch_size < 500
+
+    with pytest.raises(ValueError):
+        make_orchestrator(memory_budget_mb=1, max_reviews_per_day=100000)
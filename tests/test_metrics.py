@@ -0,0 +1,69 @@
+"""
+Tests for per-run stage metrics
+"""
+
+import json
+import time
+
+import pytest
+
+from src.utils.metrics import RunMetrics
+from src.utils.pipeline import Stage, StagedPipeline
+
+
+def test_stage_accumulates_time_and_items():
+    metrics = RunMetrics('app.one')
+
+    for _ in range(2):
+        with metrics.stage('clean', items_in=10) as stage:
+            time.sleep(0.01)
+            stage.items_out = 8
+
+    clean = metrics.as_dict()['stages']['clean']
+    assert clean['calls'] == 2
+    assert clean['items_in'] == 20 and clean['items_out'] == 16
+    assert clean['wall_seconds'] >= 0.02
+    assert clean['cpu_seconds'] < clean['wall_seconds']
+
+
+def test_pipeline_stats_and_cache_deltas_are_recorded():
+    pipeline = StagedPipeline([Stage('double', lambda x: 2 * x, workers=2)])
+    list(pipeline.run(range(5)))
+    metrics = RunMetrics()
+
+    metrics.record_pipeline(pipeline.stats)
+    metrics.record_cache('embedding', {'requested': 10, 'cache_hits': 2}, {'requested': 30, 'cache_hits': 12})
+
+    data = metrics.as_dict()
+    assert data['stages']['double']['items_in'] == 5
+    assert 'blocked_seconds' in data['stages']['double']
+    assert data['caches']['embedding'] == {'requested': 20, 'cache_hits': 10, 'hit_rate': 0.5}
+
+
+def test_wrapper_stages_are_never_the_bottleneck():
+    metrics = RunMetrics()
+    with metrics.stage('ingest', wrapper=True):
+        with metrics.stage('embed'):
+            time.sleep(0.02)
+        with metrics.stage('assign'):
+            time.sleep(0.005)
+
+    assert metrics.stages['ingest'].wall_seconds > metrics.stages['embed'].wall_seconds
+    assert metrics.bottleneck() == 'embed'
+
+
+def test_write_next_to_report_with_cprofile(tmp_path):
+    metrics = RunMetrics('app.one', profile='cprofile')
+    with metrics.profiling():
+        with metrics.stage('work'):
+            sum(range(1000))
+
+    path = metrics.write_next_to(str(tmp_path / "report.csv"))
+
+    assert json.loads(open(path, encoding='utf-8').read())['bottleneck'] == 'work'
+    assert (tmp_path / "report.prof").exists()
+
+
+def test_unknown_profiler_rejected():
+    with pytest.raises(ValueError):
+        RunMetrics(profile='perf')
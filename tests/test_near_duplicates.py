@@ -0,0 +1,53 @@
+"""
+Tests for MinHash LSH near-duplicate collapsing
+"""
+
+from datetime import datetime
+
+from src.data_processing.near_duplicates import NearDuplicateFilter
+
+DAY = datetime(2024, 6, 1, 12)
+
+
+def record(text, at=DAY, weight=None):
+    row = {'review_id': text, 'at': at, 'clean_text': text}
+    if weight is not None:
+        row['weight'] = weight
+    return row
+
+
+def test_signature_similarity_tracks_jaccard():
+    dedup = NearDuplicateFilter()
+    a = dedup.signature("delivery was very late, very bad service")
+    b = dedup.signature("delivery was very late very bad service!!")
+    c = dedup.signature("payment failed but money deducted")
+
+    assert (a == b).all()
+    assert (a == c).mean() < 0.2
+
+
+def test_batch_duplicates_collapse_into_weighted_representative():
+    dedup = NearDuplicateFilter(threshold=0.8)
+    batch = [
+        record("worst app ever, keeps crashing on checkout"),
+        record("worst app ever keeps crashing on checkout!", weight=2.0),
+        record("refund not received yet"),
+        record("worst app ever, keeps crashing on checkout", at=datetime(2024, 6, 2)),
+    ]
+
+    kept = dedup.filter_records(batch)
+
+    assert [r['clean_text'] for r in kept] == [batch[0]['clean_text'], "refund not received yet", batch[3]['clean_text']]
+    assert kept[0]['weight'] == 3.0 and 'weight' not in kept[1]
+    assert dedup.stats == {'reviews': 4, 'collapsed': 1, 'reused': 0}
+
+
+def test_later_batches_reuse_the_representative_text():
+    dedup = NearDuplicateFilter(threshold=0.8)
+    dedup.filter_records([record("food was stale, not ordering again")])
+
+    kept = dedup.filter_records([record("food was stale not ordering again."), record("maps not working properly")])
+
+    assert kept[0]['embed_text'] == "food was stale, not ordering again"
+    assert 'embed_text' not in kept[1]
+    assert dedup.stats['reused'] == 1
@@ -0,0 +1,112 @@
+"""
+Tests for the staged pipeline executor
+"""
+
+import time
+
+import pytest
+
+from src.utils.pipeline import Stage, StagedPipeline, max_items_in_flight
+
+
+def square(x):
+    return x * x
+
+
+def explode(x):
+    if x == 3:
+        raise ValueError("bad item")
+    return x
+
+
+def test_thread_and_process_stages_chain():
+    pipeline = StagedPipeline([
+        Stage('double', lambda x: 2 * x, workers=3),
+        Stage('square', square, workers=2, kind='process'),
+    ])
+
+    results = sorted(pipeline.run(range(20)))
+
+    assert results == sorted((2 * x) ** 2 for x in range(20))
+    assert pipeline.stats['double'].items_in == 20
+    assert pipeline.stats['square'].items_out == 20
+
+
+def test_process_stage_preserves_order():
+    assert list(StagedPipeline([Stage('square', square, workers=3, kind='process')]).run(range(30))) == \
+        [x * x for x in range(30)]
+
+
+def test_errors_propagate_to_consumer():
+    pipeline = StagedPipeline([Stage('explode', explode, workers=2)])
+
+    with pytest.raises(ValueError, match="bad item"):
+        list(pipeline.run(range(10)))
+
+
+def test_slow_consumer_applies_backpressure():
+    pipeline = StagedPipeline([Stage('identity', lambda x: x)], queue_size=2)
+
+    for _ in pipeline.run(range(8)):
+        time.sleep(0.02)
+
+    assert pipeline.stats['identity'].blocked_seconds > 0.05
+    assert pipeline.stats['identity'].max_queue_depth <= 2
+
+
+def test_closing_early_stops_source():
+    consumed = []
+
+    def source():
+        for i in range(1000):
+            consumed.append(i)
+            yield i
+
+    stream = StagedPipeline([Stage('identity', lambda x: x)], queue_size=2).run(source())
+    assert next(stream) == 0
+    stream.close()
+
+    assert len(consumed) < 20
+
+
+def test_ordered_thread_stage_restores_source_order():
+    def jitter(x):
+        time.sleep(0.002 * ((x * 7) % 5))
+        return x
+
+    pipeline = StagedPipeline([
+        Stage('clean', jitter),
+        Stage('embed', jitter, workers=3, ordered=True),
+        Stage('assign', lambda x: x),
+    ], queue_size=2)
+
+    assert list(pipeline.run(range(40))) == list(range(40))
+    assert pipeline.stats['embed'].items_out == 40
+
+
+def test_ordered_stage_needs_ordered_input():
+    with pytest.raises(ValueError, match='embed'):
+        StagedPipeline([Stage('shuffle', lambda x: x, workers=4), Stage('embed', lambda x: x, workers=3, ordered=True)])
+
+
+def test_stalled_item_keeps_ordered_stage_bounded():
+    consumed = []
+
+    def source():
+        for i in range(2000):
+            consumed.append(i)
+            yield i
+
+    during_stall = []
+
+    def stall_first(x):
+        if x == 0:
+            time.sleep(0.3)
+            during_stall.append(len(consumed))
+        return x
+
+    workers, queue_size = 2, 2
+    pipeline = StagedPipeline([Stage('embed', stall_first, workers=workers, ordered=True)], queue_size=queue_size)
+
+    assert list(pipeline.run(source())) == list(range(2000))
+    assert during_stall[0] <= max_items_in_flight([workers], queue_size, ordered=[True])
@@ -0,0 +1,84 @@
+"""
+Tests for the streaming report writers
+"""
+
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src.trend_analysis.report_generator import ReportGenerator
+
+
+def sample_report():
+    return pd.DataFrame(
+        {'Jun 01': [5, 2, 0], 'Jun 02': [7, 1, 3]},
+        index=['Delivery issue', 'Food stale', 'App crashing'],
+    )
+
+
+def test_csv_written_in_chunks_matches_to_csv(tmp_path):
+    report = sample_report()
+    path = tmp_path / "report.csv"
+
+    ReportGenerator(chunk_size=2).save_report(report, str(path))
+
+    assert path.read_text(encoding='utf-8') == report.to_csv()
+    assert os.listdir(tmp_path) == ["report.csv"]
+
+
+def test_jsonl_has_one_record_per_topic(tmp_path):
+    path = tmp_path / "report.jsonl"
+
+    ReportGenerator(chunk_size=1).save_report(sample_report(), str(path))
+
+    records = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert records[1] == {'topic': 'Food stale', 'Jun 01': 2, 'Jun 02': 1}
+    assert len(records) == 3
+
+
+def test_parquet_round_trip_from_chunk_generator(tmp_path):
+    pytest.importorskip("pyarrow")
+    report = sample_report()
+    path = tmp_path / "report.parquet"
+
+    ReportGenerator().save_report((report.iloc[i:i + 1] for i in range(len(report))), str(path))
+
+    loaded = pd.read_parquet(path).set_index('topic')
+    assert loaded.values.tolist() == report.values.tolist()
+    assert list(loaded.index) == list(report.index)
+
+
+def test_parquet_from_empty_chunk_stream_is_readable(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "report.parquet"
+
+    ReportGenerator().save_report(iter([]), str(path))
+
+    loaded = pd.read_parquet(path)
+    assert loaded.empty and list(loaded.columns) == ['topic']
+
+
+def test_multi_app_report_adds_app_id(tmp_path):
+    path = tmp_path / "all.csv"
+
+    ReportGenerator().save_reports([('app.one', sample_report()), ('app.two', sample_report())], str(path))
+
+    loaded = pd.read_csv(path, index_col=[0, 1])
+    assert loaded.index.get_level_values(0).tolist() == ['app.one'] * 3 + ['app.two'] * 3
+
+
+def test_failed_write_leaves_existing_report_untouched(tmp_path):
+    path = tmp_path / "report.csv"
+    path.write_text("previous", encoding='utf-8')
+
+    def broken_chunks():
+        yield sample_report()
+        raise RuntimeError("source failed")
+
+    with pytest.raises(RuntimeError):
+        ReportGenerator().save_report(broken_chunks(), str(path))
+
+    assert path.read_text(encoding='utf-8') == "previous"
+    assert os.listdir(tmp_path) == ["report.csv"]
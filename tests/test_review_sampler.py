@@ -0,0 +1,113 @@
+"""
+Tests for deterministic per-day reservoir sampling
+"""
+
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.data_processing.checkpoint_store import CheckpointStore, IncrementalIngestor
+from src.data_processing.mock_play_store import MockPlayStoreServer
+from src.data_processing.review_sampler import DailyReservoir
+from src.data_processing.review_scraper import HttpReviewSource, ReviewScraper
+
+START, END = datetime(2024, 6, 1), datetime(2024, 6, 3)
+
+
+def reviews(n_per_day):
+    return [{'review_id': f"{day}-{i}", 'at': START + timedelta(days=day, seconds=i)}
+            for day, n in enumerate(n_per_day) for i in range(n)]
+
+
+def test_sample_is_capped_weighted_and_order_independent():
+    stream = reviews([500, 20])
+    shuffled = list(stream)
+    random.Random(1).shuffle(shuffled)
+
+    first = list(DailyReservoir(100, START, END, seed='app').sample(stream))
+    second = list(DailyReservoir(100, START, END, seed='app').sample(shuffled))
+
+    days = Counter(r['at'].day for r in first)
+    assert days == {1: 100, 2: 20}
+    assert {r['review_id'] for r in first} == {r['review_id'] for r in second}
+    assert sum(r['weight'] for r in first) == 520
+    assert {r['weight'] for r in first if r['at'].day == 2} == {1.0}
+
+
+def test_completed_days_are_released_before_the_stream_ends():
+    sampler = DailyReservoir(10, START, END)
+    released_early = []
+
+    def stream():
+        yield from reviews([30])
+        sampler.complete(START, START + timedelta(days=1))
+        yield {'review_id': 'late', 'at': START + timedelta(days=1, hours=1)}
+        released_early.append(sampler.kept.get('2024-06-01'))
+
+    out = list(sampler.sample(stream()))
+
+    assert released_early == [10]
+    assert len(out) == 11 and sampler.dropped == 20
+
+
+def test_ingestor_caps_each_day_but_keeps_totals(tmp_path):
+    seen_per_day = Counter()
+
+    def classify(batch):
+        seen_per_day.update(r['at'].strftime('%Y-%m-%d') for r in batch)
+        return ['topic'] * len(batch)
+
+    with MockPlayStoreServer(reviews_per_day=300) as server:
+        scraper = ReviewScraper(HttpReviewSource(server.base_url), page_size=50)
+        ingestor = IncrementalIngestor(scraper, CheckpointStore(str(tmp_path)), batch_size=40, max_reviews_per_day=60)
+        checkpoint = ingestor.run('in.swiggy.android', START, END, classify)
+
+    assert dict(seen_per_day) == {'2024-06-01': 60, '2024-06-02': 60}
+    for day in ('2024-06-01', '2024-06-02'):
+        assert abs(checkpoint.daily_counts[day]['topic'] - 300) <= 2
+
+
+def test_repeated_review_ids_are_ignored():
+    stream = reviews([30])
+    once = list(DailyReservoir(10, START, END).sample(stream))
+    # Overlapping pages repeat reviews, possibly with fresher fields, so the records differ
+    twice = list(DailyReservoir(10, START, END).sample(stream + [dict(r, thumbs_up=1) for r in reversed(stream)]))
+
+    assert len({r['review_id'] for r in twice}) == len(twice) == 10
+    assert {r['review_id'] for r in twice} == {r['review_id'] for r in once}
+
+
+class DayScraper:
+    """Serves the reviews posted before ``now``, like a store queried mid-day"""
+
+    def __init__(self, reviews):
+        self.reviews = reviews
+        self.now = None
+
+    def iter_reviews(self, app_id, start, end, on_complete=None):
+        yield from (r for r in self.reviews if start <= r['at'] < min(end, self.now))
+        if on_complete is not None:
+            on_complete(start, end)
+
+
+def test_a_day_split_across_increments_keeps_one_quota(tmp_path):
+    day = reviews([400])
+    scraper = DayScraper(day)
+    ingestor = IncrementalIngestor(scraper, CheckpointStore(str(tmp_path)), batch_size=25, max_reviews_per_day=60)
+    classified = []
+
+    def classify(batch):
+        classified.extend(batch)
+        return ['topic'] * len(batch)
+
+    scraper.now = day[40]['at']
+    ingestor.run('app', START, END, classify)
+    scraper.now = END
+    checkpoint = ingestor.run('app', START, END, classify)
+
+    assert len(classified) == 60
+    assert checkpoint.sampled_days == {'2024-06-01': 60}
+    # Weighted counts are kept unrounded: 40 reviews, then 360 carried by 20
+    assert checkpoint.daily_counts['2024-06-01']['topic'] == pytest.approx(400)
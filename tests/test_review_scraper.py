@@ -0,0 +1,49 @@
+"""
+Tests for the streaming review scraper against the local Play Store stand-in
+"""
+
+import types
+from datetime import datetime
+
+import pytest
+
+from src.data_processing.mock_play_store import MockPlayStoreServer
+from src.data_processing.review_scraper import FetchError, HttpReviewSource, ReviewScraper
+
+START = datetime(2024, 6, 1)
+END = datetime(2024, 6, 4)
+
+
+@pytest.fixture
+def server():
+    with MockPlayStoreServer(reviews_per_day=120) as srv:
+        yield srv
+
+
+def test_iter_reviews_streams_full_window(server):
+    scraper = ReviewScraper(HttpReviewSource(server.base_url), page_size=50, max_workers=3)
+
+    stream = scraper.iter_reviews("in.swiggy.android", START, END)
+    assert isinstance(stream, types.GeneratorType)
+
+    reviews = list(stream)
+    assert len(reviews) == server.expected_count(START, END)
+    assert len({r['review_id'] for r in reviews}) == len(reviews)
+    assert all(START <= r['at'] < END for r in reviews)
+    assert all(r['app_id'] == "in.swiggy.android" for r in reviews)
+
+
+def test_iter_reviews_retries_transient_failures():
+    with MockPlayStoreServer(reviews_per_day=40, failure_rate=0.3) as server:
+        scraper = ReviewScraper(HttpReviewSource(server.base_url), page_size=10,
+                                max_workers=2, max_retries=8, backoff_base=0.001)
+        reviews = list(scraper.iter_reviews("in.swiggy.android", START, END))
+
+    assert len(reviews) == server.expected_count(START, END)
+
+
+def test_iter_reviews_raises_on_permanent_failure(server):
+    scraper = ReviewScraper(HttpReviewSource(server.base_url + "/missing"), backoff_base=0.001)
+
+    with pytest.raises(FetchError):
+        list(scraper.iter_reviews("in.swiggy.android", START, END))
@@ -0,0 +1,123 @@
+"""
+Tests for the partitioned Parquet review store
+"""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.data_processing.checkpoint_store import CheckpointStore, IncrementalIngestor
+from src.data_processing.review_store import ReviewStore
+
+
+def make_reviews():
+    return pd.DataFrame({
+        'app_id': ['in.swiggy.android'] * 3 + ['com.other'],
+        'review_id': ['r1', 'r2', 'r3', 'r4'],
+        'at': [datetime(2024, 6, 1, 8), datetime(2024, 6, 1, 20), datetime(2024, 6, 2, 9), datetime(2024, 6, 1, 10)],
+        'content': ['late delivery', 'stale food', 'late again', 'crash'],
+        'score': [1, 2, 1, 1],
+        'topic': ['Delivery issue', 'Food stale', 'Delivery issue', 'App crashing'],
+    })
+
+
+def test_write_partitions_by_app_and_day(tmp_path):
+    store = ReviewStore(str(tmp_path))
+    store.write(make_reviews())
+
+    assert store.partitions('in.swiggy.android') == ['2024-06-01', '2024-06-02']
+    assert store.partitions('com.other') == ['2024-06-01']
+
+
+def test_read_prunes_days_and_columns(tmp_path):
+    store = ReviewStore(str(tmp_path))
+    store.write(make_reviews())
+
+    df = store.read('in.swiggy.android', datetime(2024, 6, 2), datetime(2024, 6, 3), columns=['review_id'])
+    assert list(df.columns) == ['review_id']
+    assert df['review_id'].tolist() == ['r3']
+
+
+def test_reading_an_unknown_app_gives_a_typed_empty_frame(tmp_path):
+    df = ReviewStore(str(tmp_path)).read('com.none', datetime(2024, 6, 1), datetime(2024, 6, 2), columns=['at', 'score'])
+    assert df.empty and list(df.columns) == ['at', 'score']
+    assert df['at'].dt.strftime('%Y-%m-%d').empty
+
+
+def test_daily_topic_counts(tmp_path):
+    store = ReviewStore(str(tmp_path))
+    store.write(make_reviews())
+
+    counts = store.daily_topic_counts('in.swiggy.android', datetime(2024, 6, 1), datetime(2024, 6, 3))
+    assert counts.loc['Delivery issue', '2024-06-01'] == 1
+    assert counts.loc['Delivery issue', '2024-06-02'] == 1
+    assert counts.loc['Food stale', '2024-06-02'] == 0
+    assert 'App crashing' not in counts.index
+
+
+def test_ingestor_publishes_reviews_only_on_success(tmp_path):
+    store = ReviewStore(str(tmp_path / 'reviews'))
+    reviews = make_reviews().drop(columns='topic').to_dict('records')[:3]
+
+    class Scraper:
+        def iter_reviews(self, app_id, start, end):
+            return iter(reviews)
+
+    ingestor = IncrementalIngestor(Scraper(), CheckpointStore(str(tmp_path / 'ckpt')), review_store=store)
+    window = (datetime(2024, 6, 1), datetime(2024, 6, 3))
+
+    with pytest.raises(ZeroDivisionError):
+        ingestor.run('in.swiggy.android', *window, lambda batch: 1 / 0)
+    assert store.partitions('in.swiggy.android') == []
+
+    ingestor.run('in.swiggy.android', *window, lambda batch: ['Delivery issue'] * len(batch))
+    df = store.read('in.swiggy.android', *window, columns=['review_id', 'topic'])
+    assert sorted(df['review_id']) == ['r1', 'r2', 'r3']
+
+
+def test_overwrite_staging_replaces_only_touched_days(tmp_path):
+    store = ReviewStore(str(tmp_path))
+    store.write(make_reviews())
+
+    staged = store.stage(mode='overwrite')
+    staged.write(make_reviews().iloc[[0]])
+    assert len(store.read('in.swiggy.android', datetime(2024, 6, 1), datetime(2024, 6, 3))) == 3
+    staged.commit()
+
+    df = store.read('in.swiggy.android', datetime(2024, 6, 1), datetime(2024, 6, 3))
+    assert sorted(df['review_id']) == ['r1', 'r3']
+
+
+def test_overwrite_range_clears_days_with_nothing_staged(tmp_path):
+    store = ReviewStore(str(tmp_path))
+    store.write(make_reviews())
+
+    staged = store.stage(mode='overwrite', app_id='in.swiggy.android',
+                         start=datetime(2024, 6, 1), end=datetime(2024, 6, 2))
+    staged.commit()
+
+    assert store.partitions('in.swiggy.android') == ['2024-06-02']
+    assert store.partitions('com.other') == ['2024-06-01']
+
+
+def test_registry_ids_are_stored_in_topic_id(tmp_path):
+    store = ReviewStore(str(tmp_path / 'reviews'))
+    reviews = make_reviews().drop(columns='topic').to_dict('records')[:3]
+
+    class Scraper:
+        def iter_reviews(self, app_id, start, end):
+            return iter(reviews)
+
+    ingestor = IncrementalIngestor(Scraper(), CheckpointStore(str(tmp_path / 'ckpt')), review_store=store)
+    window = (datetime(2024, 6, 1), datetime(2024, 6, 3))
+    ingestor.run('in.swiggy.android', *window, lambda batch: [7, 'Food stale', None])
+
+    df = store.read('in.swiggy.android', *window, columns=['review_id', 'topic_id', 'topic']).sort_values('review_id')
+    assert df['topic_id'].tolist()[0] == 7 and df['topic_id'].isna().tolist()[1:] == [True, True]
+    assert df['topic'].isna().tolist() == [True, False, True] and df['topic'].iloc[1] == 'Food stale'
+    counts = store.daily_topic_counts('in.swiggy.android', *window)
+    assert counts.loc['7', '2024-06-01'] == 1 and counts.loc['Food stale', '2024-06-01'] == 1
+    assert len(counts) == 2
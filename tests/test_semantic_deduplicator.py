@@ -0,0 +1,94 @@
+"""
+Tests for the vector index and semantic deduplicator
+"""
+
+import numpy as np
+
+from src.agentic_ai.semantic_deduplicator import ExactIndex, IVFIndex, SemanticDeduplicator, radius_recall
+
+
+def clustered(n_clusters=40, per_cluster=50, dim=32, noise=0.15, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    points = np.repeat(centers, per_cluster, axis=0) + noise * rng.normal(size=(n_clusters * per_cluster, dim))
+    points /= np.linalg.norm(points, axis=1, keepdims=True)
+    order = rng.permutation(len(points))
+    return points[order].astype(np.float32), np.repeat(np.arange(n_clusters), per_cluster)[order]
+
+
+def test_ivf_radius_recall_meets_target():
+    data, _ = clustered()
+    exact = ExactIndex(32, block_size=256)
+    ivf = IVFIndex(32, train_size=500)
+    for chunk in np.array_split(data, 8):
+        exact.add(chunk)
+        ivf.add(chunk)
+
+    assert ivf.is_trained
+    assert radius_recall(ivf, exact, data[:200], threshold=0.7) >= 0.95
+
+
+def test_best_match_respects_threshold():
+    index = ExactIndex(2)
+    index.add(np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32))
+
+    ids, sims = index.best_match(np.array([[0.8, 0.6], [-1.0, 0.0]], dtype=np.float32), threshold=0.7)
+    assert ids.tolist() == [0, -1]
+    np.testing.assert_allclose(sims[0], 0.8)
+
+
+def test_deduplicator_collapses_clusters_with_weights():
+    data, labels = clustered(n_clusters=10, per_cluster=30)
+    dedup = SemanticDeduplicator(32, similarity_threshold=0.7, index='exact', block_size=64)
+
+    first = dedup.add(data[:150])
+    second = dedup.add(data[150:])
+    assignment = np.concatenate([first, second])
+
+    assert dedup.representatives.size == 10
+    assert dedup.weights.values.sum() == len(data)
+    for rep in np.unique(assignment):
+        assert len(np.unique(labels[assignment == rep])) == 1
+
+
+def test_deduplicator_accumulates_fractional_weights():
+    data, _ = clustered(n_clusters=3, per_cluster=10)
+    dedup = SemanticDeduplicator(32, similarity_threshold=0.7, index='exact', block_size=8)
+
+    dedup.add(data[:12], weights=np.full(12, 2.5))
+    dedup.add(data[12:], weights=np.full(18, 0.25))
+
+    assert dedup.weights.values.dtype == np.float64
+    np.testing.assert_allclose(dedup.weights.values.sum(), 12 * 2.5 + 18 * 0.25)
+
+
+def test_ivf_and_exact_deduplication_agree():
+    data, _ = clustered(n_clusters=30, per_cluster=40)
+    exact = SemanticDeduplicator(32, index='exact').add(data)
+    approx = SemanticDeduplicator(32, index='ivf', train_size=300).add(data)
+
+    assert (exact == approx).mean() >= 0.95
+
+
+def test_removed_vectors_stop_matching():
+    data, _ = clustered(n_clusters=10, per_cluster=30)
+    for index in (ExactIndex(32), IVFIndex(32, train_size=100), IVFIndex(32, train_size=1000)):
+        first = index.add(data[:200])
+        index.remove(first[:50])
+        second = index.add(data[200:])
+
+        assert len(index) == 250 and second[0] == 200
+        hits = index.search_radius(data[:50], threshold=0.999)
+        assert all(not np.isin(ids, first[:50]).any() for ids, _ in hits)
+
+
+def test_discarded_representatives_take_no_new_members():
+    data, labels = clustered(n_clusters=4, per_cluster=10)
+    dedup = SemanticDeduplicator(32, index='exact')
+    assignment = dedup.add(data[:20])
+
+    gone = assignment[labels[:20] == labels[0]][0]
+    dedup.discard(np.array([gone, 10 ** 6]))
+    again = dedup.add(data[20:])
+    assert gone not in again
+    assert len(dedup.index) == dedup.representatives.size - 1
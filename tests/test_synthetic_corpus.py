@@ -0,0 +1,55 @@
+"""
+Tests for the synthetic review corpus and the pipeline benchmark
+"""
+
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+
+from src.data_processing.synthetic_corpus import SyntheticCorpus, load_topic_vocabulary
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_vocabulary_comes_from_report_csvs(tmp_path):
+    (tmp_path / "a.csv").write_text(",Jun 01,Jun 02\nDelivery issue,3,4\nFood stale,1,0\n", encoding='utf-8')
+    (tmp_path / "b.csv").write_text(",Jun 01\nDelivery issue,2\n", encoding='utf-8')
+
+    assert load_topic_vocabulary(str(tmp_path / "*.csv")) == {'Delivery issue': 9.0, 'Food stale': 1.0}
+
+
+def test_duplicate_and_paraphrase_rates_are_controlled():
+    corpus = SyntheticCorpus(topics={'Delivery issue': 3, 'Food stale': 1}, duplicate_rate=0.2, paraphrase_rate=0.3)
+
+    reviews = list(corpus.iter_reviews(5000))
+    kinds = Counter(r['kind'] for r in reviews)
+
+    assert abs(kinds['duplicate'] / 5000 - 0.2) < 0.03
+    assert abs(kinds['paraphrase'] / 5000 - 0.3) < 0.03
+    fresh = {r['content'] for r in reviews if r['kind'] == 'fresh'}
+    assert all(r['content'] in fresh for r in reviews if r['kind'] == 'duplicate')
+    assert {r['topic'] for r in reviews} == {'Delivery issue', 'Food stale'}
+    assert len({r['review_id'] for r in reviews}) == 5000
+
+
+def test_corpus_is_deterministic_and_chronological():
+    first = list(SyntheticCorpus(seed=7).iter_reviews(300))
+    second = list(SyntheticCorpus(seed=7).iter_reviews(300))
+
+    assert [r['content'] for r in first] == [r['content'] for r in second]
+    assert [r['at'] for r in first] == sorted(r['at'] for r in first)
+
+
+def test_benchmark_emits_per_stage_json(tmp_path):
+    output = tmp_path / "bench.json"
+    subprocess.run([sys.executable, 'scripts/benchmark_pipeline.py', '--sizes', '300', '--batch-size', '100',
+                    '--output', str(output)], cwd=ROOT, check=True, capture_output=True, timeout=120)
+
+    result = json.loads(output.read_text(encoding='utf-8'))
+    stages = result['runs'][0]['stages']
+    assert result['runs'][0]['reviews'] == 300
+    assert {'generate', 'clean', 'embed', 'dedup', 'topics', 'trends', 'report'} <= set(stages)
+    assert stages['clean']['items_in'] == 300
+    assert all(s['wall_s'] >= 0 and 'peak_mb' in s for s in stages.values())
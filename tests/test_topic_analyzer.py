@@ -0,0 +1,157 @@
+"""
+Tests for the batched, cached embedding service
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.agentic_ai.topic_analyzer import (EmbeddingCache, EmbeddingService, HashingEncoder, OnnxEncoder,
+                                           SentenceTransformerEncoder, TaxonomyClassifier, encoder_parity, text_key)
+
+
+class FakeEncoder:
+    """Deterministic stand-in for the sentence-transformer model"""
+
+    dim = 8
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts):
+        self.batches.append(list(texts))
+        vectors = np.stack([
+            np.random.default_rng(int.from_bytes(text_key(t)[:4], 'little')).normal(size=self.dim)
+            for t in texts
+        ]).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_encode_deduplicates_and_buckets_by_length(tmp_path):
+    encoder = FakeEncoder()
+    service = EmbeddingService(batch_size=2, cache_dir=str(tmp_path), cache_dtype='float32', encoder=encoder)
+    texts = ["a much longer review about late delivery", "bad", "bad", "stale food", "ok"]
+
+    vectors = service.encode(texts)
+
+    assert vectors.shape == (5, 8)
+    np.testing.assert_array_equal(vectors[1], vectors[2])
+    assert sum(len(b) for b in encoder.batches) == 4
+    assert encoder.batches[0] == ["ok", "bad"]
+
+
+def test_cache_survives_restart(tmp_path):
+    first = EmbeddingService(cache_dir=str(tmp_path), encoder=FakeEncoder())
+    expected = first.encode(["late delivery", "food stale"])
+
+    encoder = FakeEncoder()
+    second = EmbeddingService(cache_dir=str(tmp_path), encoder=encoder)
+    vectors = second.encode(["food stale", "late delivery", "new text"])
+
+    assert encoder.batches == [["new text"]]
+    np.testing.assert_allclose(vectors[:2], expected[::-1], atol=1e-3)
+    assert second.stats['cache_hits'] == 2
+
+
+def test_cache_ignores_orphaned_rows(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), dim=4, dtype='float32')
+    cache.put([b'k' * 16], np.ones((1, 4), dtype=np.float32))
+    with open(tmp_path / 'vectors.bin', 'ab') as f:
+        f.write(np.zeros(4, dtype=np.float32).tobytes())
+
+    reopened = EmbeddingCache(str(tmp_path), dim=4, dtype='float32')
+    reopened.put([b'j' * 16], np.full((1, 4), 2, dtype=np.float32))
+
+    np.testing.assert_array_equal(reopened.get([b'j' * 16, b'k' * 16]), [[2] * 4, [1] * 4])
+
+
+def test_full_cache_stops_growing_but_still_encodes(tmp_path):
+    service = EmbeddingService(cache_dir=str(tmp_path), cache_dtype='float32', encoder=FakeEncoder(),
+                               cache_max_mb=2 * 8 * 4 / 2 ** 20)
+    expected = FakeEncoder().encode(["a", "b", "c"])
+
+    vectors = service.encode(["a", "b", "c"])
+
+    assert len(service.cache) == 2
+    np.testing.assert_allclose(vectors, expected, atol=1e-6)
+    np.testing.assert_allclose(service.encode(["c", "a"]), expected[[2, 0]], atol=1e-6)
+
+
+def test_taxonomy_classifier_embeds_labels_once(tmp_path):
+    service = EmbeddingService(cache_dir=str(tmp_path), encoder=HashingEncoder(256))
+    classifier = TaxonomyClassifier(service, {
+        'Refund issue': "refund not received, waiting for money back",
+        'App crashing': "the app keeps crashing or freezes",
+    }, threshold=0.4)
+
+    labels = classifier.classify_texts(["still waiting for my refund", "app keeps crashing", "love the new offers"])
+    encoded = service.stats['encoded']
+    classifier.classify_texts(["refund not received yet"])
+
+    assert labels == ['Refund issue', 'App crashing', None]
+    assert service.stats['encoded'] == encoded + 1
+    assert classifier.classify(np.zeros((0, 256), dtype=np.float32)).shape == (0,)
+
+
+class NoisyEncoder:
+    """A reference encoder with Gaussian noise added, like a lossy backend"""
+
+    def __init__(self, reference, scale):
+        self.reference = reference
+        self.scale = scale
+        self.dim = reference.dim
+
+    def encode(self, texts):
+        vectors = self.reference.encode(texts)
+        return vectors + np.random.default_rng(0).normal(scale=self.scale, size=vectors.shape).astype(np.float32)
+
+
+def test_encoder_parity_flags_a_lossy_backend():
+    texts = [f"review {i} about {topic}" for i in range(20) for topic in ("late delivery", "refund", "stale food")]
+    reference = HashingEncoder(256)
+
+    close = encoder_parity(NoisyEncoder(reference, 0.001), reference, texts)
+    far = encoder_parity(NoisyEncoder(reference, 0.2), reference, texts)
+
+    assert close['passed'] and close['mean_cosine'] > 0.99 and close['texts'] == 60
+    assert not far['passed'] and far['neighbor_overlap'] < close['neighbor_overlap']
+
+
+def test_backend_variants_get_separate_caches(tmp_path):
+    encoder = FakeEncoder()
+    encoder.variant = 'onnx-int8'
+    reference = EmbeddingService(cache_dir=str(tmp_path), encoder=FakeEncoder())
+    candidate = EmbeddingService(cache_dir=str(tmp_path), encoder=encoder)
+
+    reference.encode(["late delivery"])
+    candidate.encode(["late delivery"])
+
+    assert candidate.stats['encoded'] == 1
+    assert candidate.cache.directory != reference.cache.directory
+    assert OnnxEncoder(quantize=False).variant == 'onnx' and OnnxEncoder().repo_id.startswith('sentence-transformers/')
+
+
+def test_onnx_int8_matches_the_reference(tmp_path):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("torch")
+    pytest.importorskip("sentence_transformers")
+    texts = ["food arrived cold and late", "delivery partner was rude", "refund still not received",
+             "app crashes on checkout", "please keep instamart open all night", "items missing from my order",
+             "packaging was torn and leaking", "customer support never replied"]
+
+    result = encoder_parity(OnnxEncoder(model_dir=str(tmp_path)), SentenceTransformerEncoder(), texts, k=2)
+
+    assert result['passed'], result
+
+
+def test_keys_ending_in_zero_bytes_survive_a_reload(tmp_path):
+    key = b'k' * 15 + b'\x00'
+    cache = EmbeddingCache(str(tmp_path), dim=4, dtype='float32')
+    cache.put([key], np.ones((1, 4), dtype=np.float32))
+
+    reopened = EmbeddingCache(str(tmp_path), dim=4, dtype='float32')
+    assert key in reopened
+    reopened.put([key], np.zeros((1, 4), dtype=np.float32))
+    assert os.path.getsize(tmp_path / 'keys.bin') == 16
+    np.testing.assert_array_equal(reopened.get([key]), [[1] * 4])
@@ -0,0 +1,79 @@
+"""
+Tests for online topic discovery and the persisted topic registry
+"""
+
+import numpy as np
+
+from src.agentic_ai.topic_discoverer import OnlineTopicDiscoverer, TopicRegistry
+
+
+def unit(v):
+    v = np.asarray(v, dtype=np.float32)
+    return v / np.linalg.norm(v, axis=-1, keepdims=True)
+
+
+def noisy(center, n, seed):
+    rng = np.random.default_rng(seed)
+    return unit(center + 0.05 * rng.normal(size=(n, len(center))))
+
+
+AXES = np.eye(8, dtype=np.float32)
+
+
+def test_topics_form_only_at_min_cluster_size():
+    discoverer = OnlineTopicDiscoverer(TopicRegistry(8), min_cluster_size=3)
+
+    ids = discoverer.assign(noisy(AXES[0], 2, 0), days=['2024-06-01'] * 2)
+    assert ids.tolist() == [-1, -1]
+    assert len(discoverer.registry) == 0
+
+    ids = discoverer.assign(noisy(AXES[0], 2, 1), days=['2024-06-02'] * 2)
+    assert len(discoverer.registry) == 1
+    assert (ids == discoverer.registry.ids[0]).all()
+    assert discoverer.drain_backfill() == {(0, '2024-06-01'): 2.0}
+
+
+def test_existing_topics_are_reused_across_runs(tmp_path):
+    registry = TopicRegistry(8)
+    discoverer = OnlineTopicDiscoverer(registry)
+    first = discoverer.assign(np.vstack([noisy(AXES[0], 5, 0), noisy(AXES[1], 5, 1)]))
+    registry.labels[int(first[0])] = "Delivery issue"
+    registry.save(str(tmp_path))
+
+    reloaded = TopicRegistry.load(str(tmp_path), 8)
+    second = OnlineTopicDiscoverer(reloaded).assign(np.vstack([noisy(AXES[1], 3, 2), noisy(AXES[0], 3, 3)]))
+
+    assert len(reloaded) == 2
+    assert second[3:].tolist() == [first[0]] * 3
+    assert second[:3].tolist() == [first[5]] * 3
+    assert reloaded.label(first[0]) == "Delivery issue"
+    np.testing.assert_allclose(reloaded.counts, [8, 8])
+
+
+def test_near_identical_topics_merge_into_larger():
+    registry = TopicRegistry(8)
+    big = registry.add_topics(unit(AXES[0])[None] * 10, np.array([10.0]))[0]
+    small = registry.add_topics(unit(AXES[0] + 0.2 * AXES[1])[None] * 3, np.array([3.0]))[0]
+    discoverer = OnlineTopicDiscoverer(registry, merge_threshold=0.9)
+
+    ids = discoverer.assign(noisy(AXES[0] + 0.2 * AXES[1], 2, 0))
+
+    assert len(registry) == 1
+    assert registry.resolve(small) == big
+    assert (ids == big).all()
+
+
+def test_pending_pool_index_is_kept_across_calls():
+    discoverer = OnlineTopicDiscoverer(TopicRegistry(8), min_cluster_size=3, max_pending=4)
+    discoverer.assign(noisy(AXES[0], 1, 0))
+    discoverer.assign(noisy(AXES[1], 1, 1))
+    pool = discoverer._pool
+    assert len(pool.index) == 2
+
+    ids = discoverer.assign(noisy(AXES[0], 2, 2))
+    assert (ids >= 0).all() and len(pool.index) == 1
+
+    # The pool holds four rows, so the lone AXES[1] review is evicted with its group
+    discoverer.assign(unit(AXES[2:6]))
+    assert discoverer._pool is pool and pool._seen == 8
+    assert len(pool.index) == 4 and len(discoverer.registry.pending_vectors) == 4
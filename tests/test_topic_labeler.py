@@ -0,0 +1,58 @@
+"""
+Tests for per-cluster topic labelling
+"""
+
+import numpy as np
+
+from src.agentic_ai.topic_analyzer import EmbeddingService, HashingEncoder
+from src.agentic_ai.topic_discoverer import TopicRegistry
+from src.agentic_ai.topic_labeler import TopicLabeler, candidate_phrases
+
+REVIEWS = {
+    0: ["bring back 10 minute bolt delivery", "please bring back bolt delivery", "bolt delivery was the best"],
+    1: ["refund not received yet", "still waiting for my refund", "refund not received after a week"],
+}
+
+
+def make_registry(service):
+    registry = TopicRegistry(service.dim)
+    sums = np.stack([service.encode(texts).sum(axis=0) for texts in REVIEWS.values()])
+    registry.add_topics(sums, np.array([3.0, 3.0]))
+    return registry
+
+
+def observe_all(labeler, service):
+    for topic_id, texts in REVIEWS.items():
+        labeler.observe([topic_id] * len(texts), texts, service.encode(texts))
+
+
+def test_candidate_phrases_skip_stop_word_edges():
+    phrases = candidate_phrases("The refund was not received. Refund please!", (1, 2))
+
+    assert phrases[0] == 'refund'
+    assert 'refund was' not in phrases and 'received refund' not in phrases
+
+
+def test_labels_are_cached_until_the_centroid_drifts(tmp_path):
+    service = EmbeddingService(cache_dir=None, encoder=HashingEncoder(256))
+    registry = make_registry(service)
+    labeler = TopicLabeler(service, backend='embedding', reserved=['Refund'])
+    observe_all(labeler, service)
+
+    labels = labeler.label_topics(registry)
+
+    assert set(labels) == {0, 1}
+    assert 'bolt' in labels[0].lower() and 'refund' in labels[1].lower() and labels[1] != 'Refund'
+    assert labeler.label_topics(registry) == {}
+
+    registry.save(str(tmp_path))
+    reloaded = TopicRegistry.load(str(tmp_path), service.dim)
+    reloaded.labels[1] = "Refunds"
+    del reloaded.label_vectors[1]
+    reloaded.sums[0] += service.encode(["app crashes on checkout"])[0] * 5
+    relabeler = TopicLabeler(service, backend='embedding')
+    observe_all(relabeler, service)
+
+    assert relabeler.stale_topics(reloaded) == [0]
+    assert set(relabeler.label_topics(reloaded)) == {0}
+    assert reloaded.labels[1] == "Refunds"
@@ -0,0 +1,56 @@
+"""
+Tests for the compact topic×day count matrix
+"""
+
+from datetime import date
+
+import numpy as np
+
+from src.trend_analysis.topic_matrix import TopicDayMatrix
+
+
+def test_from_rows_exports_topics_by_day_without_copy():
+    matrix = TopicDayMatrix.from_rows({'Crash': [1, 2, 3], 'Refund': [0, 4, 1]}, date(2024, 6, 1))
+
+    df = matrix.to_frame()
+
+    assert list(df.index) == ['Crash', 'Refund']
+    assert list(df.columns) == ['Jun 01', 'Jun 02', 'Jun 03']
+    assert df.loc['Refund', 'Jun 02'] == 4
+    assert df.dtypes.unique().tolist() == [np.int32]
+    assert np.shares_memory(df.to_numpy(), matrix.counts)
+
+
+def test_append_day_and_new_topics_keep_earlier_counts():
+    matrix = TopicDayMatrix(date(2024, 6, 1), capacity=(1, 1))
+    for day in range(40):
+        matrix.append_day({day % 3: 1, 100 + day: 2})
+
+    assert matrix.shape == (43, 40)
+    assert matrix.counts[[matrix.row(t) for t in (0, 1, 2)]].sum() == 40
+    assert matrix.to_frame(labels=False).loc[139, 'Jul 10'] == 2
+
+
+def test_from_daily_counts_uses_ids_and_interns_names():
+    daily = {
+        '2024-05-31': {'9': 5},
+        '2024-06-01': {'3': 1, 'Late delivery': 2},
+        '2024-06-02': {'3': 4},
+    }
+
+    matrix = TopicDayMatrix.from_daily_counts(daily, date(2024, 6, 1), date(2024, 6, 3))
+
+    assert sorted(matrix.topic_ids.tolist()) == [3, 4]
+    assert matrix.names == {4: 'Late delivery'}
+    assert matrix.to_frame().loc['Topic 3'].tolist() == [1, 4]
+
+
+def test_collapse_sums_merged_topics_and_orders_by_total():
+    matrix = TopicDayMatrix(date(2024, 6, 1), n_days=2)
+    matrix.add_counts(0, {1: 1, 2: 2, 3: 3})
+    matrix.add_counts('2024-06-02', {1: 5})
+
+    merged = matrix.collapse(lambda t: 3 if t == 2 else t).order_by_total()
+
+    assert merged.topic_ids.tolist() == [1, 3]
+    assert merged.counts.tolist() == [[1, 5], [5, 0]]
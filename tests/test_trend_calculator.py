@@ -0,0 +1,75 @@
+"""
+Tests for the vectorized trend calculator
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.trend_analysis.trend_calculator import TrendCalculator
+
+
+def sample_counts():
+    rng = np.random.default_rng(0)
+    counts = rng.poisson(10, size=(5, 30)).astype(float)
+    counts[2, 25] = 60
+    return counts
+
+
+def test_rolling_mean_matches_pandas():
+    counts = sample_counts()
+    expected = pd.DataFrame(counts.T).rolling(7, min_periods=1).mean().T.to_numpy()
+
+    np.testing.assert_allclose(TrendCalculator(window=7).rolling_mean(counts), expected)
+
+
+def test_spike_detected_on_outlier_day():
+    stats = TrendCalculator(z_threshold=4.0).compute(sample_counts())
+
+    assert np.argwhere(stats['spikes']).tolist() == [[2, 25]]
+
+
+def test_no_spikes_during_warm_up():
+    counts = np.zeros((1, 10))
+    counts[0, 3] = 50
+
+    assert not TrendCalculator(window=7).spikes(counts).any()
+
+
+def test_week_over_week_and_trend_match_reference():
+    counts = sample_counts()
+    stats = TrendCalculator(window=7).compute(counts)
+
+    np.testing.assert_allclose(stats['wow_delta'], counts[:, -7:].sum(1) - counts[:, -14:-7].sum(1))
+    np.testing.assert_allclose(stats['trend'], counts[:, -7:].mean(1) - counts[:, :7].mean(1))
+
+
+def test_incremental_state_matches_batch():
+    counts = sample_counts()
+    calc = TrendCalculator()
+    state = calc.state(counts[:, :-1])
+
+    today = state.append(counts[:, -1])
+    stats = calc.compute(counts)
+
+    np.testing.assert_allclose(today['zscore'], stats['zscore'][:, -1])
+    np.testing.assert_allclose(today['rolling_mean'], stats['rolling_mean'][:, -1])
+    np.testing.assert_allclose(today['wow_delta'], stats['wow_delta'])
+
+
+def test_state_grows_for_new_topics():
+    state = TrendCalculator().state(n_topics=2)
+    state.append([1, 2])
+    result = state.append([1, 2, 9])
+
+    assert state.n_topics == 3
+    assert result['rolling_mean'].tolist() == [1, 2, 4.5]
+
+
+def test_incremental_spike_flags_match_batch():
+    counts = sample_counts()
+    calc = TrendCalculator()
+    state = calc.state(n_topics=len(counts))
+
+    flags = np.stack([state.append(day)['spike'] for day in counts.T], axis=1)
+
+    np.testing.assert_array_equal(flags, calc.compute(counts)['spikes'])